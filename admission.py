@@ -0,0 +1,103 @@
+"""
+Request coalescing and admission control for Elasticsearch queries.
+
+SingleFlight runs one computation per key at a time: callers arriving while
+an identical call is in flight wait for it and share its result (or its
+exception) instead of sending their own search. AdmissionGate caps the
+searches running at once; a caller that cannot get a slot within timeout
+seconds gets Overloaded, which the API turns into a 503, so a burst sheds
+load instead of piling up threads on the connection pool.
+
+Every Elasticsearch read goes through the gate. A slot belongs to a thread,
+so the requests one call makes while holding it (a query and its highlight
+pass) run on that slot; work fanned out to other threads (msearch chunks,
+export slices) takes a slot per thread.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class Overloaded(Exception):
+    """No search slot became free in time; retry later."""
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Later arrivals start a fresh call: results are never cached here
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AdmissionGate:
+    def __init__(self, max_concurrent: int, timeout: float = 1.0):
+        # max_concurrent <= 0 disables the gate
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self._lock = threading.Lock()
+        self._held = threading.local()
+        self.active = 0
+        self.rejected = 0
+
+    def run(self, compute: Callable[[], Any]) -> Any:
+        # Nested calls reuse the thread's slot instead of waiting on a second one
+        if self._slots is None or getattr(self._held, "slot", False):
+            return compute()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.rejected += 1
+            raise Overloaded(f"Search is at capacity ({self.max_concurrent} concurrent queries)")
+        with self._lock:
+            self.active += 1
+        self._held.slot = True
+        try:
+            return compute()
+        finally:
+            self._held.slot = False
+            with self._lock:
+                self.active -= 1
+            self._slots.release()
@@ -0,0 +1,376 @@
+"""
+Saved-search alerts backed by the Elasticsearch percolator.
+
+A saved search is stored as a percolator query (the same non-scoring filter
+/api/export builds) in ELASTIC_ALERTS_INDEX. After every bulk_index batch,
+AlertStore.percolate runs the batch's documents against all saved searches
+in one percolate request per ELASTIC_ALERTS_PERCOLATE_CHUNK documents and
+records each (search, release) match once in ELASTIC_ALERT_MATCHES_INDEX,
+which /api/alerts reads per subscriber.
+
+A release is new when its URL is indexed for the first time, whatever its
+publication date (scrapes lag). First sightings are recorded in
+ELASTIC_ALERT_SEEN_INDEX, which survives the press release index being
+recreated, so reindexing the whole corpus only percolates unseen releases.
+Releases are recorded as seen only after their matches are stored.
+Matches carry an increasing `sequence`, reserved from a counter document,
+that /api/alerts pages on.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from admission import Overloaded
+from entities import ENTITY_FIELDS
+
+# Fields a saved search can reference; percolated documents carry only these
+PERCOLATE_FIELDS = ["url", "title", "company", "published_date", "full_text"] + ENTITY_FIELDS
+MATCH_FIELDS = ["url", "title", "company", "published_date"]
+# Matches-index document holding the last reserved feed sequence number
+SEQUENCE_COUNTER_ID = "sequence-counter"
+
+
+def match_id(search_id: str, url: str) -> str:
+    """Stable id of one (search, release) match, so re-percolation never duplicates it."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(search_id.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(url.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AlertStore:
+    def __init__(self, service):
+        # ElasticsearchService: client, analysis settings and the shared filter builder
+        self.service = service
+        self.index_name = os.getenv('ELASTIC_ALERTS_INDEX', 'press_release_alerts')
+        self.matches_index = os.getenv('ELASTIC_ALERT_MATCHES_INDEX', 'press_release_alert_matches')
+        self.seen_index = os.getenv('ELASTIC_ALERT_SEEN_INDEX', 'press_release_alert_seen')
+        self.percolate_chunk = max(1, int(os.getenv('ELASTIC_ALERTS_PERCOLATE_CHUNK', '100')))
+
+    @property
+    def client(self):
+        return self.service.client
+
+    def ensure_indices(self) -> bool:
+        """Create the saved-search (percolator) and matches indices if missing."""
+        if not self.client:
+            print("Elasticsearch client not initialized")
+            return False
+
+        try:
+            if not self.client.indices.exists(index=self.index_name):
+                text_field = {"type": "text", "analyzer": "english_text", "search_analyzer": "english_search"}
+                mapping = {
+                    "settings": {
+                        "analysis": self.service.analysis_settings(self.service.sync_synonyms()),
+                    },
+                    "mappings": {
+                        "properties": {
+                            "query": {"type": "percolator"},
+                            "subscriber": {"type": "keyword"},
+                            "name": {"type": "keyword"},
+                            "created_at": {"type": "date"},
+                            # The request as saved, returned by list_searches
+                            "criteria": {"type": "object", "enabled": False},
+                            # Document fields the stored queries run against
+                            "url": {"type": "keyword"},
+                            "title": text_field,
+                            "full_text": text_field,
+                            "company": {"type": "keyword"},
+                            "published_date": {"type": "date"},
+                            **{field: {"type": "keyword"} for field in ENTITY_FIELDS},
+                        }
+                    },
+                }
+                self.client.indices.create(index=self.index_name, body=mapping)
+                print(f"Created index '{self.index_name}'")
+
+            if not self.client.indices.exists(index=self.matches_index):
+                mapping = {
+                    # One shard: a refresh exposes a prefix of each bulk, so a
+                    # feed cursor never skips a lower sequence made visible later
+                    "settings": {"number_of_shards": 1},
+                    "mappings": {
+                        "properties": {
+                            "subscriber": {"type": "keyword"},
+                            "search_id": {"type": "keyword"},
+                            "search_name": {"type": "keyword"},
+                            "url": {"type": "keyword"},
+                            "title": {"type": "text", "index": False},
+                            "company": {"type": "keyword"},
+                            "published_date": {"type": "date"},
+                            "matched_at": {"type": "date"},
+                            "sequence": {"type": "long"},
+                        }
+                    }
+                }
+                self.client.indices.create(index=self.matches_index, body=mapping)
+                print(f"Created index '{self.matches_index}'")
+            return True
+        except Exception as e:
+            # Another worker may have created it first
+            if "resource_already_exists_exception" in str(e):
+                return True
+            print(f"Error ensuring alert indices: {e}")
+            return False
+
+    def save_search(self, subscriber: str, name: str, criteria: Dict) -> Dict:
+        """
+        Store a saved search. criteria holds query_text, companies,
+        start_date, end_date and entities, as for export_filter.
+        """
+        if not self.service.gated(self.ensure_indices):
+            raise RuntimeError("Elasticsearch client not initialized")
+        document = {
+            "query": self.service.export_filter(
+                criteria.get("query_text"),
+                criteria.get("companies"),
+                criteria.get("start_date"),
+                criteria.get("end_date"),
+                criteria.get("entities"),
+            ),
+            "subscriber": subscriber,
+            "name": name,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "criteria": criteria,
+        }
+        # wait_for: the next batch (and list_searches) must see it
+        response = self.service.gated(self.client.index, index=self.index_name, document=document, refresh="wait_for")
+        return self._search_from_source(response["_id"], document)
+
+    @staticmethod
+    def _search_from_source(search_id: str, source: Dict) -> Dict:
+        return {
+            "id": search_id,
+            "name": source.get("name"),
+            "created_at": source.get("created_at"),
+            "criteria": source.get("criteria") or {},
+        }
+
+    def list_searches(self, subscriber: str, limit: int = 1000) -> List[Dict]:
+        if not self.client:
+            raise RuntimeError("Elasticsearch client not initialized")
+        if not self.service.gated(self.client.indices.exists, index=self.index_name):
+            return []
+        response = self.service.gated(
+            self.client.search,
+            index=self.index_name,
+            body={
+                "size": limit,
+                "query": {"bool": {"filter": [{"term": {"subscriber": subscriber}}]}},
+                "_source": ["name", "created_at", "criteria"],
+                "sort": [{"created_at": "desc"}],
+            },
+        )
+        return [self._search_from_source(hit["_id"], hit.get("_source", {})) for hit in response["hits"]["hits"]]
+
+    def delete_search(self, subscriber: str, search_id: str) -> bool:
+        """Delete a subscriber's saved search and its recorded matches; False if it is not theirs."""
+        if not self.client:
+            raise RuntimeError("Elasticsearch client not initialized")
+        gated = self.service.gated
+        try:
+            source = gated(self.client.get, index=self.index_name, id=search_id, _source=["subscriber"])["_source"]
+        except Overloaded:
+            raise
+        except Exception:
+            return False
+        if source.get("subscriber") != subscriber:
+            return False
+        gated(self.client.delete, index=self.index_name, id=search_id, refresh="wait_for")
+        if gated(self.client.indices.exists, index=self.matches_index):
+            gated(
+                self.client.delete_by_query,
+                index=self.matches_index,
+                body={"query": {"term": {"search_id": search_id}}},
+                conflicts="proceed",
+            )
+        return True
+
+    def _unseen(self, documents: List[Dict]) -> List[Dict]:
+        """
+        The documents whose URL has never been indexed before. The first
+        call (no seen index yet) records the whole batch as a baseline and
+        returns nothing, so existing saved searches are not flooded with the
+        back catalogue.
+        """
+        by_url = {doc["url"]: doc for doc in documents}
+        baseline = False
+        if not self.client.indices.exists(index=self.seen_index):
+            try:
+                self.client.indices.create(index=self.seen_index, body={
+                    "mappings": {
+                        "properties": {
+                            "url": {"type": "keyword"},
+                            "first_indexed_at": {"type": "date"},
+                        }
+                    }
+                })
+                baseline = True
+            except Exception as e:
+                if "resource_already_exists_exception" not in str(e):
+                    raise
+        if baseline:
+            print(f"Recorded {self._record_seen(list(by_url))} releases as already seen (alert baseline)")
+            return []
+        response = self.client.mget(index=self.seen_index, ids=list(by_url), _source=False)
+        return [by_url[doc["_id"]] for doc in response["docs"] if not doc.get("found")]
+
+    def _record_seen(self, urls: List[str]) -> int:
+        """Record urls as seen; already-seen ones fail with a version conflict and are skipped."""
+        from elasticsearch.helpers import streaming_bulk
+
+        first_indexed_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        operations = (
+            {
+                "_op_type": "create",
+                "_index": self.seen_index,
+                "_id": url,
+                "_source": {"url": url, "first_indexed_at": first_indexed_at},
+            }
+            for url in urls
+        )
+        return sum(ok for ok, _ in streaming_bulk(self.client, operations, raise_on_error=False, raise_on_exception=False))
+
+    def _reserve_sequences(self, count: int) -> int:
+        """
+        First of count consecutive feed sequence numbers. The last number
+        handed out lives in a counter document in the matches index, updated
+        with optimistic concurrency control so concurrent indexers never
+        reserve overlapping ranges. A missing counter starts after the
+        highest recorded sequence.
+        """
+        from elasticsearch.exceptions import ConflictError, NotFoundError
+
+        while True:
+            try:
+                counter = self.client.get(index=self.matches_index, id=SEQUENCE_COUNTER_ID)
+                last = counter["_source"]["sequence"]
+                condition = {"if_seq_no": counter["_seq_no"], "if_primary_term": counter["_primary_term"]}
+            except NotFoundError:
+                response = self.client.search(
+                    index=self.matches_index,
+                    body={"size": 0, "aggs": {"last": {"max": {"field": "sequence"}}}},
+                )
+                last = int(response["aggregations"]["last"]["value"] or 0)
+                condition = {"op_type": "create"}
+            try:
+                self.client.index(
+                    index=self.matches_index,
+                    id=SEQUENCE_COUNTER_ID,
+                    document={"sequence": last + count},
+                    **condition,
+                )
+                return last + 1
+            except ConflictError:
+                # Another indexer reserved a range first; retry on its value
+                continue
+
+    def percolate(self, documents: List[Dict]) -> int:
+        """
+        Run the first-time-indexed releases of a batch against every saved
+        search and record the matches. Returns count of new matches.
+        Releases are only recorded as seen once their matches are stored,
+        so a failed run percolates them again with the next batch.
+        """
+        if not self.client or not documents:
+            return 0
+
+        try:
+            from elasticsearch.helpers import bulk, scan
+
+            documents = self._unseen([doc for doc in documents if doc.get("url")])
+            if not documents:
+                return 0
+            if not self.client.indices.exists(index=self.index_name):
+                self._record_seen([doc["url"] for doc in documents])
+                return 0
+
+            matched_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+            operations = []
+            for start in range(0, len(documents), self.percolate_chunk):
+                chunk = documents[start:start + self.percolate_chunk]
+                percolated = [
+                    {field: doc[field] for field in PERCOLATE_FIELDS if doc.get(field) is not None}
+                    for doc in chunk
+                ]
+                # scan: a batch may match more saved searches than one page holds
+                for hit in scan(
+                    self.client,
+                    index=self.index_name,
+                    query={"query": {"percolate": {"field": "query", "documents": percolated}}},
+                    _source=["subscriber", "name"],
+                ):
+                    source = hit.get("_source", {})
+                    slots = hit.get("fields", {}).get("_percolator_document_slot", [0])
+                    for slot in slots:
+                        doc = chunk[slot]
+                        operations.append({
+                            "_op_type": "create",
+                            "_index": self.matches_index,
+                            "_id": match_id(hit["_id"], doc["url"]),
+                            "_source": {
+                                "subscriber": source.get("subscriber"),
+                                "search_id": hit["_id"],
+                                "search_name": source.get("name"),
+                                **{field: doc.get(field) for field in MATCH_FIELDS},
+                                "matched_at": matched_at,
+                            },
+                        })
+
+            success = 0
+            if operations:
+                if not self.ensure_indices():
+                    return 0
+                # Feed cursor: increases across batches and within one
+                first = self._reserve_sequences(len(operations))
+                for offset, operation in enumerate(operations):
+                    operation["_source"]["sequence"] = first + offset
+                # Already-recorded matches fail with a version conflict and are skipped
+                success, errors = bulk(self.client, operations, raise_on_error=False, refresh="wait_for")
+                failed = [error for error in errors if next(iter(error.values())).get("status") != 409]
+                if failed:
+                    print(f"Error recording {len(failed)} saved-search matches; releases will be percolated again")
+                    return success
+                print(f"Recorded {success} new saved-search matches")
+            self._record_seen([doc["url"] for doc in documents])
+            return success
+        except Exception as e:
+            print(f"Error percolating saved searches: {e}")
+            return 0
+
+    def feed(self, subscriber: str, after: Optional[int] = None,
+             search_id: Optional[str] = None, limit: int = 100) -> Dict:
+        """
+        A subscriber's matches, newest first, and the cursor to poll with.
+        Without after: the latest limit matches. With after (a previous
+        cursor): the oldest limit matches recorded since, so polling with
+        each returned cursor never skips or repeats a match.
+        """
+        if not self.client:
+            raise RuntimeError("Elasticsearch client not initialized")
+        if not self.service.gated(self.client.indices.exists, index=self.matches_index):
+            return {"matches": [], "cursor": after}
+        filters = [{"term": {"subscriber": subscriber}}]
+        if search_id:
+            filters.append({"term": {"search_id": search_id}})
+        if after is not None:
+            filters.append({"range": {"sequence": {"gt": after}}})
+        response = self.service.gated(
+            self.client.search,
+            index=self.matches_index,
+            body={
+                "size": limit,
+                "query": {"bool": {"filter": filters}},
+                "_source": ["search_id", "search_name", "matched_at", "sequence"] + MATCH_FIELDS,
+                "sort": [{"sequence": "asc" if after is not None else "desc"}],
+            },
+        )
+        matches = [hit.get("_source", {}) for hit in response["hits"]["hits"]]
+        if after is not None:
+            matches.reverse()
+        cursor = matches[0]["sequence"] if matches else after
+        return {"matches": matches, "cursor": cursor}
@@ -0,0 +1,101 @@
+"""
+Typed API response records and the JSON response class used by services.py.
+
+Endpoints return FastJSONResponse directly, which skips FastAPI's
+jsonable_encoder pass. List results are the services' own PressReleaseHit
+records (see records.py), serialized without an intermediate copy; orjson
+handles slotted dataclasses natively, otherwise the stdlib json module is used.
+"""
+
+import dataclasses
+import importlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    orjson = importlib.import_module("orjson")
+except Exception:
+    orjson = None
+
+
+@dataclass(slots=True)
+class PressReleaseDetail:
+    title: Optional[str]
+    company: Optional[str]
+    published_date: Optional[str]
+    url: Optional[str]
+    full_text: Optional[str]
+    related: List[Dict]
+
+    @classmethod
+    def from_result(cls, pr: Dict) -> "PressReleaseDetail":
+        return cls(
+            pr.get('title'),
+            pr.get('company'),
+            pr.get('published_date'),
+            pr.get('url'),
+            pr.get('full_text'),
+            pr.get('related') or [],
+        )
+
+
+@dataclass
+class QuerySpec:
+    """One query of POST /api/query-press-releases/batch; mirrors the GET endpoint's parameters."""
+    query: Optional[str] = None
+    company: List[str] = field(default_factory=list)
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    limit: Optional[int] = None
+    highlights: bool = True
+    facets: bool = True
+    drug: List[str] = field(default_factory=list)
+    phase: List[str] = field(default_factory=list)
+    regulatory_event: List[str] = field(default_factory=list)
+    partner: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BatchQueryRequest:
+    queries: List[QuerySpec]
+
+
+@dataclass
+class SavedSearchRequest:
+    """Body of POST /api/alerts/searches: a subscriber's named query + filters."""
+    subscriber: str
+    name: str
+    query: Optional[str] = None
+    company: List[str] = field(default_factory=list)
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    drug: List[str] = field(default_factory=list)
+    phase: List[str] = field(default_factory=list)
+    regulatory_event: List[str] = field(default_factory=list)
+    partner: List[str] = field(default_factory=list)
+
+
+def _json_default(value):
+    if dataclasses.is_dataclass(value):
+        return {f.name: getattr(value, f.name) for f in dataclasses.fields(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+        default=_json_default,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+N single /api/query-press-releases calls vs. one POST
+/api/query-press-releases/batch with the same queries, against a running API.
+Run: python3 bench_batch.py [--base-url http://127.0.0.1:8000] [--queries 200]
+
+Queries come from bench_load.QueryMix (title phrases, companies, date
+ranges). Single calls reuse one keep-alive connection, so the difference is
+per-request overhead plus one ES search per query versus chunked _msearch.
+Start the API with one worker (no shared result cache) so both paths compute
+every query. Both runs must return the same results.
+"""
+
+import argparse
+import http.client
+import json
+import time
+from urllib.parse import urlencode, urlsplit
+
+from bench_load import QueryMix
+from snapshot_store import iter_snapshot_records
+
+
+def query_specs(mix: QueryMix, count: int):
+    specs = []
+    while len(specs) < count:
+        path, params = mix.next()
+        if path == "/api/query-press-releases":
+            specs.append(params)
+    return specs
+
+
+def run_single(connection, specs):
+    results = []
+    for params in specs:
+        connection.request("GET", "/api/query-press-releases?" + urlencode(params, doseq=True))
+        response = connection.getresponse()
+        results.append(json.loads(response.read()))
+    return results
+
+
+def run_batch(connection, specs):
+    body = json.dumps({"queries": specs})
+    connection.request("POST", "/api/query-press-releases/batch", body=body,
+                       headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return json.loads(response.read())["results"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    specs = query_specs(QueryMix(list(iter_snapshot_records(args.source))), args.queries)
+    url = urlsplit(args.base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=300)
+
+    timings = {"single": [], "batch": []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        single = run_single(connection, specs)
+        timings["single"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = run_batch(connection, specs)
+        timings["batch"].append(time.perf_counter() - start)
+
+    mismatches = sum(
+        1 for one, many in zip(single, batch)
+        if one.get("data") != many.get("data") or one.get("facets") != many.get("facets")
+    )
+    print(f"{len(specs)} queries, best of {args.repeat}")
+    for name, values in timings.items():
+        best = min(values)
+        print(f"{name:<8}{best * 1000:>10.0f} ms{len(specs) / best:>10.0f} queries/s")
+    print(f"mismatched results: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
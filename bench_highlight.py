@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark highlight cost versus hit count against a running Elasticsearch.
+Run: python3 bench_highlight.py [--scale 40] [--query "cancer therapy"]
+
+Indexes press_releases.json (replicated --scale times) into a scratch index
+with the current mapping, then times query_documents for each highlighter
+and hit count, with every hit highlighted and with only the top page.
+"""
+
+import argparse
+import json
+import time
+
+from elasticsearch_service import ElasticsearchService
+
+BENCH_INDEX = "press_releases_highlight_bench"
+HIT_COUNTS = [10, 50, 100, 250, 500, 1000]
+HIGHLIGHTERS = ["plain", "unified", "fvh"]
+
+
+def build_bench_index(service, source, scale):
+    if service.client.indices.exists(index=BENCH_INDEX):
+        service.client.indices.delete(index=BENCH_INDEX)
+    service.ensure_index()
+
+    with open(source) as f:
+        base = json.load(f)
+    documents = []
+    for copy in range(scale):
+        for record in base:
+            documents.append({**record, "url": f"{record.get('url')}#{copy}"})
+    service.bulk_index(documents)
+    service.client.indices.refresh(index=BENCH_INDEX)
+    return len(documents)
+
+
+def time_query(service, query, limit, highlighter, highlight_size, repeat, include_highlights=True):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        service.query_documents(
+            query_text=query,
+            limit=limit,
+            include_highlights=include_highlights,
+            highlighter_type=highlighter,
+            highlight_size=highlight_size,
+        )
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--scale", type=int, default=40)
+    parser.add_argument("--query", default="cancer therapy")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep-index", action="store_true")
+    args = parser.parse_args()
+
+    service = ElasticsearchService()
+    if not service.client:
+        print("Cannot connect to Elasticsearch. Make sure it's running.")
+        return
+    service.index_name = BENCH_INDEX
+
+    count = build_bench_index(service, args.source, args.scale)
+    print(f"Indexed {count} documents into '{BENCH_INDEX}', query={args.query!r}\n")
+
+    header = f"{'hits':>6}{'no highlight':>14}"
+    for highlighter in HIGHLIGHTERS:
+        header += f"{highlighter + ' all':>14}{highlighter + ' page':>14}"
+    print(f"{header}   (ms, best of {args.repeat})")
+
+    try:
+        for limit in HIT_COUNTS:
+            baseline = time_query(service, args.query, limit, None, 0, args.repeat, include_highlights=False)
+            row = f"{limit:>6}{baseline:>14.1f}"
+            for highlighter in HIGHLIGHTERS:
+                every = time_query(service, args.query, limit, highlighter, 0, args.repeat)
+                page = time_query(service, args.query, limit, highlighter, args.page_size, args.repeat)
+                row += f"{every:>14.1f}{page:>14.1f}"
+            print(row)
+    finally:
+        if not args.keep_index:
+            service.client.indices.delete(index=BENCH_INDEX)
+
+
+if __name__ == "__main__":
+    main()
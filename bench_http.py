@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Response bytes and end-to-end latency of the list endpoints, before and
+after HTTP caching/compression, against a running API server.
+Run: python3 bench_http.py [--base-url http://localhost:8000] [--repeat 20]
+
+"before" is a plain request (no Accept-Encoding, no validator), i.e. what
+the API sent prior to HttpCacheMiddleware. "gzip"/"br" add Accept-Encoding,
+and "304" revalidates with the ETag from the first response.
+"""
+
+import argparse
+import statistics
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+ENDPOINTS = [
+    "/api/press-releases",
+    "/api/initial-data",
+    "/api/query-press-releases?query=cancer",
+    "/press-releases/all?page=1&size=10",
+]
+
+
+def fetch(url, headers):
+    request = Request(url, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urlopen(request, timeout=30) as response:
+            body = response.read()
+            status, response_headers = response.status, response.headers
+    except HTTPError as e:
+        body = e.read()
+        status, response_headers = e.code, e.headers
+    return status, response_headers, len(body), (time.perf_counter() - start) * 1000
+
+
+def measure(url, headers, repeat):
+    timings = []
+    size = status = None
+    for _ in range(repeat):
+        status, _, size, elapsed = fetch(url, headers)
+        timings.append(elapsed)
+    return status, size, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<42}{'case':<8}{'status':>8}{'bytes':>10}{'p50 ms':>10}")
+    for path in ENDPOINTS:
+        url = args.base_url.rstrip("/") + path
+        _, headers, _, _ = fetch(url, {})
+        etag = headers.get("ETag")
+
+        cases = [
+            ("before", {}),
+            ("gzip", {"Accept-Encoding": "gzip"}),
+            ("br", {"Accept-Encoding": "br"}),
+        ]
+        if etag:
+            cases.append(("304", {"Accept-Encoding": "gzip", "If-None-Match": etag}))
+
+        for label, request_headers in cases:
+            status, size, p50 = measure(url, request_headers, args.repeat)
+            print(f"{path:<42}{label:<8}{status:>8}{size:>10}{p50:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
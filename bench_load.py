@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Load test for the API: replays a query mix derived from press_releases.json
+and reports throughput and p50/p95/p99 latency per endpoint for each uvicorn
+worker count.
+Run: python3 bench_load.py [--workers 1,2,4] [--duration 20] [--concurrency 32]
+     python3 bench_load.py --backend elasticsearch      # real cluster (ELASTIC_* env)
+     python3 bench_load.py --base-url http://host:8000  # already running server
+     python3 bench_load.py --output new.json --compare old.json
+
+The server is started as `uvicorn services:app --workers N` (or, with
+--server launcher, `services.py --workers N`) with SEARCH_BACKEND=--backend;
+"local" (default) serves from the in-process BM25 index, a stand-in for
+Elasticsearch that needs no cluster. Requests are sent
+from --processes client processes with persistent HTTP connections, so the
+client is not the bottleneck. The mix (see MIX) uses multi-term queries cut
+from titles, company filters, date ranges from published dates, typeahead
+prefixes, list/initial-data loads and detail opens of known URLs. --output
+writes JSON; --compare prints p50/p99/throughput deltas against an earlier
+--output file.
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlencode, urlsplit
+
+# (name, weight): relative frequency of each request kind in the mix
+MIX = [
+    ("query", 30),
+    ("query_company", 12),
+    ("query_dates", 8),
+    ("filter_company", 8),
+    ("detail", 15),
+    ("suggest", 12),
+    ("initial_data", 5),
+    ("paginated", 5),
+    ("search", 5),
+]
+
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "is", "of", "on",
+    "or", "the", "to", "with", "its", "new", "first", "data", "us", "u.s.",
+}
+
+
+class QueryMix:
+    def __init__(self, records, seed: int = 0):
+        self.random = random.Random(seed)
+        self.companies = sorted({r["company"] for r in records if r.get("company")})
+        self.urls = [r["url"] for r in records if r.get("url")]
+        self.dates = sorted(r["published_date"] for r in records if r.get("published_date"))
+        self.phrases = []
+        self.prefixes = []
+        for record in records:
+            words = [
+                word for word in re.findall(r"[A-Za-z][\w\-]+", record.get("title") or "")
+                if word.lower() not in STOPWORDS and len(word) > 2
+            ]
+            for size in (2, 3):
+                for start in range(0, max(0, len(words) - size + 1), size):
+                    self.phrases.append(" ".join(words[start:start + size]))
+            self.prefixes.extend(word[:self.random.randint(2, min(5, len(word)))] for word in words[:3])
+        self.weights = [weight for _, weight in MIX]
+        self.kinds = [name for name, _ in MIX]
+
+    def date_range(self):
+        start = date.fromisoformat(self.random.choice(self.dates))
+        end = start + timedelta(days=self.random.choice([7, 30, 90, 365]))
+        return start.isoformat(), end.isoformat()
+
+    def next(self):
+        """(endpoint label, path with query string) for the next request."""
+        rnd = self.random
+        kind = rnd.choices(self.kinds, weights=self.weights)[0]
+        if kind == "query":
+            return "/api/query-press-releases", {"query": rnd.choice(self.phrases)}
+        if kind == "query_company":
+            companies = rnd.sample(self.companies, k=min(len(self.companies), rnd.randint(1, 2)))
+            return "/api/query-press-releases", {"query": rnd.choice(self.phrases), "company": companies}
+        if kind == "query_dates":
+            start, end = self.date_range()
+            return "/api/query-press-releases", {"start_date": start, "end_date": end}
+        if kind == "filter_company":
+            return "/api/filter-press-releases", {"company": [rnd.choice(self.companies)]}
+        if kind == "detail":
+            return "/api/press-releases/detail", {"url": rnd.choice(self.urls)}
+        if kind == "suggest":
+            return "/api/suggest", {"q": rnd.choice(self.prefixes)}
+        if kind == "initial_data":
+            return "/api/initial-data", {}
+        if kind == "paginated":
+            return "/press-releases/all", {"page": rnd.randint(1, 5), "size": 10}
+        return "/api/search", {"q": rnd.choice(self.phrases)}
+
+
+def load_records(source):
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def client_process(base_url, source, seed, threads, duration):
+    """Run `threads` closed-loop clients for `duration` seconds; returns [(endpoint, ms, status)]."""
+    import threading
+
+    records = load_records(source)
+    parts = urlsplit(base_url)
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def run(thread_seed):
+        mix = QueryMix(records, seed=thread_seed)
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        local = []
+        while time.monotonic() < deadline:
+            endpoint, params = mix.next()
+            path = endpoint + ("?" + urlencode(params, doseq=True) if params else "")
+            start = time.perf_counter()
+            try:
+                connection.request("GET", path, headers={"Accept-Encoding": "gzip"})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except Exception:
+                status = 0
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            local.append((endpoint, (time.perf_counter() - start) * 1000, status))
+        connection.close()
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=run, args=(seed * 1000 + i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return samples
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return round(sorted_values[index], 2)
+
+
+def summarize(samples, duration):
+    by_endpoint = defaultdict(list)
+    for endpoint, elapsed, status in samples:
+        by_endpoint[endpoint].append((elapsed, status))
+    by_endpoint["ALL"] = [(elapsed, status) for _, elapsed, status in samples]
+
+    summary = {}
+    for endpoint, values in sorted(by_endpoint.items()):
+        latencies = sorted(elapsed for elapsed, _ in values)
+        errors = sum(1 for _, status in values if status == 0 or status >= 500)
+        summary[endpoint] = {
+            "requests": len(values),
+            "errors": errors,
+            "rps": round(len(values) / duration, 1),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+        }
+    return summary
+
+
+def wait_healthy(base_url, timeout):
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=2)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return True
+        except Exception:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def start_server(port, workers, backend, server):
+    env = {**os.environ, "SEARCH_BACKEND": backend, "PYTHONUNBUFFERED": "1"}
+    if server == "launcher":
+        # Pre-forked workers sharing one result cache (launcher.py)
+        command = [sys.executable, "services.py", str(port), "--host", "127.0.0.1", "--workers", str(workers)]
+    else:
+        command = [sys.executable, "-m", "uvicorn", "services:app", "--host", "127.0.0.1",
+                   "--port", str(port), "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    return subprocess.Popen(command, env=env)
+
+
+def run_load(base_url, args):
+    per_process = max(1, args.concurrency // args.processes)
+    # Short warm-up so caches, tries and connection pools are built before measuring
+    client_process(base_url, args.source, args.seed, per_process, args.warmup)
+    with ProcessPoolExecutor(max_workers=args.processes) as pool:
+        futures = [
+            pool.submit(client_process, base_url, args.source, args.seed + i + 1, per_process, args.duration)
+            for i in range(args.processes)
+        ]
+        samples = [sample for future in futures for sample in future.result()]
+    return summarize(samples, args.duration)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_runs(runs):
+    print(f"{'workers':>8}  {'endpoint':<30}{'requests':>10}{'errors':>8}{'rps':>10}"
+          f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for run in runs:
+        for endpoint, stats in run["endpoints"].items():
+            print(f"{run['workers']:>8}  {endpoint:<30}{stats['requests']:>10}{stats['errors']:>8}"
+                  f"{stats['rps']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+
+def print_comparison(runs, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {
+        (run["workers"], endpoint): stats
+        for run in baseline.get("runs", [])
+        for endpoint, stats in run["endpoints"].items()
+    }
+
+    def delta(new, old):
+        if not new or not old:
+            return "n/a"
+        return f"{(new - old) / old * 100:+.1f}%"
+
+    print(f"\nvs {baseline_path} ({baseline.get('meta', {}).get('revision')})")
+    print(f"{'workers':>8}  {'endpoint':<30}{'rps':>10}{'p50':>10}{'p99':>10}")
+    for run in runs:
+        for endpoint, stats in run["endpoints"].items():
+            old = previous.get((run["workers"], endpoint))
+            if old is None:
+                continue
+            print(f"{run['workers']:>8}  {endpoint:<30}{delta(stats['rps'], old['rps']):>10}"
+                  f"{delta(stats['p50_ms'], old['p50_ms']):>10}{delta(stats['p99_ms'], old['p99_ms']):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--backend", default="local", choices=["local", "elasticsearch", "auto"])
+    parser.add_argument("--server", default="uvicorn", choices=["uvicorn", "launcher"],
+                        help="uvicorn --workers, or services.py's pre-forking launcher with the shared cache")
+    parser.add_argument("--base-url", help="load an already running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated uvicorn worker counts")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per worker count")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--processes", type=int, default=4, help="client processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier --output run")
+    args = parser.parse_args()
+
+    runs = []
+    if args.base_url:
+        runs.append({"workers": None, "endpoints": run_load(args.base_url, args)})
+    else:
+        for workers in [int(value) for value in args.workers.split(",") if value.strip()]:
+            base_url = f"http://127.0.0.1:{args.port}"
+            server = start_server(args.port, workers, args.backend, args.server)
+            try:
+                if not wait_healthy(base_url, timeout=120):
+                    raise SystemExit(f"server with {workers} workers did not become healthy")
+                print(f"running {args.duration:.0f}s at concurrency {args.concurrency} with {workers} worker(s)")
+                runs.append({"workers": workers, "endpoints": run_load(base_url, args)})
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+
+    print_runs(runs)
+    result = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "backend": None if args.base_url else args.backend,
+            "server": None if args.base_url else args.server,
+            "base_url": args.base_url,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "processes": args.processes,
+            "seed": args.seed,
+            "mix": dict(MIX),
+        },
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {args.output}")
+    if args.compare:
+        print_comparison(runs, args.compare)
+
+
+if __name__ == "__main__":
+    main()
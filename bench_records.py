@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Allocations and peak memory of turning highlighted hits into API results,
+legacy per-hit dicts vs. PressReleaseHit/SnippetMatch records.
+Run: python3 bench_records.py [--scale 50] [--query "cancer trial"] [--repeat 5]
+
+Hits and highlights come from the in-process index built over
+press_releases.json replicated --scale times. "dicts" is the pipeline before
+records.py: build_query_results produced a dict per hit plus two dicts per
+match, and services.py copied every hit again into a response dict.
+"""
+
+import argparse
+import dataclasses
+import re
+import time
+import tracemalloc
+from typing import Dict
+
+from elasticsearch_service import build_query_results, contains_query, context_snippet, query_terms
+from local_search_service import LocalSearchIndex
+from snapshot_store import iter_snapshot_records
+
+
+def legacy_build_query_results(hits, query_text, terms):
+    raw_results = []
+    snippet_frequency: Dict[str, int] = {}
+
+    for doc, highlight in hits:
+        matches = []
+        for field_name in ["title", "full_text"]:
+            for snippet in highlight.get(field_name, []):
+                plain_text = re.sub(r"</?mark>", "", snippet)
+                normalized = " ".join(plain_text.lower().split())
+                snippet_frequency[normalized] = snippet_frequency.get(normalized, 0) + 1
+                matches.append({
+                    "field": field_name,
+                    "field_label": "Title" if field_name == "title" else "Content",
+                    "snippet": snippet,
+                    "plain_text": plain_text,
+                    "normalized": normalized,
+                })
+        raw_results.append(({
+            "title": doc.get("title"),
+            "company": doc.get("company"),
+            "published_date": doc.get("published_date"),
+            "url": doc.get("url"),
+            "full_text": doc.get("full_text"),
+            "matches": matches,
+        }, doc))
+
+    results = []
+    for item, doc in raw_results:
+        def rank_key(match):
+            is_title_match = 0 if match.get("field") == "title" else 1
+            return (is_title_match, snippet_frequency.get(match.get("normalized", ""), 0),
+                    len(match.get("plain_text", "")))
+
+        ranked_matches = sorted(item.get("matches", []), key=rank_key)
+        cleaned_matches = []
+        seen_norm = set()
+        for match in ranked_matches:
+            norm = match.get("normalized")
+            plain_text = match.get("plain_text", "")
+            if query_text and terms and not contains_query(plain_text, terms):
+                continue
+            if norm in seen_norm:
+                continue
+            if match.get("field") == "full_text" and snippet_frequency.get(norm, 0) > 1:
+                continue
+            seen_norm.add(norm)
+            cleaned_matches.append({key: match.get(key) for key in ("field", "field_label", "snippet", "plain_text")})
+
+        if not cleaned_matches and ranked_matches:
+            fallback = ranked_matches[0]
+            if not query_text or contains_query(fallback.get("plain_text", ""), terms):
+                cleaned_matches.append({key: fallback.get(key) for key in ("field", "field_label", "snippet", "plain_text")})
+
+        if query_text and not cleaned_matches:
+            fallback_text = context_snippet(doc, terms)
+            if contains_query(fallback_text, terms):
+                cleaned_matches.append({"field": "full_text", "field_label": "Content",
+                                        "snippet": fallback_text, "plain_text": fallback_text})
+
+        item["matches"] = cleaned_matches[:3]
+        summary = cleaned_matches[0]["plain_text"] if cleaned_matches else ""
+        if query_text and terms and not contains_query(summary, terms):
+            query_context = context_snippet(doc, terms)
+            if contains_query(query_context, terms):
+                summary = query_context
+        item["summary"] = summary
+        results.append(item)
+    return results
+
+
+def legacy_pipeline(hits, query_text, terms):
+    results = legacy_build_query_results(hits, query_text, terms)
+    # services.press_release_to_dict
+    return [
+        {key: r.get(key) for key in ("title", "company", "published_date", "url", "summary", "matches")}
+        for r in results
+    ]
+
+
+def measure(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = snapshot_after.compare_to(snapshot_before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return result, best, peak, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument("--query", default="cancer trial")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    base = list(iter_snapshot_records(args.source))
+    records = [
+        {**record, "url": f"{record.get('url')}#{copy}"}
+        for copy in range(args.scale)
+        for record in base
+    ]
+    index = LocalSearchIndex.build(records)
+    terms = query_terms(args.query)
+    hits = [(doc, index.highlight(doc, args.query, terms)) for doc in index.docs]
+
+    legacy, legacy_time, legacy_peak, legacy_blocks = measure(
+        lambda: legacy_pipeline(hits, args.query, terms), args.repeat)
+    current, current_time, current_peak, current_blocks = measure(
+        lambda: build_query_results(hits, args.query, terms), args.repeat)
+
+    if [dataclasses.asdict(hit) for hit in current] != legacy:
+        raise SystemExit("legacy/record results differ")
+
+    print(f"{len(hits)} hits, query {args.query!r}")
+    print(f"{'pipeline':<10}{'ms':>10}{'peak KiB':>12}{'live blocks':>14}")
+    print(f"{'dicts':<10}{legacy_time * 1000:>10.1f}{legacy_peak / 1024:>12.0f}{legacy_blocks:>14}")
+    print(f"{'records':<10}{current_time * 1000:>10.1f}{current_peak / 1024:>12.0f}{current_blocks:>14}")
+
+
+if __name__ == "__main__":
+    main()
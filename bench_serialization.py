@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Serialization time for a 1000-hit /api/query-press-releases response.
+Run: python3 bench_serialization.py [--hits 1000] [--repeat 20]
+
+"before" rebuilds each hit as a dict, runs the payload through FastAPI's
+jsonable_encoder and renders it with the stdlib json module, as the API did
+before api_models. "after" renders the services' PressReleaseHit records
+with FastJSONResponse (orjson when installed).
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+import api_models
+from api_models import FastJSONResponse
+from records import PressReleaseHit, SnippetMatch
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def make_hits(source, count):
+    with open(source, "r", encoding="utf-8") as f:
+        docs = json.load(f)
+
+    hits = []
+    for i in range(count):
+        doc = docs[i % len(docs)]
+        text = doc.get("full_text") or ""
+        hits.append({
+            "title": doc.get("title"),
+            "company": doc.get("company"),
+            "published_date": doc.get("published_date"),
+            "url": f"{doc.get('url')}#{i}",
+            "summary": text[:200],
+            "matches": [
+                {"field": "title", "field_label": "Title", "snippet": doc.get("title") or "",
+                 "plain_text": doc.get("title") or ""},
+                {"field": "full_text", "field_label": "Content", "snippet": text[200:400],
+                 "plain_text": text[200:400]},
+            ],
+        })
+    return hits
+
+
+def press_release_to_dict(pr):
+    return {
+        'title': pr.get('title'),
+        'company': pr.get('company'),
+        'published_date': pr.get('published_date'),
+        'url': pr.get('url'),
+        'summary': pr.get('summary', ''),
+        'matches': pr.get('matches', []),
+    }
+
+
+def render_before(hits):
+    data = [press_release_to_dict(r) for r in hits]
+    payload = jsonable_encoder({'status': 'success', 'data': data, 'count': len(data)})
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def as_records(hits):
+    return [
+        PressReleaseHit(
+            hit["title"], hit["company"], hit["published_date"], hit["url"], hit["summary"],
+            [SnippetMatch(m["field"], m["field_label"], m["snippet"], m["plain_text"]) for m in hit["matches"]],
+        )
+        for hit in hits
+    ]
+
+
+def render_after(records):
+    return FastJSONResponse({'status': 'success', 'data': records, 'count': len(records)}).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--hits", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    hits = make_hits(args.source, args.hits)
+    records = as_records(hits)
+    before = render_before(hits)
+    after = render_after(records)
+    if json.loads(before) != json.loads(after):
+        raise SystemExit("before/after payloads differ")
+
+    backend = "orjson" if api_models.orjson is not None else "json"
+    print(f"{args.hits} hits, {len(after)} bytes, FastJSONResponse backend: {backend}")
+    print(f"{'path':<10}{'ms':>10}")
+    t_before = best_of(args.repeat, lambda: render_before(hits)) * 1000
+    t_after = best_of(args.repeat, lambda: render_after(records)) * 1000
+    print(f"{'before':<10}{t_before:>10.2f}")
+    print(f"{'after':<10}{t_after:>10.2f}")
+    print(f"speedup: {t_before / t_after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading press release snapshots in each supported format.
+Run: python3 bench_snapshot.py [--scale 50] [--repeat 5]
+
+The source press_releases.json is replicated --scale times so the numbers
+reflect a corpus that has grown over many crawls.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from snapshot_store import ColumnarSnapshot, iter_snapshot_records, write_snapshot
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--scale", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.source) as f:
+        base = json.load(f)
+
+    records = []
+    for copy in range(args.scale):
+        for record in base:
+            records.append({**record, "url": f"{record.get('url')}#{copy}"})
+
+    print(f"{len(records)} records ({len(base)} x {args.scale})\n")
+    print(f"{'case':<34}{'size (KB)':>12}{'time (ms)':>12}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = {}
+        for fmt in ["json", "jsonl", "jsonl.gz", "prsnap"]:
+            paths[fmt] = os.path.join(workdir, f"snapshot.{fmt}")
+            write_snapshot(records, paths[fmt])
+
+        def load_json():
+            with open(paths["json"]) as f:
+                json.load(f)
+
+        def stream(fmt, include_full_text=True):
+            def run():
+                for _ in iter_snapshot_records(paths[fmt], include_full_text=include_full_text):
+                    pass
+            return run
+
+        def mmap_columns():
+            with ColumnarSnapshot(paths["prsnap"]) as snapshot:
+                for field in ("company", "published_date", "title"):
+                    snapshot.column(field)
+
+        cases = [
+            ("json: json.load (baseline)", "json", load_json),
+            ("jsonl: stream records", "jsonl", stream("jsonl")),
+            ("jsonl.gz: stream records", "jsonl.gz", stream("jsonl.gz")),
+            ("prsnap: stream records", "prsnap", stream("prsnap")),
+            ("prsnap: stream without full_text", "prsnap", stream("prsnap", include_full_text=False)),
+            ("prsnap: mmap company/date/title", "prsnap", mmap_columns),
+        ]
+
+        for label, fmt, fn in cases:
+            size_kb = os.path.getsize(paths[fmt]) / 1024
+            elapsed_ms = best_of(args.repeat, fn) * 1000
+            print(f"{label:<34}{size_kb:>12.0f}{elapsed_ms:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
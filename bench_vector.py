@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Latency of the hybrid (BM25 + kNN) search stages at growing corpus sizes.
+Run: python3 bench_vector.py [--docs 10000 100000] [--query "weight management"]
+     python3 bench_vector.py --elastic --docs 10000   # against a running Elasticsearch
+
+The corpus is press_releases.json replicated up to each size. Locally it
+times fitting the embedding model, embedding the corpus and a query,
+brute-force cosine kNN (what the local backend does) and rank fusion.
+With --elastic it indexes a scratch index with the current mapping and
+compares lexical, HNSW kNN and hybrid query_documents latency.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from elasticsearch_service import ElasticsearchService
+from embeddings import Embedder, document_text, reciprocal_rank_fusion
+from snapshot_store import iter_snapshot_records
+
+BENCH_INDEX = "press_releases_vector_bench"
+
+
+def replicate(base, count):
+    return [
+        {**base[i % len(base)], "url": f"{base[i % len(base)].get('url')}#{i // len(base)}"}
+        for i in range(count)
+    ]
+
+
+def best_ms(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+
+def bench_local(documents, query, k, repeat):
+    texts = [document_text(doc) for doc in documents]
+    fit_ms, model = best_ms(lambda: Embedder.fit(texts), 1)
+    embed_ms, vectors = best_ms(lambda: model.transform(texts), 1)
+    query_ms, query_vector = best_ms(lambda: np.asarray(model.embed(query), dtype=np.float32), repeat)
+
+    def knn():
+        similarities = vectors @ query_vector
+        top = np.argpartition(-similarities, k)[:k]
+        return top[np.argsort(-similarities[top])].tolist()
+
+    knn_ms, semantic = best_ms(knn, repeat)
+    lexical = list(range(k))
+    rrf_ms, _ = best_ms(lambda: reciprocal_rank_fusion([lexical, semantic]), repeat)
+    return fit_ms, embed_ms, query_ms, knn_ms, rrf_ms
+
+
+def bench_elastic(documents, query, k, repeat):
+    service = ElasticsearchService()
+    if not service.client:
+        print("Cannot connect to Elasticsearch. Make sure it's running.")
+        return None
+    service.index_name = BENCH_INDEX
+    if service.client.indices.exists(index=BENCH_INDEX):
+        service.client.indices.delete(index=BENCH_INDEX)
+    service.ensure_index()
+    service.embedder = Embedder.fit([document_text(doc) for doc in documents])
+    service.bulk_index(documents)
+    service.client.indices.refresh(index=BENCH_INDEX)
+
+    def run(mode):
+        return service.query_documents(query_text=query, limit=k, include_highlights=False, search_mode=mode)
+
+    try:
+        lexical_ms, _ = best_ms(lambda: run("lexical"), repeat)
+        hybrid_ms, _ = best_ms(lambda: run("hybrid"), repeat)
+        vector = service.embedder.embed(query)
+        knn_ms, _ = best_ms(lambda: service.client.search(index=BENCH_INDEX, body={
+            "knn": {"field": "embedding", "query_vector": vector, "k": k,
+                    "num_candidates": max(service.knn_num_candidates, k)},
+            "size": k, "_source": False,
+        }), repeat)
+    finally:
+        service.client.indices.delete(index=BENCH_INDEX)
+    return lexical_ms, knn_ms, hybrid_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--docs", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--query", default="weight management")
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--elastic", action="store_true")
+    args = parser.parse_args()
+
+    base = list(iter_snapshot_records(args.source))
+    print(f"query={args.query!r}, k={args.k}, ms (best of {args.repeat})\n")
+    if args.elastic:
+        print(f"{'docs':>8}{'lexical':>10}{'knn':>10}{'hybrid':>10}")
+    else:
+        print(f"{'docs':>8}{'fit':>10}{'embed all':>11}{'embed q':>10}{'knn':>10}{'rrf':>10}")
+
+    for count in args.docs:
+        documents = replicate(base, count)
+        if args.elastic:
+            timings = bench_elastic(documents, args.query, args.k, args.repeat)
+            if timings is None:
+                return
+            print(f"{count:>8}" + "".join(f"{value:>10.1f}" for value in timings))
+        else:
+            fit_ms, embed_ms, query_ms, knn_ms, rrf_ms = bench_local(documents, args.query, args.k, args.repeat)
+            print(f"{count:>8}{fit_ms:>10.0f}{embed_ms:>11.0f}{query_ms:>10.2f}{knn_ms:>10.2f}{rrf_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Bounded in-process cache of press release detail documents.
+
+Entries are evicted least-recently-used first once their combined size
+exceeds max_bytes, and expire after ttl seconds so a reindex is picked up
+without a restart. Each entry carries a content ETag for conditional GETs.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DETAIL_FIELDS = ["title", "company", "published_date", "url", "full_text", "related"]
+
+
+def document_etag(doc: Dict) -> str:
+    """Strong ETag over the fields the detail endpoint returns."""
+    digest = hashlib.blake2b(digest_size=16)
+    for field in DETAIL_FIELDS:
+        digest.update(str(doc.get(field) or "").encode("utf-8"))
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def document_size(doc: Dict) -> int:
+    """Approximate memory cost of a document: its string payload plus per-entry overhead."""
+    return 200 + sum(len(str(value)) for value in doc.values() if value is not None)
+
+
+class DetailCache:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Dict, str, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Tuple[Dict, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            doc, etag, size, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return doc, etag
+
+    def put(self, key: str, doc: Dict) -> str:
+        etag = document_etag(doc)
+        size = document_size(doc)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return etag
+            self._entries[key] = (doc, etag, size, time.monotonic())
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+        return etag
+
+    def _remove(self, key: str):
+        _, _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
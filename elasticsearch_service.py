@@ -1,11 +1,28 @@
 from elasticsearch import Elasticsearch
-from elasticsearch.exceptions import ConnectionError, RequestError, NotFoundError
-from typing import List, Dict, Optional
+from elasticsearch.exceptions import RequestError, NotFoundError
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+import copy
 import json
 import ssl
 import os
 import importlib
+import queue
 import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from detail_cache import DetailCache
+from records import PressReleaseHit, SnippetMatch
+from passages import find_passage, iter_passages, passage_documents
+from suggest_index import extract_drug_names
+from synonyms import expand_synonyms, load_synonym_rules
+from embeddings import EMBEDDING_DIMS, document_text, load_embedder, reciprocal_rank_fusion, refresh_embedder
+from related import RELATED_TOP_K, compute_related
+from entities import ENTITY_FIELDS, ENTITY_FILTERS, entity_filter_values, extract_entities
+from alerts import AlertStore
+from profiling import NULL_TIMER, StageTimer, summarize_profile
+from admission import AdmissionGate, Overloaded, SingleFlight
 
 try:
     dotenv_module = importlib.import_module("dotenv")
@@ -13,15 +30,313 @@ try:
 except Exception:
     pass
 
+
+# Ingest-only fields that list/detail responses never need from _source
+DETAIL_EXCLUDES = ["passages", "suggest", "embedding"]
+# List/search hits also skip the precomputed related releases (detail view only)
+SOURCE_EXCLUDES = DETAIL_EXCLUDES + ["related"]
+
+# Fields of a full press release result; _source filtered to these is
+# returned as-is instead of being copied into a new dict
+RESULT_FIELDS = ["title", "company", "published_date", "url", "full_text"]
+
+DEFAULT_FILTER_FIELDS = [
+    {
+        "key": "query",
+        "label": "Search",
+        "type": "text",
+        "enabled": True,
+        "placeholder": "Search by title or full text...",
+    },
+    {
+        "key": "company",
+        "label": "Company",
+        "type": "multi-select",
+        "enabled": True,
+    },
+    {
+        "key": "start_date",
+        "label": "Start Date",
+        "type": "date",
+        "enabled": True,
+    },
+    {
+        "key": "end_date",
+        "label": "End Date",
+        "type": "date",
+        "enabled": True,
+    },
+] + [
+    # Keyword fields filled by entities.extract_entities at ingest
+    {
+        "key": key,
+        "label": label,
+        "type": "keyword",
+        "field": field,
+        "enabled": True,
+    }
+    for key, field, label in ENTITY_FILTERS
+]
+
+
+def index_sort_unsupported(error: RequestError) -> bool:
+    """The 400 older clusters return for index sorting on a mapping with nested fields."""
+    reason = str(error.info or error)
+    return "index sort" in reason and "nested" in reason
+
+
+def empty_filter_options() -> Dict:
+    return {
+        "companies": [],
+        "date_range": {"min": None, "max": None},
+        **{field: [] for field in ENTITY_FIELDS},
+    }
+
+
+def merge_filter_fields(fields: List[Dict]) -> List[Dict]:
+    """Stored filter fields plus any default field added since the config was written."""
+    known = {field.get("key") for field in fields}
+    return fields + [copy.deepcopy(field) for field in DEFAULT_FILTER_FIELDS if field["key"] not in known]
+
+
+STEM_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ied", "ed", "es", "al", "s", "y")
+
+
+def light_stem(term: str) -> str:
+    """
+    Crude suffix stripping, so a substring test on the stem also accepts the
+    inflections the english analyzer conflates ("approvals" -> "approv").
+    """
+    changed = True
+    while changed:
+        changed = False
+        for suffix in STEM_SUFFIXES:
+            if term.endswith(suffix) and len(term) - len(suffix) >= 4 and not term.endswith("ss"):
+                term = term[:-len(suffix)]
+                changed = True
+                break
+    return term
+
+
+def query_terms(text: Optional[str]) -> List[str]:
+    """
+    Lower-cased query term stems plus their pharma synonyms, for matching
+    snippets client-side (and the local backend). Elasticsearch itself gets
+    the raw query text and does stemming/synonyms in its analyzers.
+    """
+    if not text:
+        return []
+    expanded = []
+    seen = set()
+    candidates = [light_stem(part.lower()) for part in str(text).split() if len(part.strip()) > 1]
+    candidates.extend(expand_synonyms(text))
+    for term in candidates:
+        normalized = term.strip()
+        if len(normalized) <= 1 or normalized in seen:
+            continue
+        seen.add(normalized)
+        expanded.append(normalized)
+    return expanded
+
+
+def contains_query(text: Optional[str], terms: List[str]) -> bool:
+    """True if any term occurs in the whitespace-normalized, lower-cased text."""
+    normalized = " ".join(str(text or "").lower().split())
+    if not normalized or not terms:
+        return False
+    return any(term in normalized for term in terms)
+
+
+def extract_context_snippet(text: Optional[str], terms: List[str], max_len: int = 240) -> str:
+    """Window of max_len characters around the first term occurrence in text."""
+    source = " ".join(str(text or "").split())
+    if not source:
+        return ""
+    if not terms:
+        return source[:max_len]
+
+    lowered = source.lower()
+    first_index = -1
+    for term in terms:
+        idx = lowered.find(term)
+        if idx != -1 and (first_index == -1 or idx < first_index):
+            first_index = idx
+
+    if first_index == -1:
+        return source[:max_len]
+
+    half = max_len // 2
+    start = max(0, first_index - half)
+    end = min(len(source), start + max_len)
+    if end - start < max_len:
+        start = max(0, end - max_len)
+
+    prefix = "..." if start > 0 else ""
+    suffix = "..." if end < len(source) else ""
+    return f"{prefix}{source[start:end].strip()}{suffix}"
+
+
+def context_snippet(doc: Dict, terms: List[str]) -> str:
+    """
+    Fallback snippet for a hit: the first precomputed passage containing a
+    term, or a scan of full_text for documents indexed without passages.
+    """
+    passages = iter_passages(doc)
+    if passages is None:
+        return extract_context_snippet(doc.get("full_text"), terms)
+    return find_passage(passages, terms) or ""
+
+
+def build_query_results(
+    hits: Iterable[Tuple[Dict, Dict]],
+    query_text: Optional[str],
+    terms: List[str],
+    timer=NULL_TIMER,
+) -> List[PressReleaseHit]:
+    """
+    Turn (source document, highlight fragments) pairs into API results with
+    ranked, de-duplicated matches and a summary snippet. timer (a
+    profiling.StageTimer) receives the highlight_parsing, ranking and
+    fallback_snippets stages.
+    """
+    raw_results = []
+    snippet_frequency: Dict[str, int] = {}
+
+    with timer.stage("highlight_parsing"):
+        for doc, highlight in hits:
+            # (match, normalized text) pairs; the normalized form is only needed
+            # for ranking and de-duplication, so it never lands on the record
+            matches = []
+
+            for field_name, field_label in (("title", "Title"), ("full_text", "Content")):
+                for snippet in highlight.get(field_name, ()):
+                    plain_text = re.sub(r"</?mark>", "", snippet)
+                    normalized = " ".join(plain_text.lower().split())
+                    snippet_frequency[normalized] = snippet_frequency.get(normalized, 0) + 1
+                    matches.append((SnippetMatch(field_name, field_label, snippet, plain_text), normalized))
+
+            raw_results.append((doc, matches))
+
+    def rank_key(pair: Tuple[SnippetMatch, str]):
+        match, normalized = pair
+        is_title_match = 0 if match.field == "title" else 1
+        return (is_title_match, snippet_frequency.get(normalized, 0), len(match.plain_text))
+
+    results = []
+    with timer.stage("ranking"):
+        for doc, matches in raw_results:
+            ranked_matches = sorted(matches, key=rank_key) if len(matches) > 1 else matches
+            cleaned_matches = []
+            seen_norm = set()
+            for match, norm in ranked_matches:
+                if query_text and terms and not contains_query(match.plain_text, terms):
+                    continue
+
+                if norm in seen_norm:
+                    continue
+                if match.field == "full_text" and snippet_frequency.get(norm, 0) > 1:
+                    continue
+                seen_norm.add(norm)
+                cleaned_matches.append(match)
+
+            if not cleaned_matches and ranked_matches:
+                fallback = ranked_matches[0][0]
+                if not query_text or contains_query(fallback.plain_text, terms):
+                    cleaned_matches.append(fallback)
+
+            if query_text and not cleaned_matches:
+                with timer.stage("fallback_snippets"):
+                    fallback_text = context_snippet(doc, terms)
+                if contains_query(fallback_text, terms):
+                    cleaned_matches.append(SnippetMatch("full_text", "Content", fallback_text, fallback_text))
+
+            summary = cleaned_matches[0].plain_text if cleaned_matches else ""
+            if query_text and terms and not contains_query(summary, terms):
+                with timer.stage("fallback_snippets"):
+                    query_context = context_snippet(doc, terms)
+                if contains_query(query_context, terms):
+                    summary = query_context
+
+            hit = PressReleaseHit.from_source(doc)
+            hit.summary = summary
+            hit.matches = cleaned_matches[:3]
+            results.append(hit)
+
+    return results
+
+
 class ElasticsearchService:
     def __init__(self, host='localhost', port=9200, 
                  username=None, password=None,
-                 ca_fingerprint='42e84f052048c3ed524278a39368647ed367f8e3b55ca02be52c74e27528c20c'):
+                 ca_fingerprint='42e84f052048c3ed524278a39368647ed367f8e3b55ca02be52c74e27528c20c',
+                 lazy: bool = False):
         """
         Initialize Elasticsearch client with security enabled.
+
+        With lazy=True no request is made here: `client` stays None until
+        check_connection() (or the start_reconnect() loop) reaches the
+        cluster, so the API can start while Elasticsearch is still down.
         """
         self.index_name = 'press_releases'
+        # Synonyms API set behind the english_search analyzer
+        self.synonym_set = os.getenv('ELASTIC_SYNONYM_SET', 'pharma-synonyms')
         self.filter_config_index = 'press_release_filter_config'
+        # "unified" reads offsets from the stored term vectors; "fvh" is the
+        # fast vector highlighter; "plain" re-analyzes (slowest).
+        self.highlighter_type = os.getenv('ELASTIC_HIGHLIGHTER', 'unified')
+        # Only the first N hits of a query are highlighted; the rest get
+        # passage-based snippets. 0 highlights every hit.
+        self.highlight_top_hits = int(os.getenv('ELASTIC_HIGHLIGHT_TOP_HITS', '100'))
+        self.filter_config_ttl = float(os.getenv('ELASTIC_FILTER_CONFIG_TTL', '300'))
+        # Hybrid BM25 + kNN search (see embeddings.py); "lexical" unless SEARCH_MODE=hybrid
+        self.search_mode = os.getenv('SEARCH_MODE', 'lexical').lower()
+        self.embedder = load_embedder()
+        # Fingerprint of the model behind the indexed vectors (index _meta); None until read
+        self._indexed_embedding_model: Optional[Tuple] = None
+        self.knn_k = int(os.getenv('ELASTIC_KNN_K', '100'))
+        self.knn_num_candidates = int(os.getenv('ELASTIC_KNN_NUM_CANDIDATES', '200'))
+        self.rrf_rank_constant = int(os.getenv('RRF_RANK_CONSTANT', '60'))
+        # Batch queries (query_documents_batch): searches per _msearch, requests in flight
+        self.msearch_chunk_size = max(1, int(os.getenv('ELASTIC_MSEARCH_CHUNK', '50')))
+        self.msearch_concurrency = max(1, int(os.getenv('ELASTIC_MSEARCH_CONCURRENCY', '4')))
+        # /api/export: parallel PIT slices, hits per search_after page, PIT keep-alive
+        self.export_slices = max(1, int(os.getenv('ELASTIC_EXPORT_SLICES', '4')))
+        self.export_page_size = max(1, int(os.getenv('ELASTIC_EXPORT_PAGE_SIZE', '1000')))
+        self.export_keep_alive = os.getenv('ELASTIC_EXPORT_KEEP_ALIVE', '2m')
+        self.detail_cache = DetailCache(
+            max_bytes=int(os.getenv('DETAIL_CACHE_MAX_BYTES', str(32 * 1024 * 1024))),
+            ttl=float(os.getenv('DETAIL_CACHE_TTL', '300')),
+        )
+        self._filter_config_cache = (None, 0.0)
+        # Whether the index is sorted by date; None until read (index_sorted())
+        self._index_sorted: Optional[bool] = None
+        # Saved searches percolated against every bulk_index batch (see alerts.py)
+        self.alerts = AlertStore(self)
+        # Identical concurrent queries share one search; at most
+        # ELASTIC_MAX_CONCURRENT_QUERIES run at once (0 = unlimited), and a
+        # caller waiting longer than ELASTIC_ADMISSION_TIMEOUT gets Overloaded
+        self.single_flight = SingleFlight() if os.getenv('ELASTIC_COALESCE', 'true').lower() != 'false' else None
+        self.admission = AdmissionGate(
+            int(os.getenv('ELASTIC_MAX_CONCURRENT_QUERIES', '20')),
+            timeout=float(os.getenv('ELASTIC_ADMISSION_TIMEOUT', '1')),
+        )
+        # Only the paginated endpoint reports totals; the others just need the
+        # top N and can terminate early on the date-sorted index.
+        self.track_total_hits = {
+            "query_documents": False,
+            "get_all": False,
+            "filter_documents": False,
+            "search": False,
+            "get_all_paginated": True,
+        }
+        for item in os.getenv('ELASTIC_TRACK_TOTAL_HITS', '').split(','):
+            endpoint, _, value = item.partition('=')
+            if endpoint.strip() and value.strip():
+                value = value.strip().lower()
+                if value in ('true', 'false'):
+                    self.track_total_hits[endpoint.strip()] = value == 'true'
+                else:
+                    self.track_total_hits[endpoint.strip()] = int(value)
         host = os.getenv('ELASTIC_HOST', host)
         port = int(os.getenv('ELASTIC_PORT', str(port)))
         scheme = os.getenv('ELASTIC_SCHEME', 'https')
@@ -38,20 +353,171 @@ class ElasticsearchService:
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
         
+        # Connection pool and retry behaviour
+        keep_alive = os.getenv('ELASTIC_KEEP_ALIVE', 'true').lower() != 'false'
+        self.ping_timeout = float(os.getenv('ELASTIC_PING_TIMEOUT', '2'))
+        self.reconnect_interval = float(os.getenv('ELASTIC_RECONNECT_INTERVAL', '5'))
+
+        self.available = False
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._reconnect_thread = None
+
+        # Building the client does no network I/O
         try:
-            self.client = Elasticsearch(
+            self._client = Elasticsearch(
                 hosts=[f'{scheme}://{host}:{port}'],
                 basic_auth=basic_auth,
                 verify_certs=False,
                 ssl_show_warn=False,
+                connections_per_node=int(os.getenv('ELASTIC_POOL_SIZE', '10')),
+                headers={'connection': 'keep-alive' if keep_alive else 'close'},
+                http_compress=os.getenv('ELASTIC_HTTP_COMPRESS', 'false').lower() == 'true',
+                request_timeout=float(os.getenv('ELASTIC_REQUEST_TIMEOUT', '10')),
+                max_retries=int(os.getenv('ELASTIC_MAX_RETRIES', '3')),
+                retry_on_timeout=os.getenv('ELASTIC_RETRY_ON_TIMEOUT', 'true').lower() == 'true',
             )
-            # Test connection
-            if self.client.info():
-                print(" Connected to Elasticsearch")
-        except ConnectionError as e:
-            print(f"Failed to connect to Elasticsearch: {e}")
-            self.client = None
+        except Exception as e:
+            print(f"Failed to create Elasticsearch client: {e}")
+            self._client = None
+
+        if not lazy:
+            self.check_connection()
+
+    @property
+    def client(self) -> Optional[Elasticsearch]:
+        """The Elasticsearch client while the cluster is reachable, else None."""
+        return self._client if self.available else None
+
+    def check_connection(self) -> bool:
+        """Ping the cluster once, recording reachability and round-trip latency."""
+        if self._client is None:
+            return False
+
+        first_check = self.checked_at is None
+        start = time.perf_counter()
+        try:
+            self._client.options(request_timeout=self.ping_timeout, max_retries=0).info()
+            reachable, error = True, None
+        except Exception as e:
+            reachable, error = False, str(e)
+        self.checked_at = time.time()
+        self.latency_ms = round((time.perf_counter() - start) * 1000, 2) if reachable else None
+        self.last_error = error
+
+        if reachable and not self.available:
+            print(" Connected to Elasticsearch")
+        elif not reachable and (self.available or first_check):
+            print(f"Failed to connect to Elasticsearch: {error}")
+        self.available = reachable
+        return reachable
+
+    def start_reconnect(self):
+        """Re-check the connection every ELASTIC_RECONNECT_INTERVAL seconds in the background."""
+        if self._reconnect_thread is not None or self._client is None:
+            return
+
+        def loop():
+            while True:
+                self.check_connection()
+                time.sleep(self.reconnect_interval)
+
+        self._reconnect_thread = threading.Thread(target=loop, name="elasticsearch-reconnect", daemon=True)
+        self._reconnect_thread.start()
+
+    def health(self) -> Dict:
+        return {
+            "backend": "elasticsearch",
+            "reachable": self.available,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at,
+            "error": self.last_error,
+            # False: created unsorted, date-sorted top-N queries cannot stop early
+            "index_sorted": self.index_sorted(),
+            "admission": {
+                "limit": self.admission.max_concurrent,
+                "active": self.admission.active,
+                "rejected": self.admission.rejected,
+                "coalesced": self.single_flight.coalesced if self.single_flight else 0,
+            },
+        }
+
+    def gated(self, call, **kwargs):
+        """call(**kwargs), an Elasticsearch request, under admission control."""
+        return self.admission.run(lambda: call(**kwargs))
+
+    def _coalesced(self, key: str, compute):
+        """compute() through admission control, shared with identical in-flight calls."""
+        if self.single_flight is None:
+            return self.admission.run(compute)
+        return self.single_flight.do(key, lambda: self.admission.run(compute))
+
+    @staticmethod
+    def _query_key(name: str, params: Dict) -> str:
+        """
+        Coalescing key: whitespace in the query text and the order of
+        filter values do not change the result, so they are normalized away.
+        """
+        normalized = dict(params)
+        query_text = " ".join((normalized.get("query_text") or "").split())
+        normalized["query_text"] = query_text or None
+        normalized["companies"] = sorted(set(normalized.get("companies") or [])) or None
+        normalized["entities"] = {
+            field: sorted(set(values))
+            for field, values in (normalized.get("entities") or {}).items()
+            if values
+        }
+        return name + ":" + json.dumps(normalized, sort_keys=True, default=str)
     
+    def sync_synonyms(self) -> bool:
+        """
+        Upload pharma_synonyms.txt as the synonyms set. Elasticsearch reloads
+        every search analyzer using the set, so no reindex is needed.
+        """
+        if not self.client:
+            print("Elasticsearch client not initialized")
+            return False
+        try:
+            rules = load_synonym_rules()
+            self.client.synonyms.put_synonym(
+                id=self.synonym_set,
+                synonyms_set=[{"id": f"rule-{i}", "synonyms": rule} for i, rule in enumerate(rules)],
+            )
+            print(f"Synced {len(rules)} synonym rules to '{self.synonym_set}'")
+            return True
+        except Exception as e:
+            print(f"Error syncing synonyms: {e}")
+            return False
+
+    def analysis_settings(self, synonyms_set_available: bool) -> Dict:
+        """
+        english_text stems at index time; english_search adds the synonym
+        graph at query time only, so synonym edits never require a reindex.
+        """
+        if synonyms_set_available:
+            synonym_filter = {"type": "synonym_graph", "synonyms_set": self.synonym_set, "updateable": True}
+        else:
+            # Clusters without the Synonyms API: inline rules, updated by recreating the index
+            synonym_filter = {"type": "synonym_graph", "synonyms": load_synonym_rules()}
+        return {
+            "filter": {
+                "english_possessive_stemmer": {"type": "stemmer", "language": "possessive_english"},
+                "english_stemmer": {"type": "stemmer", "language": "english"},
+                "pharma_synonyms": synonym_filter,
+            },
+            "analyzer": {
+                "english_text": {
+                    "tokenizer": "standard",
+                    "filter": ["english_possessive_stemmer", "lowercase", "english_stemmer"],
+                },
+                "english_search": {
+                    "tokenizer": "standard",
+                    "filter": ["english_possessive_stemmer", "lowercase", "pharma_synonyms", "english_stemmer"],
+                },
+            },
+        }
+
     def ensure_index(self):
         """Create index with mappings if it doesn't exist."""
         if not self.client:
@@ -64,18 +530,75 @@ class ElasticsearchService:
                 return True
             
             mapping = {
+                "settings": {
+                    "analysis": self.analysis_settings(self.sync_synonyms()),
+                },
                 "mappings": {
                     "properties": {
                         "company": {"type": "keyword"},
-                        "title": {"type": "text", "analyzer": "standard"},
+                        **{field: {"type": "keyword"} for field in ENTITY_FIELDS},
+                        "title": {
+                            "type": "text",
+                            "analyzer": "english_text",
+                            "search_analyzer": "english_search",
+                            "term_vector": "with_positions_offsets",
+                        },
                         "published_date": {"type": "date"},
                         "url": {"type": "keyword"},
-                        "full_text": {"type": "text", "analyzer": "standard"}
+                        "full_text": {
+                            "type": "text",
+                            "analyzer": "english_text",
+                            "search_analyzer": "english_search",
+                            "term_vector": "with_positions_offsets",
+                        },
+                        "suggest": {"type": "completion", "analyzer": "simple"},
+                        # Written by update_related; stored, not searchable
+                        "related": {"type": "object", "enabled": False},
+                        "embedding": {
+                            "type": "dense_vector",
+                            "dims": EMBEDDING_DIMS,
+                            "index": True,
+                            "similarity": "cosine",
+                            "index_options": {"type": "hnsw", "m": 16, "ef_construction": 100},
+                        },
+                        "passages": {
+                            "type": "nested",
+                            "properties": {
+                                "position": {"type": "integer"},
+                                "text": {
+                                    "type": "text",
+                                    "analyzer": "english_text",
+                                    "search_analyzer": "english_search",
+                                },
+                            },
+                        },
                     }
                 }
             }
             
-            self.client.indices.create(index=self.index_name, body=mapping)
+            # Segments stored newest-first so date-sorted top-N queries can stop
+            # after N hits when total hits are not tracked
+            sorted_mapping = {
+                **mapping,
+                "settings": {
+                    **mapping["settings"],
+                    "index": {
+                        "sort.field": "published_date",
+                        "sort.order": "desc",
+                    },
+                },
+            }
+            try:
+                self.client.indices.create(index=self.index_name, body=sorted_mapping)
+                self._index_sorted = True
+            except RequestError as e:
+                # Older clusters reject index sorting together with nested fields;
+                # anything else is a real mapping/settings error
+                if not index_sort_unsupported(e):
+                    raise
+                print(f"Index sorting not supported ({e}); creating unsorted index (degraded)")
+                self.client.indices.create(index=self.index_name, body=mapping)
+                self._index_sorted = False
             print(f"Created index '{self.index_name}'")
             return True
         except RequestError as e:
@@ -85,6 +608,34 @@ class ElasticsearchService:
             print(f"Error creating index: {e}")
             return False
 
+    def index_sorted(self) -> Optional[bool]:
+        """
+        Whether the press release index is sorted by published_date, read
+        from its settings once per index generation; None while unknown.
+        """
+        if self._index_sorted is None and self.client:
+            try:
+                settings = self.client.indices.get_settings(index=self.index_name, name="index.sort.field")
+                self._index_sorted = any(
+                    index_settings.get("settings", {}).get("index", {}).get("sort", {}).get("field")
+                    for index_settings in settings.body.values()
+                )
+            except NotFoundError:
+                return None
+            except Exception as e:
+                print(f"Error reading index sort settings: {e}")
+        return self._index_sorted
+
+    def total_hits_setting(self, endpoint: str, track_total_hits=None):
+        """
+        track_total_hits for a list endpoint: an explicit argument wins, then
+        ELASTIC_TRACK_TOTAL_HITS (e.g. "get_all_paginated=10000,search=true"),
+        then the built-in default.
+        """
+        if track_total_hits is not None:
+            return track_total_hits
+        return self.track_total_hits.get(endpoint, False)
+
     def ensure_filter_config_index(self):
         """Create filter config index and default config if missing."""
         if not self.client:
@@ -114,33 +665,7 @@ class ElasticsearchService:
 
             if not self.client.exists(index=self.filter_config_index, id="default"):
                 default_config = {
-                    "fields": [
-                        {
-                            "key": "query",
-                            "label": "Search",
-                            "type": "text",
-                            "enabled": True,
-                            "placeholder": "Search by title or full text...",
-                        },
-                        {
-                            "key": "company",
-                            "label": "Company",
-                            "type": "multi-select",
-                            "enabled": True,
-                        },
-                        {
-                            "key": "start_date",
-                            "label": "Start Date",
-                            "type": "date",
-                            "enabled": True,
-                        },
-                        {
-                            "key": "end_date",
-                            "label": "End Date",
-                            "type": "date",
-                            "enabled": True,
-                        },
-                    ],
+                    "fields": DEFAULT_FILTER_FIELDS,
                     "limit": 1000,
                 }
                 self.client.index(index=self.filter_config_index, id="default", document=default_config)
@@ -151,64 +676,196 @@ class ElasticsearchService:
             print(f"Error ensuring filter config index: {e}")
             return False
 
+    def _filter_options_body(self) -> Dict:
+        return {
+            "size": 0,
+            "aggs": {
+                "companies": {"terms": {"field": "company", "size": 200}},
+                "min_date": {"min": {"field": "published_date"}},
+                "max_date": {"max": {"field": "published_date"}},
+                **{field: {"terms": {"field": field, "size": 200}} for field in ENTITY_FIELDS},
+            },
+        }
+
+    @staticmethod
+    def _parse_filter_options(response: Dict) -> Dict:
+        companies = [bucket["key"] for bucket in response["aggregations"]["companies"]["buckets"]]
+        min_date_val = response["aggregations"]["min_date"].get("value_as_string")
+        max_date_val = response["aggregations"]["max_date"].get("value_as_string")
+
+        min_date = min_date_val[:10] if min_date_val else None
+        max_date = max_date_val[:10] if max_date_val else None
+
+        aggregations = response["aggregations"]
+        return {
+            "companies": companies,
+            "date_range": {"min": min_date, "max": max_date},
+            **{
+                field: [bucket["key"] for bucket in aggregations.get(field, {}).get("buckets", [])]
+                for field in ENTITY_FIELDS
+            },
+        }
+
     def get_filter_options(self) -> Dict:
         """Return dynamic options for filters from press release data."""
         if not self.client:
-            return {"companies": [], "date_range": {"min": None, "max": None}}
+            return empty_filter_options()
 
         try:
-            response = self.client.search(
+            response = self.gated(
+                self.client.search,
                 index=self.index_name,
-                body={
-                    "size": 0,
-                    "aggs": {
-                        "companies": {"terms": {"field": "company", "size": 200}},
-                        "min_date": {"min": {"field": "published_date"}},
-                        "max_date": {"max": {"field": "published_date"}},
-                    },
-                },
+                body=self._filter_options_body(),
             )
+            return self._parse_filter_options(response)
+        except Overloaded:
+            raise
+        except Exception as e:
+            print(f"Error fetching filter options: {e}")
+            return empty_filter_options()
 
-            companies = [bucket["key"] for bucket in response["aggregations"]["companies"]["buckets"]]
-            min_date_val = response["aggregations"]["min_date"]["value_as_string"]
-            max_date_val = response["aggregations"]["max_date"]["value_as_string"]
-
-            min_date = min_date_val[:10] if min_date_val else None
-            max_date = max_date_val[:10] if max_date_val else None
+    def get_filter_config_source(self) -> Optional[Dict]:
+        """
+        Stored filter config document (fields/limit), cached in-process for
+        ELASTIC_FILTER_CONFIG_TTL seconds so requests don't repeat the
+        exists/exists/get round trips.
+        """
+        cached, fetched_at = self._filter_config_cache
+        if cached is not None and time.monotonic() - fetched_at < self.filter_config_ttl:
+            return cached
 
-            return {
-                "companies": companies,
-                "date_range": {"min": min_date, "max": max_date},
-            }
+        if not self.ensure_filter_config_index():
+            return None
+        try:
+            response = self.gated(self.client.get, index=self.filter_config_index, id="default")
+            source = response.get("_source", {})
+            self._filter_config_cache = (source, time.monotonic())
+            return source
+        except Overloaded:
+            raise
         except Exception as e:
-            print(f"Error fetching filter options: {e}")
-            return {"companies": [], "date_range": {"min": None, "max": None}}
+            print(f"Error fetching filter config: {e}")
+            return None
+
+    def invalidate_filter_config(self):
+        self._filter_config_cache = (None, 0.0)
+
+    def invalidate_caches(self):
+        """Drop in-process caches after the index generation changed."""
+        self.invalidate_filter_config()
+        self.detail_cache.clear()
+        # A reindex refits the embedding model: pick up the new file
+        self.embedder = refresh_embedder(self.embedder)
+        self._indexed_embedding_model = None
+        # The index may have been recreated with different settings
+        self._index_sorted = None
+
+    def _query_embedder(self):
+        """
+        The embedding model for query vectors, or None (lexical only) unless
+        it is the model the indexed vectors were computed with.
+        """
+        self.embedder = refresh_embedder(self.embedder)
+        if self.embedder is None:
+            return None
+        if self._indexed_embedding_model is None:
+            try:
+                mappings = self.gated(self.client.indices.get_mapping, index=self.index_name)
+                meta = next(iter(mappings.body.values()), {}).get("mappings", {}).get("_meta", {})
+                self._indexed_embedding_model = (meta.get("embedding_model"),)
+            except Overloaded:
+                raise
+            except Exception as e:
+                print(f"Error reading embedding model fingerprint: {e}")
+                return None
+        indexed = self._indexed_embedding_model[0]
+        if indexed != self.embedder.fingerprint:
+            if self._indexed_embedding_model != (indexed, self.embedder.fingerprint):
+                print(f"Embedding model {self.embedder.fingerprint} does not match the indexed vectors "
+                      f"({indexed}); running lexical only")
+                # Reported once per model pair
+                self._indexed_embedding_model = (indexed, self.embedder.fingerprint)
+            return None
+        return self.embedder
 
     def get_filter_config(self) -> Dict:
         """Fetch filter config table from Elasticsearch and merge with live options."""
-        if not self.ensure_filter_config_index():
+        source = self.get_filter_config_source()
+        if source is None:
             return {
                 "fields": [],
                 "limit": 1000,
-                "options": {"companies": [], "date_range": {"min": None, "max": None}},
+                "options": self.get_filter_options(),
             }
 
+        return {
+            "fields": merge_filter_fields(source.get("fields", [])),
+            "limit": source.get("limit", 1000),
+            "options": self.get_filter_options(),
+        }
+
+    def get_filter_limit(self) -> int:
+        """Result limit from the (cached) filter config, without running aggregations."""
+        source = self.get_filter_config_source() or {}
+        return source.get("limit", 1000)
+
+    def get_initial_data(self, limit: int = 1000) -> Dict:
+        """
+        First page load in one _msearch round trip: the newest releases plus
+        the filter option aggregations, merged with the cached filter config.
+        Concurrent calls share one round trip; raises Overloaded when no
+        search slot frees up in time.
+        """
+        return self._coalesced(f"initial-data:{limit}", lambda: self._get_initial_data(limit))
+
+    def _get_initial_data(self, limit: int) -> Dict:
+        empty_options = empty_filter_options()
+        if not self.client:
+            print("Elasticsearch client not initialized")
+            return {"releases": [], "filter_config": {"fields": [], "limit": 1000, "options": empty_options}}
+
+        source = self.get_filter_config_source() or {}
+        filter_config = {
+            "fields": merge_filter_fields(source.get("fields", [])) if source else [],
+            "limit": source.get("limit", 1000),
+            "options": empty_options,
+        }
+
         try:
-            response = self.client.get(index=self.filter_config_index, id="default")
-            source = response.get("_source", {})
-            options = self.get_filter_options()
-            return {
-                "fields": source.get("fields", []),
-                "limit": source.get("limit", 1000),
-                "options": options,
+            list_body = {
+                "query": {"match_all": {}},
+                "size": limit,
+                "sort": [{"published_date": {"order": "desc"}}],
+                # List cards never render the body
+                "_source": {"excludes": SOURCE_EXCLUDES + ["full_text"]},
+                "track_total_hits": self.total_hits_setting("get_all"),
             }
+            response = self.gated(
+                self.client.msearch,
+                searches=[
+                    {"index": self.index_name},
+                    list_body,
+                    {"index": self.index_name},
+                    self._filter_options_body(),
+                ]
+            )
+            list_response, options_response = response["responses"]
+
+            releases = []
+            if "error" in list_response:
+                print(f"Error fetching initial releases: {list_response['error']}")
+            else:
+                releases = [PressReleaseHit.from_source(hit["_source"]) for hit in list_response["hits"]["hits"]]
+
+            if "error" in options_response:
+                print(f"Error fetching filter options: {options_response['error']}")
+            else:
+                filter_config["options"] = self._parse_filter_options(options_response)
+
+            return {"releases": releases, "filter_config": filter_config}
         except Exception as e:
-            print(f"Error fetching filter config: {e}")
-            return {
-                "fields": [],
-                "limit": 1000,
-                "options": self.get_filter_options(),
-            }
+            print(f"Error fetching initial data: {e}")
+            return {"releases": [], "filter_config": filter_config}
 
     def query_documents(
         self,
@@ -218,263 +875,729 @@ class ElasticsearchService:
         end_date: Optional[str] = None,
         limit: int = 1000,
         include_highlights: bool = True,
-    ) -> List[Dict]:
-        """Unified search + filter query for press releases."""
+        highlight_size: Optional[int] = None,
+        highlighter_type: Optional[str] = None,
+        track_total_hits=None,
+        search_mode: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+        offset: int = 0,
+    ) -> List[PressReleaseHit]:
+        """
+        Unified search + filter query for press releases.
+        Only the first highlight_size hits are highlighted (defaults to
+        ELASTIC_HIGHLIGHT_TOP_HITS); the remaining hits fall back to passages.
+        search_mode "hybrid" fuses BM25 with kNN over the embedding field
+        (ranked by relevance instead of date); "lexical" is BM25 only.
+        entities maps entity fields ("drugs", "phases", ...) to accepted values.
+        offset skips that many hits (server-side paging: offset, limit=size).
+        """
+        return self.query_documents_with_facets(
+            query_text=query_text,
+            companies=companies,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            include_highlights=include_highlights,
+            highlight_size=highlight_size,
+            highlighter_type=highlighter_type,
+            track_total_hits=track_total_hits,
+            include_facets=False,
+            search_mode=search_mode,
+            entities=entities,
+            offset=offset,
+        )["results"]
+
+    def query_documents_with_facets(
+        self,
+        query_text: Optional[str] = None,
+        companies: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 1000,
+        include_highlights: bool = True,
+        highlight_size: Optional[int] = None,
+        highlighter_type: Optional[str] = None,
+        track_total_hits=None,
+        include_facets: bool = True,
+        search_mode: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+        profile: bool = False,
+        offset: int = 0,
+    ) -> Dict:
+        """
+        query_documents plus, in the same search request, facet counts for
+        the current query: companies (ignoring the company filter) and
+        months (ignoring the date filter). Returns {"results", "facets",
+        "total"}; total is None unless hits are counted (track_total_hits).
+        With offset, only the limit hits after it are fetched, highlighted
+        and post-processed.
+        profile=True runs the searches with the Profile API and adds
+        "profile": the request bodies, the ES profile (raw and per clause)
+        and wall time per stage.
+
+        Identical concurrent calls (see _query_key) share one execution and
+        its result; profiled calls always run on their own. Raises
+        Overloaded when no search slot frees up in time.
+        """
+        params = {
+            "query_text": query_text,
+            "companies": companies,
+            "start_date": start_date,
+            "end_date": end_date,
+            "limit": limit,
+            "include_highlights": include_highlights,
+            "highlight_size": highlight_size,
+            "highlighter_type": highlighter_type,
+            "track_total_hits": track_total_hits,
+            "include_facets": include_facets,
+            "search_mode": search_mode,
+            "entities": entities,
+            "profile": profile,
+            "offset": offset,
+        }
+        if profile:
+            return self.admission.run(lambda: self._query_documents_with_facets(**params))
+        return self._coalesced(
+            self._query_key("query", params),
+            lambda: self._query_documents_with_facets(**params),
+        )
+
+    def _query_documents_with_facets(
+        self,
+        query_text: Optional[str],
+        companies: Optional[List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        limit: int,
+        include_highlights: bool,
+        highlight_size: Optional[int],
+        highlighter_type: Optional[str],
+        track_total_hits,
+        include_facets: bool,
+        search_mode: Optional[str],
+        entities: Optional[Dict[str, List[str]]],
+        profile: bool,
+        offset: int,
+    ) -> Dict:
         if not self.client:
             print("Elasticsearch client not initialized")
-            return []
-
-        def query_terms(text: Optional[str]) -> List[str]:
-            if not text:
-                return []
-            base_terms = [part.lower() for part in str(text).split() if len(part.strip()) > 1]
-            expanded = []
-            seen = set()
-            for term in base_terms:
-                variants = [term]
-                if len(term) > 2:
-                    if term.endswith("s"):
-                        variants.append(term[:-1])
-                    else:
-                        variants.append(f"{term}s")
-                for variant in variants:
-                    normalized = variant.strip()
-                    if len(normalized) <= 1 or normalized in seen:
-                        continue
-                    seen.add(normalized)
-                    expanded.append(normalized)
-            return expanded
-
-        def contains_query(text: Optional[str], terms: List[str]) -> bool:
-            normalized = " ".join(str(text or "").lower().split())
-            if not normalized or not terms:
-                return False
-            return any(term in normalized for term in terms)
-
-        def extract_context_snippet(text: Optional[str], terms: List[str], max_len: int = 240) -> str:
-            source = " ".join(str(text or "").split())
-            if not source:
-                return ""
-            if not terms:
-                return source[:max_len]
-
-            lowered = source.lower()
-            first_index = -1
-            for term in terms:
-                idx = lowered.find(term)
-                if idx != -1 and (first_index == -1 or idx < first_index):
-                    first_index = idx
-
-            if first_index == -1:
-                return source[:max_len]
-
-            half = max_len // 2
-            start = max(0, first_index - half)
-            end = min(len(source), start + max_len)
-            if end - start < max_len:
-                start = max(0, end - max_len)
-
-            prefix = "..." if start > 0 else ""
-            suffix = "..." if end < len(source) else ""
-            return f"{prefix}{source[start:end].strip()}{suffix}"
+            return {"results": [], "facets": None, "total": None}
 
         try:
-            must_clauses = []
-            filter_clauses = []
-            terms = query_terms(query_text)
-
-            if query_text:
-                should_clauses = [
-                    {
-                        "multi_match": {
-                            "query": query_text,
-                            "fields": ["title^2", "full_text"],
-                        }
-                    }
-                ]
-
-                for term in terms:
-                    if len(term) < 3:
-                        continue
-                    should_clauses.append(
-                        {
-                            "wildcard": {
-                                "full_text": {
-                                    "value": f"*{term}*",
-                                    "case_insensitive": True,
-                                }
-                            }
-                        }
+            timer = StageTimer() if profile else NULL_TIMER
+            with timer.stage("prepare_query"):
+                prepared = self._prepare_query(
+                    query_text, companies, start_date, end_date, limit, include_highlights,
+                    highlight_size, highlighter_type, track_total_hits, include_facets, entities, offset,
+                )
+                if profile:
+                    prepared["search_body"]["profile"] = True
+
+            query_vector = None
+            if (search_mode or self.search_mode) == "hybrid" and query_text:
+                with timer.stage("embed_query"):
+                    embedder = self._query_embedder()
+                    if embedder is not None:
+                        query_vector = embedder.embed(query_text)
+
+            with timer.stage("search"):
+                if query_vector is not None:
+                    # kNN-only hits need highlighting too, so it always runs as a
+                    # second request over the fused top hits
+                    prepared["search_body"].pop("highlight", None)
+                    prepared["highlight_inline"] = False
+                    # Fusion needs both rankings from the top: fuse offset + limit, keep the page
+                    prepared["search_body"].pop("from", None)
+                    prepared["search_body"]["size"] = offset + limit
+                    response, response_hits = self._hybrid_search(
+                        prepared["search_body"], query_vector, prepared["filters"], offset + limit,
                     )
-                    should_clauses.append(
-                        {
-                            "wildcard": {
-                                "title": {
-                                    "value": f"*{term}*",
-                                    "case_insensitive": True,
-                                }
-                            }
-                        }
+                    response_hits = response_hits[offset:]
+                else:
+                    response = self.gated(
+                        self.client.search,
+                        index=self.index_name,
+                        body=prepared["search_body"],
                     )
+                    response_hits = response["hits"]["hits"]
+
+            highlights = {}
+            highlight_response = None
+            highlight_request = self._highlight_request(prepared, response_hits)
+            if highlight_request is not None:
+                if profile:
+                    highlight_request["profile"] = True
+                with timer.stage("highlight"):
+                    highlight_response = self.gated(self.client.search, index=self.index_name, body=highlight_request)
+                    highlights = self._parse_highlights(highlight_response)
+            result = self._query_results(prepared, response, response_hits, highlights, timer)
+            if profile:
+                result["profile"] = {
+                    "backend": "elasticsearch",
+                    "request": prepared["search_body"],
+                    "highlight_request": highlight_request,
+                    "took_ms": {
+                        "search": response.get("took"),
+                        "highlight": highlight_response.get("took") if highlight_response else None,
+                    },
+                    "clauses": summarize_profile(response.get("profile")),
+                    "es_profile": {
+                        "search": response.get("profile"),
+                        "highlight": highlight_response.get("profile") if highlight_response else None,
+                    },
+                    "timings_ms": timer.as_dict(),
+                }
+            return result
+        except Exception as e:
+            print(f"Error querying documents: {e}")
+            return {"results": [], "facets": None, "total": None}
 
-                must_clauses.append(
-                    {
-                        "bool": {
-                            "should": should_clauses,
-                            "minimum_should_match": 1,
-                        }
+    def query_documents_batch(self, specs: List[Dict]) -> List[Dict]:
+        """
+        Many queries in chunked _msearch round trips. Each spec holds keyword
+        arguments of query_documents_with_facets (query_text, companies,
+        start_date, end_date, limit, include_highlights, include_facets,
+        entities, ...); search_mode is ignored, batches are lexical. Up to
+        ELASTIC_MSEARCH_CHUNK searches go per request and at most
+        ELASTIC_MSEARCH_CONCURRENCY requests are in flight. Results are
+        returned in spec order and match query_documents_with_facets; a spec
+        that failed gets an "error" key and empty results. Every chunk in
+        flight takes its own admission slot (Overloaded if one does not free
+        up in time).
+        """
+        if not self.client:
+            print("Elasticsearch client not initialized")
+            return [{"results": [], "facets": None, "error": "search backend unavailable"} for _ in specs]
+
+        prepared = [
+            self._prepare_query(
+                spec.get("query_text"),
+                spec.get("companies"),
+                spec.get("start_date"),
+                spec.get("end_date"),
+                spec.get("limit", 1000),
+                spec.get("include_highlights", True),
+                spec.get("highlight_size"),
+                spec.get("highlighter_type"),
+                spec.get("track_total_hits"),
+                spec.get("include_facets", True),
+                spec.get("entities"),
+            )
+            for spec in specs
+        ]
+        responses = self._msearch_chunked([item["search_body"] for item in prepared])
+
+        # Second round trip only for the queries that highlight their top hits separately
+        highlight_requests = {}
+        for position, (item, response) in enumerate(zip(prepared, responses)):
+            if "error" not in response:
+                request = self._highlight_request(item, response["hits"]["hits"])
+                if request is not None:
+                    highlight_requests[position] = request
+        highlight_responses = dict(zip(
+            highlight_requests,
+            self._msearch_chunked(list(highlight_requests.values())),
+        ))
+
+        results = []
+        for position, (item, response) in enumerate(zip(prepared, responses)):
+            if "error" in response:
+                results.append({"results": [], "facets": None, "error": str(response["error"])})
+                continue
+            highlights = {}
+            highlight_response = highlight_responses.get(position)
+            if highlight_response is not None and "error" not in highlight_response:
+                highlights = self._parse_highlights(highlight_response)
+            try:
+                results.append(self._query_results(item, response, response["hits"]["hits"], highlights))
+            except Exception as e:
+                results.append({"results": [], "facets": None, "error": str(e)})
+        return results
+
+    def _msearch_chunked(self, bodies: List[Dict]) -> List[Dict]:
+        """Responses for bodies, in order; a failed chunk yields an error per body."""
+        chunks = [bodies[start:start + self.msearch_chunk_size]
+                  for start in range(0, len(bodies), self.msearch_chunk_size)]
+
+        def run(chunk: List[Dict]) -> List[Dict]:
+            searches = []
+            for body in chunk:
+                searches.extend(({"index": self.index_name}, body))
+            try:
+                return self.gated(self.client.msearch, searches=searches)["responses"]
+            except Overloaded:
+                raise
+            except Exception as e:
+                print(f"Error in batched msearch: {e}")
+                return [{"error": str(e)}] * len(chunk)
+
+        if len(chunks) <= 1:
+            return [response for chunk in chunks for response in run(chunk)]
+        # Each chunk in flight holds an admission slot: never ask for more than exist
+        workers = min(self.msearch_concurrency, len(chunks))
+        if self.admission.max_concurrent > 0:
+            workers = min(workers, self.admission.max_concurrent)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [response for chunk_responses in executor.map(run, chunks) for response in chunk_responses]
+
+    def _prepare_query(
+        self,
+        query_text: Optional[str],
+        companies: Optional[List[str]],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        limit: int,
+        include_highlights: bool,
+        highlight_size: Optional[int],
+        highlighter_type: Optional[str],
+        track_total_hits,
+        include_facets: bool,
+        entities: Optional[Dict[str, List[str]]],
+        offset: int = 0,
+    ) -> Dict:
+        """
+        Search body for query_documents_with_facets plus the state its
+        post-processing needs; shared with the _msearch batch path.
+        """
+        must_clauses = []
+        filter_clauses = []
+        terms = query_terms(query_text)
+
+        if query_text:
+            # One analyzed query: english_search stems and expands pharma
+            # synonyms, replacing per-term wildcard clauses
+            should_clauses = [
+                {
+                    "multi_match": {
+                        "query": query_text,
+                        "fields": ["title^2", "full_text"],
                     }
-                )
-
-            if companies:
-                filter_clauses.append({"terms": {"company": companies}})
-
-            if start_date or end_date:
-                range_clause = {"range": {"published_date": {}}}
-                if start_date:
-                    range_clause["range"]["published_date"]["gte"] = start_date
-                if end_date:
-                    range_clause["range"]["published_date"]["lte"] = end_date
-                filter_clauses.append(range_clause)
+                },
+                # First passage (by position) matching the query, used for
+                # the snippet fallback instead of scanning full_text
+                {
+                    "nested": {
+                        "path": "passages",
+                        "query": {"match": {"passages.text": query_text}},
+                        "score_mode": "max",
+                        "ignore_unmapped": True,
+                        "inner_hits": {
+                            "size": 1,
+                            "sort": [{"passages.position": {"order": "asc"}}],
+                            "_source": ["passages.text"],
+                        },
+                    }
+                },
+            ]
 
-            query_body = {
-                "bool": {
-                    "must": must_clauses,
-                    "filter": filter_clauses,
+            must_clauses.append(
+                {
+                    "bool": {
+                        "should": should_clauses,
+                        "minimum_should_match": 1,
+                    }
                 }
-            }
+            )
 
-            search_body = {
-                "query": query_body,
-                "size": limit,
-                "sort": [{"published_date": {"order": "desc"}}],
+        # Entity filters are plain keyword terms in filter context, so
+        # Elasticsearch caches them instead of scoring
+        for field, values in (entities or {}).items():
+            if field in ENTITY_FIELDS and values:
+                filter_clauses.append({"terms": {field: entity_filter_values(field, values)}})
+
+        company_clause = None
+        if companies:
+            company_clause = {"terms": {"company": companies}}
+
+        range_clause = None
+        if start_date or end_date:
+            range_clause = {"range": {"published_date": {}}}
+            if start_date:
+                range_clause["range"]["published_date"]["gte"] = start_date
+            if end_date:
+                range_clause["range"]["published_date"]["lte"] = end_date
+
+        post_filter_clauses = []
+        for clause in (company_clause, range_clause):
+            if clause is None:
+                continue
+            # With facets the filters move to post_filter so each facet can
+            # ignore its own filter while the hits still honour both
+            if include_facets:
+                post_filter_clauses.append(clause)
+            else:
+                filter_clauses.append(clause)
+
+        query_body = {
+            "bool": {
+                "must": must_clauses,
+                "filter": filter_clauses,
             }
-
-            if include_highlights and query_text:
-                search_body["highlight"] = {
-                    "pre_tags": ["<mark>"],
-                    "post_tags": ["</mark>"],
-                    "fields": {
-                        "title": {"number_of_fragments": 1},
-                        "full_text": {"fragment_size": 180, "number_of_fragments": 3},
+        }
+
+        search_body = {
+            "query": query_body,
+            "size": limit,
+            "sort": [{"published_date": {"order": "desc"}}],
+            "_source": {"excludes": SOURCE_EXCLUDES},
+            "track_total_hits": self.total_hits_setting("query_documents", track_total_hits),
+        }
+        if offset:
+            search_body["from"] = offset
+
+        if include_facets:
+            if post_filter_clauses:
+                search_body["post_filter"] = {"bool": {"filter": post_filter_clauses}}
+            search_body["aggs"] = {
+                "companies": {
+                    "filter": range_clause or {"match_all": {}},
+                    "aggs": {"values": {"terms": {"field": "company", "size": 200}}},
+                },
+                "published_month": {
+                    "filter": company_clause or {"match_all": {}},
+                    "aggs": {
+                        "values": {
+                            "date_histogram": {
+                                "field": "published_date",
+                                "calendar_interval": "month",
+                                "format": "yyyy-MM",
+                                "min_doc_count": 1,
+                            }
+                        }
                     },
-                }
+                },
+            }
+
+        highlight_body = None
+        if include_highlights and query_text:
+            highlight_body = {
+                "type": highlighter_type or self.highlighter_type,
+                "pre_tags": ["<mark>"],
+                "post_tags": ["</mark>"],
+                "fields": {
+                    "title": {"number_of_fragments": 1},
+                    "full_text": {"fragment_size": 180, "number_of_fragments": 3},
+                },
+            }
 
-            response = self.client.search(
+        if highlight_size is None:
+            highlight_size = self.highlight_top_hits
+
+        highlight_inline = highlight_body is not None and (highlight_size <= 0 or highlight_size >= limit)
+        if highlight_inline:
+            search_body["highlight"] = highlight_body
+
+        return {
+            "query_text": query_text,
+            "terms": terms,
+            "query_body": query_body,
+            "search_body": search_body,
+            "filters": filter_clauses + post_filter_clauses,
+            "highlight_body": highlight_body,
+            "highlight_size": highlight_size,
+            "highlight_inline": highlight_inline,
+            "include_facets": include_facets,
+        }
+
+    @staticmethod
+    def _highlight_request(prepared: Dict, response_hits: List[Dict]) -> Optional[Dict]:
+        """
+        Body highlighting only the top hits when highlighting did not run
+        inline: fetched by id and highlighted with the query (which also
+        covers vector hits that the query itself missed).
+        """
+        if prepared["highlight_body"] is None or prepared["highlight_inline"]:
+            return None
+        highlight_size = prepared["highlight_size"]
+        hits = response_hits if highlight_size <= 0 else response_hits[:highlight_size]
+        if not hits:
+            return None
+        ids = [hit["_id"] for hit in hits]
+        return {
+            "query": {"ids": {"values": ids}},
+            "size": len(ids),
+            "_source": False,
+            "highlight": {**prepared["highlight_body"], "highlight_query": prepared["query_body"]},
+        }
+
+    @staticmethod
+    def _parse_highlights(response: Dict) -> Dict[str, Dict]:
+        return {hit["_id"]: hit.get("highlight", {}) for hit in response["hits"]["hits"]}
+
+    def _query_results(self, prepared: Dict, response: Dict, response_hits: List[Dict],
+                       highlights: Dict[str, Dict], timer=NULL_TIMER) -> Dict:
+        """Shared post-processing: passages, highlights, facets -> {"results", "facets"}."""
+        hits = []
+        for hit in response_hits:
+            doc = hit["_source"]
+            inner = hit.get("inner_hits", {}).get("passages", {}).get("hits", {}).get("hits", [])
+            if inner:
+                doc["passages"] = [passage["_source"].get("text", "") for passage in inner]
+            highlight = hit.get("highlight") or highlights.get(hit["_id"], {})
+            hits.append((doc, highlight))
+
+        facets = None
+        if prepared["include_facets"]:
+            with timer.stage("facets"):
+                facets = self._parse_facets(response.get("aggregations", {}))
+        results = build_query_results(hits, prepared["query_text"], prepared["terms"], timer)
+        total = response.get("hits", {}).get("total")
+        return {"results": results, "facets": facets, "total": total["value"] if total else None}
+
+    @staticmethod
+    def _parse_facets(aggregations: Dict) -> Dict:
+        facets = {}
+        for name in ("companies", "published_month"):
+            buckets = aggregations.get(name, {}).get("values", {}).get("buckets", [])
+            facets[name] = [
+                {"key": bucket.get("key_as_string", bucket["key"]), "count": bucket["doc_count"]}
+                for bucket in buckets
+            ]
+        return facets
+    
+    def index_generation(self) -> Optional[str]:
+        """
+        Token that changes whenever the press release index is recreated or
+        its documents change: index uuid + the generation _bump_generation
+        stores in the index _meta once a write is refreshed. Indexing stats
+        move before a refresh makes the documents searchable, so a token
+        built on them could be cached against pre-refresh results.
+        """
+        if not self.client:
+            return None
+        try:
+            response = self.client.indices.get(
                 index=self.index_name,
-                body=search_body,
+                filter_path="*.settings.index.uuid,*.mappings._meta.generation",
             )
-
-            raw_results = []
-            snippet_frequency: Dict[str, int] = {}
-
-            for hit in response["hits"]["hits"]:
-                doc = hit["_source"]
-                highlight = hit.get("highlight", {})
-                matches = []
-
-                for field_name in ["title", "full_text"]:
-                    snippets = highlight.get(field_name, [])
-                    for snippet in snippets:
-                        plain_text = re.sub(r"</?mark>", "", snippet)
-                        normalized = " ".join(plain_text.lower().split())
-                        snippet_frequency[normalized] = snippet_frequency.get(normalized, 0) + 1
-                        matches.append(
-                            {
-                                "field": field_name,
-                                "field_label": "Title" if field_name == "title" else "Content",
-                                "snippet": snippet,
-                                "plain_text": plain_text,
-                                "normalized": normalized,
-                            }
-                        )
-
-                raw_results.append(
-                    {
-                        "title": doc.get("title"),
-                        "company": doc.get("company"),
-                        "published_date": doc.get("published_date"),
-                        "url": doc.get("url"),
-                        "full_text": doc.get("full_text"),
-                        "matches": matches,
-                    }
+            for index_state in response.body.values():
+                return "{}:{}".format(
+                    index_state["settings"]["index"]["uuid"],
+                    index_state.get("mappings", {}).get("_meta", {}).get("generation"),
                 )
+            return None
+        except Exception as e:
+            print(f"Error reading index generation: {e}")
+            return None
 
-            results = []
-            for item in raw_results:
-                matches = item.get("matches", [])
-
-                def rank_key(match: Dict):
-                    is_title_match = 0 if match.get("field") == "title" else 1
-                    frequency = snippet_frequency.get(match.get("normalized", ""), 0)
-                    snippet_length = len(match.get("plain_text", ""))
-                    return (is_title_match, frequency, snippet_length)
-
-                ranked_matches = sorted(matches, key=rank_key)
-                cleaned_matches = []
-                seen_norm = set()
-                for match in ranked_matches:
-                    norm = match.get("normalized")
-                    plain_text = match.get("plain_text", "")
-
-                    if query_text and terms and not contains_query(plain_text, terms):
-                        continue
-
-                    if norm in seen_norm:
-                        continue
-                    frequency = snippet_frequency.get(norm, 0)
-                    if match.get("field") == "full_text" and frequency > 1:
-                        continue
-                    seen_norm.add(norm)
-                    cleaned_matches.append(
-                        {
-                            "field": match.get("field"),
-                            "field_label": match.get("field_label"),
-                            "snippet": match.get("snippet"),
-                            "plain_text": plain_text,
-                        }
-                    )
-
-                if not cleaned_matches and ranked_matches:
-                    fallback = ranked_matches[0]
-                    fallback_text = fallback.get("plain_text", "")
-                    if not query_text or contains_query(fallback_text, terms):
-                        cleaned_matches.append(
-                            {
-                                "field": fallback.get("field"),
-                                "field_label": fallback.get("field_label"),
-                                "snippet": fallback.get("snippet"),
-                                "plain_text": fallback_text,
-                            }
-                        )
-
-                if query_text and not cleaned_matches:
-                    fallback_text = extract_context_snippet(item.get("full_text"), terms)
-                    if contains_query(fallback_text, terms):
-                        cleaned_matches.append(
-                            {
-                                "field": "full_text",
-                                "field_label": "Content",
-                                "snippet": fallback_text,
-                                "plain_text": fallback_text,
-                            }
-                        )
+    def get_all_titles(self, limit: int = 10000) -> List[Dict]:
+        """Title/company/url/date of the newest press releases (no bodies), for the suggest trie."""
+        if not self.client:
+            return []
 
-                item["matches"] = cleaned_matches[:3]
-                summary = cleaned_matches[0]["plain_text"] if cleaned_matches else ""
-                if query_text and terms and not contains_query(summary, terms):
-                    query_context = extract_context_snippet(item.get("full_text"), terms)
-                    if contains_query(query_context, terms):
-                        summary = query_context
+        try:
+            response = self.gated(
+                self.client.search,
+                index=self.index_name,
+                body={
+                    "query": {"match_all": {}},
+                    "size": limit,
+                    "sort": [{"published_date": {"order": "desc"}}],
+                    "_source": ["title", "company", "url", "published_date"],
+                    "track_total_hits": False,
+                },
+            )
+            return [hit["_source"] for hit in response["hits"]["hits"]]
+        except Exception as e:
+            print(f"Error fetching titles: {e}")
+            return []
 
-                item["summary"] = summary
-                results.append(item)
+    def suggest_completions(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """Completion-suggester lookup on the `suggest` field."""
+        if not self.client or not prefix:
+            return []
 
-            return results
+        try:
+            response = self.gated(
+                self.client.search,
+                index=self.index_name,
+                body={
+                    "_source": ["title", "company", "url"],
+                    "suggest": {
+                        "completions": {
+                            "prefix": prefix,
+                            "completion": {"field": "suggest", "size": limit, "skip_duplicates": True},
+                        }
+                    },
+                },
+            )
+            suggestions = []
+            for option in response.get("suggest", {}).get("completions", [{}])[0].get("options", []):
+                doc = option.get("_source", {})
+                text = option.get("text")
+                kind = "title" if text == doc.get("title") else ("company" if text == doc.get("company") else "drug")
+                suggestion = {"text": text, "type": kind}
+                if kind == "title":
+                    suggestion.update({"company": doc.get("company"), "url": doc.get("url")})
+                suggestions.append(suggestion)
+            return suggestions
+        except Overloaded:
+            raise
         except Exception as e:
-            print(f"Error querying documents: {e}")
+            print(f"Error fetching completions: {e}")
             return []
-    
+
+    def _hybrid_search(self, search_body: Dict, query_vector: List[float], filters: List[Dict],
+                       limit: int) -> Tuple[Dict, List[Dict]]:
+        """
+        BM25 and kNN in one _msearch, fused with reciprocal rank fusion.
+        Returns the lexical response (for aggregations) and the fused hits.
+        """
+        k = min(limit, self.knn_k)
+        lexical_body = {**search_body, "sort": ["_score", {"published_date": {"order": "desc"}}]}
+        knn_body = {
+            "knn": {
+                "field": "embedding",
+                "query_vector": query_vector,
+                "k": k,
+                "num_candidates": min(10000, max(self.knn_num_candidates, k)),
+                "filter": filters,
+            },
+            "size": k,
+            "_source": {"excludes": SOURCE_EXCLUDES},
+            "track_total_hits": False,
+        }
+        response = self.gated(
+            self.client.msearch,
+            searches=[{"index": self.index_name}, lexical_body, {"index": self.index_name}, knn_body]
+        )
+        lexical_response, knn_response = response["responses"]
+        if "error" in lexical_response:
+            raise RuntimeError(lexical_response["error"])
+
+        hits_by_id = {}
+        rankings = []
+        for ranked in (lexical_response, knn_response):
+            if "error" in ranked:
+                print(f"Error in hybrid search: {ranked['error']}")
+                continue
+            ranking = []
+            for hit in ranked["hits"]["hits"]:
+                # The lexical copy carries the matching passage (inner_hits)
+                hits_by_id.setdefault(hit["_id"], hit)
+                ranking.append(hit["_id"])
+            rankings.append(ranking)
+
+        fused = reciprocal_rank_fusion(rankings, k=self.rrf_rank_constant)[:limit]
+        return lexical_response, [hits_by_id[hit_id] for hit_id, _ in fused]
+
+    def export_filter(
+        self,
+        query_text: Optional[str] = None,
+        companies: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict:
+        """Non-scoring query for exports: every criterion in filter context."""
+        filters = []
+        if query_text:
+            filters.append({"multi_match": {"query": query_text, "fields": ["title^2", "full_text"]}})
+        if companies:
+            filters.append({"terms": {"company": companies}})
+        if start_date or end_date:
+            date_range = {}
+            if start_date:
+                date_range["gte"] = start_date
+            if end_date:
+                date_range["lte"] = end_date
+            filters.append({"range": {"published_date": date_range}})
+        for field, values in (entities or {}).items():
+            if field in ENTITY_FIELDS and values:
+                filters.append({"terms": {field: entity_filter_values(field, values)}})
+        return {"bool": {"filter": filters}} if filters else {"match_all": {}}
+
+    def export_documents(
+        self,
+        fields: List[str],
+        query_text: Optional[str] = None,
+        companies: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+    ) -> Iterator[Dict]:
+        """
+        Every matching document's requested fields, in index order. A point
+        in time is split into ELASTIC_EXPORT_SLICES slices that page with
+        search_after in parallel threads; pages go through a bounded queue,
+        so memory stays constant however large the export is. The PIT opens
+        on the first next() (errors surface there) and is closed when the
+        iterator finishes or is closed early.
+        """
+        if not self.client:
+            raise RuntimeError("Elasticsearch client not initialized")
+
+        query = self.export_filter(query_text, companies, start_date, end_date, entities)
+        slices = self.export_slices
+        keep_alive = self.export_keep_alive
+        pit_id = self.gated(self.client.open_point_in_time, index=self.index_name, keep_alive=keep_alive)["id"]
+        pages: "queue.Queue" = queue.Queue(maxsize=2 * slices)
+        stop = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(slice_id: int):
+            current_pit = pit_id
+            search_after = None
+            try:
+                while not stop.is_set():
+                    body = {
+                        "size": self.export_page_size,
+                        "query": query,
+                        "_source": fields,
+                        "sort": ["_shard_doc"],
+                        "pit": {"id": current_pit, "keep_alive": keep_alive},
+                        "track_total_hits": False,
+                    }
+                    if slices > 1:
+                        body["slice"] = {"id": slice_id, "max": slices}
+                    if search_after is not None:
+                        body["search_after"] = search_after
+                    response = self.gated(self.client.search, body=body)
+                    current_pit = response.get("pit_id", current_pit)
+                    hits = response["hits"]["hits"]
+                    if hits and not put([hit.get("_source", {}) for hit in hits]):
+                        return
+                    if len(hits) < self.export_page_size:
+                        break
+                    search_after = hits[-1]["sort"]
+            except Exception as e:
+                if not stop.is_set():
+                    put(e)
+            finally:
+                put(done)
+
+        threads = [
+            threading.Thread(target=produce, args=(slice_id,), name=f"es-export-{slice_id}", daemon=True)
+            for slice_id in range(slices)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            finished = 0
+            while finished < slices:
+                item = pages.get()
+                if item is done:
+                    finished += 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield from item
+        finally:
+            stop.set()
+            try:
+                self.gated(self.client.close_point_in_time, id=pit_id)
+            except Exception as e:
+                print(f"Error closing point in time: {e}")
+
     def bulk_index(self, documents: List[Dict]) -> int:
         """
         Bulk index documents into Elasticsearch.
@@ -491,10 +1614,30 @@ class ElasticsearchService:
         try:
             from elasticsearch.helpers import bulk
             
+            # Embeddings for the whole batch in one vectorized pass
+            vectors = None
+            if self.embedder is not None:
+                vectors = self.embedder.transform([document_text(doc) for doc in documents])
+
+            # Other publishers named in a release count as partner companies
+            known_companies = {doc.get("company") for doc in documents if doc.get("company")}
+
             # Prepare bulk operations
             operations = []
-            for doc in documents:
+            indexed = []
+            for position, doc in enumerate(documents):
                 doc_id = doc.get('url') or f"{doc.get('company','')}-{doc.get('published_date','')}-{doc.get('title','')}"
+                if "passages" not in doc:
+                    doc = {**doc, "passages": passage_documents(doc.get("full_text"))}
+                if "suggest" not in doc:
+                    inputs = [doc.get("title"), doc.get("company")] + extract_drug_names(doc.get("title"))
+                    doc = {**doc, "suggest": {"input": [value for value in inputs if value]}}
+                if "drugs" not in doc:
+                    doc = {**doc, **extract_entities(doc, known_companies)}
+                # Zero vectors (no known terms) are invalid for cosine similarity
+                if vectors is not None and "embedding" not in doc and vectors[position].any():
+                    doc = {**doc, "embedding": vectors[position].tolist()}
+                indexed.append(doc)
                 operations.append({
                     "_index": self.index_name,
                     "_id": doc_id,
@@ -502,14 +1645,90 @@ class ElasticsearchService:
                 })
             
             success, failed = bulk(self.client, operations, raise_on_error=False)
+            self.detail_cache.clear()
+            # Queries are only embedded with the model these vectors came from
+            meta = {"embedding_model": self.embedder.fingerprint} if vectors is not None else {}
+            try:
+                self._bump_generation(meta)
+                if vectors is not None:
+                    self._indexed_embedding_model = (self.embedder.fingerprint,)
+            except Exception as e:
+                print(f"Error recording index generation: {e}")
             print(f"Indexed {success} documents, {failed} failed")
+            # One percolation per batch replaces clients polling their saved searches
+            self.alerts.percolate(indexed)
             return success
         except Exception as e:
             print(f"Error during bulk indexing: {e}")
             return 0
     
+    def _bump_generation(self, meta: Optional[Dict] = None):
+        """
+        Refresh the index so a write is searchable, then store a new
+        generation (plus meta) in the index _meta, which index_generation
+        reads. Caches keyed on the generation thus never hold results from
+        before the refresh under the new token.
+        """
+        self.client.indices.refresh(index=self.index_name)
+        mappings = self.client.indices.get_mapping(index=self.index_name)
+        # put_mapping replaces _meta as a whole
+        current = next(iter(mappings.body.values()), {}).get("mappings", {}).get("_meta", {})
+        self.client.indices.put_mapping(
+            index=self.index_name,
+            meta={**current, **(meta or {}), "generation": uuid.uuid4().hex},
+        )
+
+    def update_related(self, documents: Optional[List[Dict]] = None, k: int = RELATED_TOP_K) -> int:
+        """
+        Batch job run after indexing: compute each document's top-k related
+        releases (see related.py) and store them on the document. documents
+        defaults to the whole index. Returns count of updated documents.
+        """
+        if not self.client:
+            print("Elasticsearch client not initialized")
+            return 0
+
+        try:
+            from elasticsearch.helpers import bulk, scan
+
+            if documents is None:
+                documents = [
+                    hit["_source"]
+                    for hit in scan(
+                        self.client,
+                        index=self.index_name,
+                        query={"query": {"match_all": {}}},
+                        _source=RESULT_FIELDS,
+                    )
+                ]
+            documents = [doc for doc in documents if doc.get("url")]
+            # Scored with the serving model's TF-IDF (a reindex may have refit it)
+            self.embedder = refresh_embedder(self.embedder)
+            related = compute_related(documents, k, self.embedder)
+
+            operations = [
+                {
+                    "_op_type": "update",
+                    "_index": self.index_name,
+                    "_id": doc["url"],
+                    "doc": {"related": neighbors},
+                }
+                for doc, neighbors in zip(documents, related)
+            ]
+            success, failed = bulk(self.client, operations, raise_on_error=False)
+            self.detail_cache.clear()
+            try:
+                self._bump_generation()
+            except Exception as e:
+                print(f"Error recording index generation: {e}")
+            print(f"Stored related releases on {success} documents, {failed} failed")
+            return success
+        except Exception as e:
+            print(f"Error computing related releases: {e}")
+            return 0
+
     def search(self, query_text: str, company: Optional[str] = None, 
-               limit: int = 20) -> List[Dict]:
+               limit: int = 20, track_total_hits=None) -> List[Dict]:
         """
         Full-text search across press releases.
         Optionally filter by company.
@@ -538,33 +1757,32 @@ class ElasticsearchService:
                     {"term": {"company": company}}
                 ]
             
-            response = self.client.search(
+            response = self.gated(
+                self.client.search,
                 index=self.index_name,
                 body={
                     "query": es_query,
-                    "size": limit
+                    "size": limit,
+                    "_source": RESULT_FIELDS,
+                    "track_total_hits": self.total_hits_setting("search", track_total_hits),
                 }
             )
             
-            # Format results
+            # _source already holds exactly the result fields; annotate it in place
             results = []
             for hit in response['hits']['hits']:
                 doc = hit['_source']
-                results.append({
-                    'title': doc.get('title'),
-                    'company': doc.get('company'),
-                    'published_date': doc.get('published_date'),
-                    'url': doc.get('url'),
-                    'full_text': doc.get('full_text'),
-                    'score': hit['_score']
-                })
+                doc['score'] = hit['_score']
+                results.append(doc)
             
             return results
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Error during search: {e}")
             return []
 
-    def get_all_paginated(self, page: int = 1, size: int = 10) -> Dict:
+    def get_all_paginated(self, page: int = 1, size: int = 10, track_total_hits=None) -> Dict:
         """Retrieve paginated press releases from Elasticsearch."""
         if not self.client:
             print("Elasticsearch client not initialized")
@@ -572,7 +1790,8 @@ class ElasticsearchService:
 
         try:
             from_value = (page - 1) * size
-            response = self.client.search(
+            response = self.gated(
+                self.client.search,
                 index=self.index_name,
                 body={
                     "query": {"match_all": {}},
@@ -580,55 +1799,45 @@ class ElasticsearchService:
                     "size": size,
                     "sort": [
                         {"published_date": {"order": "desc"}}
-                    ]
+                    ],
+                    "_source": ["company", "title", "published_date", "url"],
+                    "track_total_hits": self.total_hits_setting("get_all_paginated", track_total_hits),
                 }
             )
 
             hits = response["hits"]["hits"]
-            total = response["hits"]["total"]["value"]
-
-            results = []
-            for hit in hits:
-                doc = hit["_source"]
-                results.append({
-                    "company": doc.get("company"),
-                    "title": doc.get("title"),
-                    "published_date": doc.get("published_date"),
-                    "url": doc.get("url")
-                })
+            # Untracked totals (track_total_hits=false) only tell us what was fetched
+            total = response["hits"].get("total", {}).get("value", from_value + len(hits))
 
-            return {"results": results, "total": total}
+            return {"results": [hit["_source"] for hit in hits], "total": total}
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Error fetching paginated results: {e}")
             return {"results": [], "total": 0}
 
-    def get_all(self, limit: int = 1000) -> List[Dict]:
+    def get_all(self, limit: int = 1000, track_total_hits=None) -> List[PressReleaseHit]:
         """Retrieve all press releases from Elasticsearch."""
         if not self.client:
             print("Elasticsearch client not initialized")
             return []
 
         try:
-            response = self.client.search(
+            response = self.gated(
+                self.client.search,
                 index=self.index_name,
                 body={
                     "query": {"match_all": {}},
                     "size": limit,
-                    "sort": [{"published_date": {"order": "desc"}}]
+                    "sort": [{"published_date": {"order": "desc"}}],
+                    # List cards never render the body
+                    "_source": {"excludes": SOURCE_EXCLUDES + ["full_text"]},
+                    "track_total_hits": self.total_hits_setting("get_all", track_total_hits),
                 }
             )
-
-            results = []
-            for hit in response["hits"]["hits"]:
-                doc = hit["_source"]
-                results.append({
-                    "title": doc.get("title"),
-                    "company": doc.get("company"),
-                    "published_date": doc.get("published_date"),
-                    "url": doc.get("url"),
-                    "full_text": doc.get("full_text"),
-                })
-            return results
+            return [PressReleaseHit.from_source(hit["_source"]) for hit in response["hits"]["hits"]]
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Error fetching all documents: {e}")
             return []
@@ -640,6 +1849,7 @@ class ElasticsearchService:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         limit: int = 1000,
+        track_total_hits=None,
     ) -> List[Dict]:
         """Filter press releases in Elasticsearch using company/title/date fields."""
         if not self.client:
@@ -681,60 +1891,141 @@ class ElasticsearchService:
                 }
             }
 
-            response = self.client.search(
+            response = self.gated(
+                self.client.search,
                 index=self.index_name,
                 body={
                     "query": query_body,
                     "size": limit,
-                    "sort": [{"published_date": {"order": "desc"}}]
+                    "sort": [{"published_date": {"order": "desc"}}],
+                    "_source": RESULT_FIELDS,
+                    "track_total_hits": self.total_hits_setting("filter_documents", track_total_hits),
                 }
             )
-
-            results = []
-            for hit in response["hits"]["hits"]:
-                doc = hit["_source"]
-                results.append({
-                    "title": doc.get("title"),
-                    "company": doc.get("company"),
-                    "published_date": doc.get("published_date"),
-                    "url": doc.get("url"),
-                    "full_text": doc.get("full_text"),
-                })
-            return results
+            return [hit["_source"] for hit in response["hits"]["hits"]]
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Error filtering documents: {e}")
             return []
 
-    def get_by_url(self, press_release_url: str) -> Optional[Dict]:
-        """Retrieve one press release by URL from Elasticsearch."""
+    def get_detail(self, press_release_url: str) -> Optional[Tuple[Dict, str]]:
+        """
+        (document, ETag) for one press release. Served from the detail LRU,
+        otherwise a realtime GET by id (bulk_index uses the URL as _id).
+        """
+        cached = self.detail_cache.get(press_release_url)
+        if cached is not None:
+            return cached
+
         if not self.client:
             print("Elasticsearch client not initialized")
             return None
 
         try:
-            response = self.client.search(
+            response = self.gated(
+                self.client.get,
                 index=self.index_name,
-                body={
-                    "query": {"term": {"url": press_release_url}},
-                    "size": 1,
-                },
+                id=press_release_url,
+                source_excludes=DETAIL_EXCLUDES,
             )
-            hits = response.get("hits", {}).get("hits", [])
-            if not hits:
-                return None
+        except NotFoundError:
+            return None
+        except Overloaded:
+            raise
+        except Exception as e:
+            print(f"Error fetching document by url: {e}")
+            return None
 
-            doc = hits[0].get("_source", {})
-            return {
-                "title": doc.get("title"),
-                "company": doc.get("company"),
-                "published_date": doc.get("published_date"),
-                "url": doc.get("url"),
-                "full_text": doc.get("full_text"),
+        doc = self._detail_from_source(response.get("_source", {}))
+        etag = self.detail_cache.put(press_release_url, doc)
+        return doc, etag
+
+    def get_snippets(self, press_release_url: str, query_text: str,
+                     highlighter_type: Optional[str] = None) -> Optional[Dict]:
+        """
+        Highlighted matches and summary of one press release for a query, as
+        query results carry them; lets lists skip highlighting and fetch
+        snippets only for the cards that are opened. None if not found.
+        """
+        if not self.client:
+            print("Elasticsearch client not initialized")
+            return None
+
+        try:
+            prepared = self._prepare_query(
+                query_text, None, None, None, 1, True, 0, highlighter_type, False, False, None,
+            )
+            body = {
+                "query": {"ids": {"values": [press_release_url]}},
+                "size": 1,
+                # passages feed the snippet fallback
+                "_source": {"excludes": ["suggest", "embedding", "related"]},
             }
+            if prepared["highlight_body"] is not None:
+                body["highlight"] = {**prepared["highlight_body"], "highlight_query": prepared["query_body"]}
+            hits = self.gated(self.client.search, index=self.index_name, body=body)["hits"]["hits"]
+            if not hits:
+                return None
+            hit = build_query_results(
+                [(hits[0]["_source"], hits[0].get("highlight", {}))], query_text, prepared["terms"],
+            )[0]
+            return {"url": press_release_url, "summary": hit.summary, "matches": hit.matches}
+        except Overloaded:
+            raise
         except Exception as e:
-            print(f"Error fetching document by url: {e}")
+            print(f"Error fetching snippets: {e}")
             return None
 
+    @staticmethod
+    def _detail_from_source(doc: Dict) -> Dict:
+        return {
+            "title": doc.get("title"),
+            "company": doc.get("company"),
+            "published_date": doc.get("published_date"),
+            "url": doc.get("url"),
+            "full_text": doc.get("full_text"),
+            "related": doc.get("related") or [],
+        }
+
+    def get_by_url(self, press_release_url: str) -> Optional[Dict]:
+        """Retrieve one press release by URL from Elasticsearch."""
+        detail = self.get_detail(press_release_url)
+        return dict(detail[0]) if detail else None
+
+    def get_many_by_url(self, press_release_urls: List[str]) -> Dict[str, Dict]:
+        """Detail documents for several URLs: LRU first, then one mget for the rest."""
+        found: Dict[str, Dict] = {}
+        missing = []
+        for url in dict.fromkeys(press_release_urls):
+            cached = self.detail_cache.get(url)
+            if cached is not None:
+                found[url] = dict(cached[0])
+            else:
+                missing.append(url)
+
+        if not missing or not self.client:
+            return found
+
+        try:
+            response = self.gated(
+                self.client.mget,
+                index=self.index_name,
+                ids=missing,
+                source_excludes=DETAIL_EXCLUDES,
+            )
+            for item in response.get("docs", []):
+                if not item.get("found"):
+                    continue
+                doc = self._detail_from_source(item.get("_source", {}))
+                self.detail_cache.put(item["_id"], doc)
+                found[item["_id"]] = dict(doc)
+        except Overloaded:
+            raise
+        except Exception as e:
+            print(f"Error fetching documents by url: {e}")
+        return found
+
     def get_by_id(self, press_release_id: int) -> Optional[Dict]:
         """Retrieve one press release by id from Elasticsearch."""
         if not self.client:
@@ -742,17 +2033,12 @@ class ElasticsearchService:
             return None
 
         try:
-            response = self.client.get(index=self.index_name, id=press_release_id)
-            doc = response.get("_source", {})
-            return {
-                "title": doc.get("title"),
-                "company": doc.get("company"),
-                "published_date": doc.get("published_date"),
-                "url": doc.get("url"),
-                "full_text": doc.get("full_text"),
-            }
+            response = self.gated(self.client.get, index=self.index_name, id=press_release_id, source_includes=RESULT_FIELDS)
+            return response.get("_source", {})
         except NotFoundError:
             return None
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"Error fetching document by id: {e}")
             return None
\ No newline at end of file
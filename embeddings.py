@@ -0,0 +1,295 @@
+"""
+Offline document embeddings: TF-IDF followed by truncated SVD (latent
+semantic analysis), in NumPy, on CPU, with no network or pretrained model.
+
+The model is fit at ingest time over the corpus being indexed and saved to
+EMBEDDING_MODEL_PATH (press_releases.embed.npz by default). Documents are
+embedded into the `embedding` dense_vector field; queries are embedded with
+the same model for kNN search. Related vocabulary ("obesity", "weight
+management") lands close together because the SVD components capture terms
+that co-occur across releases.
+
+Fit/refresh the model from the JSON snapshot:
+    python3 embeddings.py [--source press_releases.json] [--dims 128]
+"""
+
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EMBEDDING_DIMS = int(os.getenv('EMBEDDING_DIMS', '128'))
+EMBEDDING_MODEL_PATH = os.getenv('EMBEDDING_MODEL_PATH', 'press_releases.embed.npz')
+
+TOKEN_PATTERN = re.compile(r"[^\W\d_][\w\-]*")
+STOPWORDS = frozenset(
+    "a an and are as at be been by for from has have in into is it its of on or that the their "
+    "this to was were will with which who also than such these those not may can our we".split()
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [
+        token for token in TOKEN_PATTERN.findall(str(text or "").lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class SparseRows:
+    """Minimal CSR matrix (rows = documents) with the products randomized SVD needs."""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_cols: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, n_cols)
+
+    def transpose(self) -> "SparseRows":
+        rows = np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=indptr[1:])
+        return SparseRows(indptr, rows[order], self.data[order], self.shape[0])
+
+    def dot(self, dense: np.ndarray, block_elements: int = 1 << 22) -> np.ndarray:
+        """
+        self @ dense, a block of rows at a time so the temporary (block nnz x k)
+        product stays around block_elements floats (16 MiB by default).
+        """
+        out = np.zeros((self.shape[0], dense.shape[1]), dtype=np.float32)
+        block_nnz = max(1, block_elements // max(1, dense.shape[1]))
+        start = 0
+        while start < self.shape[0]:
+            # At least one row per block, however long it is
+            end = int(np.searchsorted(self.indptr, self.indptr[start] + block_nnz, side="right")) - 1
+            end = min(max(end, start + 1), self.shape[0])
+            lo, hi = self.indptr[start], self.indptr[end]
+            if lo != hi:
+                contrib = self.data[lo:hi, None] * dense[self.indices[lo:hi]]
+                starts = self.indptr[start:end] - lo
+                nonempty = np.flatnonzero(np.diff(self.indptr[start:end + 1]))
+                out[start + nonempty] = np.add.reduceat(contrib, starts[nonempty], axis=0)
+            start = end
+        return out
+
+
+class Embedder:
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, components: np.ndarray, dims: int):
+        self.vocabulary = vocabulary
+        self.idf = idf.astype(np.float32)
+        # (rank x vocabulary) right singular vectors; rank <= dims
+        self.components = components.astype(np.float32)
+        self.dims = dims
+        # (mtime_ns, size) of the file this model was loaded from or saved to
+        self.signature: Optional[Tuple[int, int]] = None
+        self._fingerprint: Optional[str] = None
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Content hash of the vector space (vocabulary, idf, components).
+        bulk_index stores it in the index _meta, so queries are only embedded
+        with the model the stored vectors came from.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=12)
+            for term in sorted(self.vocabulary, key=self.vocabulary.get):
+                digest.update(term.encode("utf-8"))
+                digest.update(b"\0")
+            digest.update(self.idf.tobytes())
+            digest.update(np.ascontiguousarray(self.components).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    # --- fitting -----------------------------------------------------------
+
+    @classmethod
+    def fit(cls, texts: Sequence[Optional[str]], dims: int = EMBEDDING_DIMS, max_features: int = 50000,
+            min_df: int = 2, power_iterations: int = 2, seed: int = 0) -> "Embedder":
+        term_counts = [Counter(tokenize(text)) for text in texts]
+        model = cls.vectorizer(term_counts, dims, max_features, min_df)
+        matrix = model.tfidf(term_counts)
+        model.components = _randomized_svd_components(matrix, dims, power_iterations, seed)
+        return model
+
+    @classmethod
+    def vectorizer(cls, term_counts: Sequence[Dict[str, int]], dims: int = EMBEDDING_DIMS,
+                   max_features: int = 50000, min_df: int = 2) -> "Embedder":
+        """
+        The TF-IDF stage of fit alone (vocabulary and idf, no components):
+        enough for tfidf(), e.g. related.py scoring without a saved model.
+        """
+        df = Counter()
+        for counts in term_counts:
+            df.update(counts.keys())
+        if len(term_counts) < 50:
+            # Tiny corpora: keep every term, or nothing survives min_df
+            min_df = 1
+        terms = sorted(
+            (term for term, count in df.items() if count >= min_df),
+            key=lambda term: (-df[term], term),
+        )[:max_features]
+        vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+        n_docs = max(1, len(term_counts))
+        idf = np.zeros(len(vocabulary), dtype=np.float32)
+        for term, i in vocabulary.items():
+            idf[i] = math.log((1 + n_docs) / (1 + df[term])) + 1.0
+        return cls(vocabulary, idf, np.zeros((0, len(vocabulary)), dtype=np.float32), dims)
+
+    # --- transforming ------------------------------------------------------
+
+    def tfidf(self, term_counts: Iterable[Dict[str, int]]) -> SparseRows:
+        """L2-normalized sublinear TF-IDF rows over the model vocabulary, one per term-count dict."""
+        vocabulary = self.vocabulary
+        indptr = [0]
+        indices: List[int] = []
+        freqs: List[int] = []
+        for counts in term_counts:
+            for term, count in counts.items():
+                term_id = vocabulary.get(term)
+                if term_id is not None:
+                    indices.append(term_id)
+                    freqs.append(count)
+            indptr.append(len(indices))
+
+        indptr_array = np.asarray(indptr, dtype=np.int64)
+        indices_array = np.asarray(indices, dtype=np.int64)
+        data = (1.0 + np.log(np.asarray(freqs, dtype=np.float32))) * self.idf[indices_array]
+        rows = np.diff(indptr_array)
+        nonempty = np.flatnonzero(rows)
+        if len(nonempty):
+            norms = np.sqrt(np.add.reduceat(data * data, indptr_array[nonempty]))
+            data /= np.repeat(norms, rows[nonempty])
+        return SparseRows(indptr_array, indices_array, data.astype(np.float32), len(vocabulary))
+
+    def transform(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """(n x dims) float32 embeddings, L2-normalized; all-zero rows for texts with no known terms."""
+        projected = self.tfidf(Counter(tokenize(text)) for text in texts).dot(self.components.T)
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        np.divide(projected, norms, out=projected, where=norms > 0)
+        vectors = np.zeros((len(projected), self.dims), dtype=np.float32)
+        vectors[:, :projected.shape[1]] = projected
+        return vectors
+
+    def embed(self, text: Optional[str]) -> Optional[List[float]]:
+        """Embedding of one text as a list, or None if it has no known terms."""
+        vector = self.transform([text])[0]
+        if not vector.any():
+            return None
+        return vector.tolist()
+
+    # --- persistence -------------------------------------------------------
+
+    def save(self, path: str):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        # Written next to the model and swapped in, so a running API that
+        # reloads on mtime change never reads a half-written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, terms=np.array(terms), idf=self.idf, components=self.components,
+                     dims=np.array(self.dims))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Embedder":
+        with np.load(path, allow_pickle=False) as archive:
+            terms = archive["terms"].tolist()
+            return cls({term: i for i, term in enumerate(terms)}, archive["idf"],
+                       archive["components"], int(archive["dims"]))
+
+
+def _randomized_svd_components(matrix: SparseRows, rank: int, power_iterations: int, seed: int) -> np.ndarray:
+    """Top right singular vectors of a sparse matrix (Halko et al. randomized range finder)."""
+    n_rows, n_cols = matrix.shape
+    rank = min(rank, n_rows, n_cols)
+    if rank == 0:
+        return np.zeros((0, n_cols), dtype=np.float32)
+    sketch = min(rank + 10, n_rows, n_cols)
+    transposed = matrix.transpose()
+    rng = np.random.default_rng(seed)
+
+    basis, _ = np.linalg.qr(matrix.dot(rng.standard_normal((n_cols, sketch)).astype(np.float32)))
+    for _ in range(power_iterations):
+        basis, _ = np.linalg.qr(transposed.dot(basis))
+        basis, _ = np.linalg.qr(matrix.dot(basis))
+    # B = Q^T X, computed as (X^T Q)^T; its right singular vectors are X's
+    small = transposed.dot(basis).T
+    _, _, vt = np.linalg.svd(small, full_matrices=False)
+    return vt[:rank].astype(np.float32)
+
+
+def model_signature(path: Optional[str] = None) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path or EMBEDDING_MODEL_PATH)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_embedder(path: Optional[str] = None) -> Optional[Embedder]:
+    """The saved model, or None when it has not been fit yet."""
+    path = path or EMBEDDING_MODEL_PATH
+    signature = model_signature(path)
+    if signature is None:
+        return None
+    try:
+        model = Embedder.load(path)
+    except Exception as e:
+        print(f"Failed to load embedding model '{path}': {e}")
+        return None
+    model.signature = signature
+    return model
+
+
+def refresh_embedder(current: Optional[Embedder], path: Optional[str] = None) -> Optional[Embedder]:
+    """
+    current, or the saved model if the file was (re)written since current
+    was loaded: a reindex refits the model while the API keeps running.
+    """
+    signature = model_signature(path)
+    if signature is None or (current is not None and current.signature == signature):
+        return current
+    return load_embedder(path) or current
+
+
+def fit_embedder(documents: Sequence[Dict], path: Optional[str] = None, dims: int = EMBEDDING_DIMS) -> Embedder:
+    """Fit on title + body of the documents being indexed and save next to the snapshot."""
+    model = Embedder.fit([document_text(doc) for doc in documents], dims=dims)
+    path = path or EMBEDDING_MODEL_PATH
+    model.save(path)
+    model.signature = model_signature(path)
+    print(f"Fit embedding model: {len(model.vocabulary)} terms, rank {len(model.components)}")
+    return model
+
+
+def document_text(doc: Dict) -> str:
+    # Title twice: it is the densest statement of what a release is about
+    title = doc.get("title") or ""
+    return f"{title}\n{title}\n{doc.get('full_text') or ''}"
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from snapshot_store import iter_snapshot_records
+
+    parser = argparse.ArgumentParser(description="Fit the TF-IDF + SVD embedding model")
+    parser.add_argument("--source", default="press_releases.json")
+    parser.add_argument("--output", default=EMBEDDING_MODEL_PATH)
+    parser.add_argument("--dims", type=int, default=EMBEDDING_DIMS)
+    args = parser.parse_args()
+
+    fit_embedder(list(iter_snapshot_records(args.source)), args.output, args.dims)
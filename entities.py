@@ -0,0 +1,211 @@
+"""
+Ingest-time entity extraction for keyword filtering.
+
+bulk_index (and the local index build) run extract_entities on every press
+release and store the results as keyword fields, so filtering by drug, trial
+phase, regulatory event or partner company is a cached `terms` filter rather
+than a scoring full-text query. The heuristics are tuned for pharma press
+release titles and bodies; ENTITY_FILTERS lists the filter keys the API and
+filter config expose for them.
+
+Extraction runs once per release at ingest, so it is kept to a few scans of
+the text: the text is lower-cased once and shared, case-insensitive patterns
+run case-sensitively on that copy, and each pattern is only run when a
+literal it cannot match without is present.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+from suggest_index import BRAND_MARKS, BRAND_PATTERN, GENERIC_PATTERN, find_inn_names
+from synonyms import is_synonym_term
+
+# (request/filter key, document field, filter label)
+ENTITY_FILTERS = [
+    ("drug", "drugs", "Drug"),
+    ("phase", "phases", "Trial Phase"),
+    ("regulatory_event", "regulatory_events", "Regulatory Event"),
+    ("partner", "partners", "Partner Company"),
+]
+ENTITY_FIELDS = [field for _, field, _ in ENTITY_FILTERS]
+
+# INN-stem and trademark-sign false positives
+NOT_DRUGS = frozenset({
+    "peptide", "polypeptide", "nucleotide", "oligonucleotide", "antibodies",
+    "guidelines", "network", "nccn",
+})
+
+ROMAN = {"i": "1", "ii": "2", "iii": "3", "iv": "4"}
+# Matched against the lower-cased text
+PHASE_PATTERN = re.compile(
+    r"\bphase\s+(iv|iii|ii|i|[1-4])(?:\s*[ab])?(?:\s*(?:/|-|and)\s*(iv|iii|ii|i|[1-4])(?:[ab])?)?\b"
+)
+BIOLOGIC_SUFFIX = re.compile(r"-[a-z]{4}$")
+# Generic name right after a brand: "IMAAVY® (nipocalimab-aahu)"
+BRAND_GENERIC = re.compile(r"[^\w(]{0,3}\(\s*([a-z][a-z\-]+)\s*\)")
+
+# (label, lower-case literals of which every match contains one, pattern);
+# all patterns match the lower-cased text, so headline case ("FDA Approves")
+# is tagged like body text
+REGULATORY_EVENTS = [
+    ("FDA approval", ("approv",), re.compile(
+        r"\b(?:fda|food and drug administration)\b[^.]{0,80}\bapprov|\bapprov\w*[^.]{0,80}\b(?:fda|food and drug administration)\b")),
+    ("EC approval", ("approv",), re.compile(
+        r"\beuropean commission\b[^.]{0,80}\bapprov|\bapprov\w*[^.]{0,80}\beuropean commission\b|\beu approval\b")),
+    ("CHMP positive opinion", ("positive opinion",), re.compile(
+        r"\bchmp\b[^.]{0,120}\bpositive opinion|\bpositive opinion\b[^.]{0,120}\bchmp\b")),
+    ("Regulatory submission", ("submi", "accept", "fil"), re.compile(
+        r"\b(?:s?bla|s?nda|maa|regulatory submission)\b[^.]{0,60}\b(?:submi|accept|filed|fil)"
+        r"|\b(?:submi|accept)\w*[^.]{0,60}\b(?:s?bla|s?nda|maa)\b")),
+    ("Priority Review", ("priority review",), re.compile(r"\bpriority review\b")),
+    ("Breakthrough Therapy designation", ("breakthrough therapy",), re.compile(r"\bbreakthrough therapy\b")),
+    ("Fast Track designation", ("fast track",), re.compile(r"\bfast track\b")),
+    ("Orphan Drug designation", ("orphan drug",), re.compile(r"\borphan drug\b")),
+    ("Complete Response Letter", ("complete response letter",), re.compile(r"\bcomplete response letter\b")),
+]
+
+PARTNER_PATTERN = re.compile(
+    r"\b(?:collaboration|partnership|agreement|alliance|licen[cs]e|licensing|acquisition|acquire[sd]?|co-develop\w*)"
+    r"\s+(?:with|from|of|by)\s+([A-Z][\w&/\-]*(?:[ \t]+(?:&[ \t]+)?[A-Z][\w&/\-]*){0,3})"
+)
+COMPANY_SUFFIX = re.compile(r"[\s,]+(?:Inc|Ltd|LLC|plc|AG|SA|S\.A|Co|Corp|Corporation|GmbH|A/S|N\.V)\.?$", re.IGNORECASE)
+# Legal forms and industry name endings that mark a phrase as a company
+# ("Cidara Therapeutics", "Sino Pharmaceutical Limited", "Kelun-Biotech");
+# other capitalized phrases (people, universities, places) are not partners
+CORPORATE_SUFFIXES = (
+    r"Inc|Ltd|Limited|LLC|plc|AG|SA|S\.A|Co|Corp|Corporation|GmbH|A/S|N\.V|K\.K|Holdings|Group"
+    r"|Pharma|Pharmaceuticals?|Therapeutics|Biotech|Biotechnolog(?:y|ies)|Biosciences?|Biopharma\w*"
+    r"|Biologics|Life[ \t]+Sciences|Laboratories|Medicines"
+)
+CORPORATE_NAME = re.compile(rf"(?:^|[\s\-])(?:{CORPORATE_SUFFIXES})$")
+# "Acme, Inc." where the comma ends the PARTNER_PATTERN match
+CORPORATE_SUFFIX_AFTER = re.compile(r",[ \t]*(?:Inc|Ltd|Limited|LLC|plc|AG|SA|S\.A|Co|Corp|Corporation|GmbH|N\.V)\b")
+NOT_PARTNERS = frozenset({"The", "Phase", "U.S", "US", "EU", "FDA", "European", "China", "Japan", "President", "Dr"})
+
+
+def is_brand(text: str, match: re.Match) -> bool:
+    """
+    Trademarked words are only drugs when the synonyms file lists them or a
+    single generic name follows in parentheses ("TREMFYA® (guselkumab)");
+    device, program and organization marks have neither.
+    """
+    if is_synonym_term(match.group(1)):
+        return True
+    generic = BRAND_GENERIC.match(text, match.end())
+    return bool(generic) and (bool(find_inn_names(generic.group(1))) or is_synonym_term(generic.group(1)))
+
+
+def entity_filter_values(field: str, values: Iterable[str]) -> List[str]:
+    """Filter input in stored form: drugs are indexed lower-cased ("Keytruda" -> "keytruda")."""
+    if field == "drugs":
+        return [value.lower() for value in values]
+    return list(values)
+
+
+def extract_drugs(title: Optional[str], full_text: Optional[str]) -> List[str]:
+    """Lower-cased brand and generic names from the title and body."""
+    found: List[str] = []
+    # Parenthesised lower-case words are only generic names in titles
+    for text, generic in ((title, True), (full_text, False)):
+        if not text:
+            continue
+        names = []
+        if any(mark in text for mark in BRAND_MARKS):
+            names.extend(match.group(1) for match in BRAND_PATTERN.finditer(text) if is_brand(text, match))
+        if generic:
+            names.extend(match.group(1) for match in GENERIC_PATTERN.finditer(text))
+        names.extend(find_inn_names(text))
+        for name in names:
+            name = name.strip("-").lower()
+            # "nipocalimab-aahu" -> "nipocalimab"
+            name = BIOLOGIC_SUFFIX.sub("", name)
+            if len(name) > 3 and name not in NOT_DRUGS and name not in found:
+                found.append(name)
+    return found
+
+
+def extract_phases(text: Optional[str], lowered: Optional[str] = None) -> List[str]:
+    """Normalized trial phases ("Phase 3", "Phase 2/3")."""
+    found: List[str] = []
+    lowered = (text or "").lower() if lowered is None else lowered
+    if "phase" not in lowered:
+        return found
+    for match in PHASE_PATTERN.finditer(lowered):
+        first = ROMAN.get(match.group(1).lower(), match.group(1))
+        second = match.group(2)
+        phase = f"Phase {first}"
+        if second:
+            second = ROMAN.get(second.lower(), second)
+            if second != first:
+                phase = f"Phase {first}/{second}"
+        if phase not in found:
+            found.append(phase)
+    return found
+
+
+def extract_regulatory_events(text: Optional[str], lowered: Optional[str] = None) -> List[str]:
+    if not text:
+        return []
+    lowered = text.lower() if lowered is None else lowered
+    return [
+        label for label, literals, pattern in REGULATORY_EVENTS
+        if any(literal in lowered for literal in literals)
+        and pattern.search(lowered)
+    ]
+
+
+def clean_company(name: str) -> str:
+    name = name.strip(" .,;")
+    while True:
+        stripped = COMPANY_SUFFIX.sub("", name).strip(" .,;")
+        if stripped == name:
+            return name
+        name = stripped
+
+
+def extract_partners(text: Optional[str], company: Optional[str],
+                     known_companies: Iterable[str] = ()) -> List[str]:
+    """
+    Other companies named in the release: known publisher names found in the
+    text plus company names (see CORPORATE_NAME) following "collaboration
+    with", "agreement with", etc.
+    """
+    if not text:
+        return []
+    own = "".join(clean_company(company or "").lower().split())
+    found: List[str] = []
+
+    def add(name: str):
+        name = clean_company(name)
+        if len(name) < 3 or name in NOT_PARTNERS or name.split()[0] in NOT_PARTNERS:
+            return
+        lowered = name.lower()
+        compact = "".join(lowered.split())
+        if own and (compact in own or own in compact):
+            return
+        if all(lowered != existing.lower() for existing in found):
+            found.append(name)
+
+    for known in known_companies:
+        cleaned = clean_company(known)
+        # Substring test first: most known companies are not mentioned at all
+        if cleaned and cleaned in text and re.search(rf"\b{re.escape(cleaned)}\b", text):
+            add(cleaned)
+    for match in PARTNER_PATTERN.finditer(text):
+        if CORPORATE_NAME.search(match.group(1)) or CORPORATE_SUFFIX_AFTER.match(text, match.end()):
+            add(match.group(1))
+    return found
+
+
+def extract_entities(doc: Dict, known_companies: Iterable[str] = ()) -> Dict[str, List[str]]:
+    """Keyword field values for one document (see ENTITY_FIELDS)."""
+    title = doc.get("title")
+    full_text = doc.get("full_text")
+    text = f"{title or ''}\n{full_text or ''}"
+    lowered = text.lower()
+    return {
+        "drugs": extract_drugs(title, full_text),
+        "phases": extract_phases(text, lowered),
+        "regulatory_events": extract_regulatory_events(text, lowered),
+        "partners": extract_partners(text, doc.get("company"), known_companies),
+    }
@@ -2,10 +2,13 @@
 """
 One-time script to index all press releases from PostgreSQL into Elasticsearch.
 Run: python3 es_indexer.py
+     python3 es_indexer.py --reload-synonyms   # after editing pharma_synonyms.txt
+     python3 es_indexer.py --related           # recompute related releases only
 """
 
 from database import DatabaseManager, PressReleaseDB
 from elasticsearch_service import ElasticsearchService
+from embeddings import fit_embedder
 
 def index_press_releases():
     """Fetch all press releases from DB and index into Elasticsearch."""
@@ -50,16 +53,45 @@ def index_press_releases():
         print(f" Found {len(documents)} press releases in database")
         print("Indexing into Elasticsearch...")
         
+        # Refit the embedding model on the corpus being indexed
+        es_service.embedder = fit_embedder(documents)
+
         # Bulk index
         indexed_count = es_service.bulk_index(documents)
         
         if indexed_count > 0:
             print(f"Successfully indexed {indexed_count} documents into '{es_service.index_name}'")
+            es_service.update_related(documents)
         else:
             print(" Failed to index documents")
     
     except Exception as e:
         print(f"Error during indexing: {e}")
 
+def reload_synonyms():
+    """Push pharma_synonyms.txt to Elasticsearch; search analyzers reload without a reindex."""
+    es_service = ElasticsearchService()
+    if not es_service.client:
+        print("Cannot connect to Elasticsearch. Make sure it's running.")
+        return
+    es_service.sync_synonyms()
+
+
+def update_related():
+    """Recompute the related releases stored on every indexed document."""
+    es_service = ElasticsearchService()
+    if not es_service.client:
+        print("Cannot connect to Elasticsearch. Make sure it's running.")
+        return
+    es_service.update_related()
+
+
 if __name__ == '__main__':
-    index_press_releases()
\ No newline at end of file
+    import sys
+
+    if '--reload-synonyms' in sys.argv[1:]:
+        reload_synonyms()
+    elif '--related' in sys.argv[1:]:
+        update_related()
+    else:
+        index_press_releases()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Row encoders for /api/export.
+
+encode_rows turns an iterator of documents into NDJSON or CSV byte chunks of
+roughly CHUNK_BYTES, optionally gzip-compressed on the fly, so a streaming
+response never holds more than one chunk of output.
+"""
+
+import csv
+import io
+import zlib
+from typing import Dict, Iterable, Iterator, List
+
+from api_models import dumps
+
+CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def _csv_value(value):
+    # Entity and related fields are lists
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    return "" if value is None else value
+
+
+def _ndjson_chunks(rows: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = bytearray()
+    for row in rows:
+        buffer += dumps(row)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _csv_chunks(rows: Iterable[Dict], fields: List[str]) -> Iterator[bytes]:
+    text = io.StringIO()
+    writer = csv.writer(text)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(field)) for field in fields])
+        if text.tell() >= CHUNK_BYTES:
+            yield text.getvalue().encode("utf-8")
+            text.seek(0)
+            text.truncate()
+    if text.tell():
+        yield text.getvalue().encode("utf-8")
+
+
+def _gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def encode_rows(rows: Iterable[Dict], export_format: str, fields: List[str], compress: bool = False) -> Iterator[bytes]:
+    chunks = _csv_chunks(rows, fields) if export_format == "csv" else _ndjson_chunks(rows)
+    return _gzip_chunks(chunks) if compress else chunks
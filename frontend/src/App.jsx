@@ -4,7 +4,9 @@ import Pagination from './components/pagination';
 import './App.css';
 import SearchFiltersPanel from './components/SearchFiltersPanel';
 import PressReleaseModal from './components/PressReleaseModal';
-import { hasAnyQueryMatch } from './utils/highlight';
+
+const API_BASE = 'http://localhost:8000';
+const MAX_RESULT_WINDOW = 10000;
 
 const FEATURED_CATEGORIES = [
   {
@@ -51,19 +53,51 @@ const FEATURED_CATEGORIES = [
   },
 ];
 
+const EMPTY_FILTERS = {
+  query: '',
+  company: [],
+  startDate: '',
+  endDate: '',
+  entities: {}
+};
+
+// Query-string parameters shared by the paged list and the export
+const buildFilterParams = (appliedFilters) => {
+  let params = '';
+  if (appliedFilters.query) {
+    params += `query=${encodeURIComponent(appliedFilters.query)}&`;
+  }
+  if (appliedFilters.company.length > 0) {
+    appliedFilters.company.forEach(c => {
+      params += `company=${encodeURIComponent(c)}&`;
+    });
+  }
+  if (appliedFilters.startDate) {
+    params += `start_date=${appliedFilters.startDate}&`;
+  }
+  if (appliedFilters.endDate) {
+    params += `end_date=${appliedFilters.endDate}&`;
+  }
+  Object.entries(appliedFilters.entities || {}).forEach(([key, values]) => {
+    (values || []).forEach((value) => {
+      params += `${encodeURIComponent(key)}=${encodeURIComponent(value)}&`;
+    });
+  });
+  return params;
+};
+
 function App() {
   const SAVED_FILTERS_KEY = 'press_saved_filters_v1';
 
-  const [pressReleases, setPressReleases] = useState([]);
-  const [filteredReleases, setFilteredReleases] = useState([]);
+  // One server-side page of results; highlights are loaded per release on open
+  const [pageReleases, setPageReleases] = useState([]);
+  const [totalResults, setTotalResults] = useState(0);
+  const [totalPages, setTotalPages] = useState(0);
   const [currentPage, setCurrentPage] = useState(1);
   const [sortBy, setSortBy] = useState('relevance');
-  const [filters, setFilters] = useState({
-    query: '',
-    company: [],
-    startDate: '',
-    endDate: ''
-  });
+  const [filters, setFilters] = useState(EMPTY_FILTERS);
+  // Filters of the listed results, used when paging
+  const [appliedFilters, setAppliedFilters] = useState(EMPTY_FILTERS);
   const [recentSearches, setRecentSearches] = useState([]);
   const [savedFilters, setSavedFilters] = useState([]);
   const [prefsLoaded, setPrefsLoaded] = useState(false);
@@ -97,19 +131,31 @@ function App() {
 
   const fetchInitialData = async () => {
     try {
-      setLoading(true);
-      const response = await fetch('http://localhost:8000/api/initial-data');
+      const response = await fetch(`${API_BASE}/api/filter-config`);
       const data = await response.json();
+      setFilterConfig(data?.data || null);
+    } catch (error) {
+      console.error('Error fetching filter config:', error);
+    }
+    fetchPage(EMPTY_FILTERS, 1);
+  };
 
-      const releases = data?.data?.releases || [];
-      const config = data?.data?.filter_config || null;
-
-      setPressReleases(releases);
-      setFilteredReleases(releases);
-      setFilterConfig(config);
-      setCurrentPage(1);
+  // Only the displayed page is fetched: no highlighting and no facets
+  const fetchPage = async (pageFilters, page) => {
+    try {
+      setLoading(true);
+      const url = `${API_BASE}/api/query-press-releases?${buildFilterParams(pageFilters)}`
+        + `page=${page}&size=${itemsPerPage}&highlights=false&facets=false`;
+      const response = await fetch(url);
+      const data = await response.json();
+      setPageReleases(data?.data || []);
+      setTotalResults(data?.total || 0);
+      // Pages end at the server's result window (MAX_RESULT_WINDOW)
+      setTotalPages(Math.min(data?.total_pages || 0, Math.floor(MAX_RESULT_WINDOW / itemsPerPage)));
+      setAppliedFilters(pageFilters);
+      setCurrentPage(page);
     } catch (error) {
-      console.error('Error fetching initial data:', error);
+      console.error('Error fetching results:', error);
     } finally {
       setLoading(false);
     }
@@ -126,43 +172,21 @@ function App() {
   };
 
   const handleApplyFilter = async (overrideFilters = filters) => {
-    try {
-      setLoading(true);
-      let url = 'http://localhost:8000/api/query-press-releases?';
-      const appliedFilters = overrideFilters && typeof overrideFilters.preventDefault === 'function'
-        ? filters
-        : {
-            query: overrideFilters?.query || '',
-            company: Array.isArray(overrideFilters?.company) ? overrideFilters.company : [],
-            startDate: overrideFilters?.startDate || '',
-            endDate: overrideFilters?.endDate || '',
-          };
-      
-      if (appliedFilters.query) {
-        url += `query=${encodeURIComponent(appliedFilters.query)}&`;
-      }
-      if (appliedFilters.company.length > 0) {
-        appliedFilters.company.forEach(c => {
-          url += `company=${encodeURIComponent(c)}&`;
-        });
-      }
-      if (appliedFilters.startDate) {
-        url += `start_date=${appliedFilters.startDate}&`;
-      }
-      if (appliedFilters.endDate) {
-        url += `end_date=${appliedFilters.endDate}&`;
-      }
+    const nextFilters = overrideFilters && typeof overrideFilters.preventDefault === 'function'
+      ? filters
+      : {
+          query: overrideFilters?.query || '',
+          company: Array.isArray(overrideFilters?.company) ? overrideFilters.company : [],
+          startDate: overrideFilters?.startDate || '',
+          endDate: overrideFilters?.endDate || '',
+          entities: overrideFilters?.entities || {},
+        };
+    addRecentSearch(nextFilters.query);
+    await fetchPage(nextFilters, 1);
+  };
 
-      const response = await fetch(url);
-      const data = await response.json();
-      setFilteredReleases(data?.data || []);
-      addRecentSearch(appliedFilters.query);
-      setCurrentPage(1);
-    } catch (error) {
-      console.error('Error applying filter:', error);
-    } finally {
-      setLoading(false);
-    }
+  const handlePageChange = (page) => {
+    fetchPage(appliedFilters, page);
   };
 
   const handleOpenRelease = async (release, match = null) => {
@@ -176,14 +200,22 @@ function App() {
         setDetailLoading(false);
         return;
       }
-      const response = await fetch(`http://localhost:8000/api/press-releases/detail?url=${encodeURIComponent(release.url)}`);
+      const queryText = (appliedFilters.query || '').trim();
+      // Pages are fetched with highlights=false: load this release's snippets on open
+      const snippetsRequest = queryText
+        ? fetch(`${API_BASE}/api/press-releases/snippets?url=${encodeURIComponent(release.url)}&query=${encodeURIComponent(queryText)}`)
+            .then((snippetResponse) => (snippetResponse.ok ? snippetResponse.json() : null))
+            .catch(() => null)
+        : Promise.resolve(null);
+      const response = await fetch(`${API_BASE}/api/press-releases/detail?url=${encodeURIComponent(release.url)}`);
       const data = await response.json();
+      const snippets = (await snippetsRequest)?.data;
       if (data?.data) {
         setSelectedRelease({
           ...release,
           ...data.data,
-          matches: data.data.matches || release.matches || [],
-          summary: data.data.summary || release.summary || '',
+          matches: snippets?.matches || data.data.matches || release.matches || [],
+          summary: data.data.summary || release.summary || snippets?.summary || '',
           description: data.data.description || release.description || '',
         });
       }
@@ -227,6 +259,7 @@ function App() {
       company: preset.filters?.company || [],
       startDate: preset.filters?.startDate || '',
       endDate: preset.filters?.endDate || '',
+      entities: preset.filters?.entities || {},
     };
 
     setFilters(nextFilters);
@@ -257,31 +290,13 @@ function App() {
   };
 
   const handleResetFilter = () => {
-    setFilters({
-      query: '',
-      company: [],
-      startDate: '',
-      endDate: ''
-    });
-    setFilteredReleases(pressReleases);
-    setCurrentPage(1);
+    setFilters(EMPTY_FILTERS);
+    fetchPage(EMPTY_FILTERS, 1);
   };
 
+  // The server pages in relevance (or newest-first) order; other sorts reorder the page
   const sortedReleases = useMemo(() => {
-    const normalizedQuery = (filters.query || '').trim();
-    const list = normalizedQuery
-      ? filteredReleases.filter((release) => {
-          const fields = [
-            release?.title,
-            release?.company,
-            release?.summary,
-            release?.description,
-            ...(Array.isArray(release?.matches) ? release.matches.map((match) => match?.plain_text || '') : []),
-          ];
-
-          return fields.some((value) => hasAnyQueryMatch(value || '', normalizedQuery));
-        })
-      : [...filteredReleases];
+    const list = [...pageReleases];
 
     switch (sortBy) {
       case 'newest':
@@ -334,38 +349,22 @@ function App() {
     }
 
     return list;
-  }, [filteredReleases, sortBy, activeFeaturedCategory]);
+  }, [pageReleases, sortBy, activeFeaturedCategory]);
 
+  // The client only holds one page: the server streams every matching release
   const handleExportCsv = () => {
-    if (!sortedReleases.length) return;
-
-    const escapeCsv = (value) => `"${String(value ?? '').replace(/"/g, '""')}"`;
-
-    const headers = ['Title', 'Company', 'Published Date', 'URL', 'Top Match Preview'];
-    const rows = sortedReleases.map((item) => [
-      item.title,
-      item.company,
-      item.published_date,
-      item.url,
-      item.matches?.[0]?.plain_text || '',
-    ]);
-
-    const csvText = [headers, ...rows].map((row) => row.map(escapeCsv).join(',')).join('\n');
-    const blob = new Blob([csvText], { type: 'text/csv;charset=utf-8;' });
-    const url = URL.createObjectURL(blob);
+    if (!totalResults) return;
+
     const link = document.createElement('a');
-    link.href = url;
+    link.href = `${API_BASE}/api/export?${buildFilterParams(appliedFilters)}format=csv&fields=title,company,published_date,url`;
     link.setAttribute('download', `press-releases-${new Date().toISOString().slice(0, 10)}.csv`);
     document.body.appendChild(link);
     link.click();
     document.body.removeChild(link);
-    URL.revokeObjectURL(url);
   };
 
-  const totalPages = Math.ceil(sortedReleases.length / itemsPerPage);
   const startIndex = (currentPage - 1) * itemsPerPage;
-  const paginatedReleases = sortedReleases.slice(startIndex, startIndex + itemsPerPage);
-  const endIndex = Math.min(startIndex + itemsPerPage, sortedReleases.length);
+  const endIndex = startIndex + pageReleases.length;
 
   const todayLabel = new Date().toLocaleDateString('en-US', {
     month: 'long',
@@ -413,14 +412,12 @@ function App() {
                 tabIndex={0}
                 onClick={() => {
                   setActiveFeaturedCategory((prev) => (prev === story.id ? '' : story.id));
-                  setCurrentPage(1);
                   document.getElementById('results-section')?.scrollIntoView({ behavior: 'smooth', block: 'start' });
                 }}
                 onKeyDown={(event) => {
                   if (event.key === 'Enter' || event.key === ' ') {
                     event.preventDefault();
                     setActiveFeaturedCategory((prev) => (prev === story.id ? '' : story.id));
-                    setCurrentPage(1);
                     document.getElementById('results-section')?.scrollIntoView({ behavior: 'smooth', block: 'start' });
                   }
                 }}
@@ -441,10 +438,7 @@ function App() {
               <button
                 type="button"
                 className="btn btn-sm btn-light border"
-                onClick={() => {
-                  setActiveFeaturedCategory('');
-                  setCurrentPage(1);
-                }}
+                onClick={() => setActiveFeaturedCategory('')}
               >
                 Clear
               </button>
@@ -467,12 +461,9 @@ function App() {
         onDeleteRecentSearch={handleDeleteRecentSearch}
         loading={loading}
         sortBy={sortBy}
-        onSortChange={(value) => {
-          setSortBy(value);
-          setCurrentPage(1);
-        }}
+        onSortChange={setSortBy}
         onExportCsv={handleExportCsv}
-        hasResults={sortedReleases.length > 0}
+        hasResults={totalResults > 0}
       />
 
         {/* Loading State */}
@@ -487,8 +478,8 @@ function App() {
         {/* Results Count */}
         {!loading && (
           <div className="mb-4" id="results-section">
-            <p className="results-summary mb-1">Found <span className="count">{sortedReleases.length}</span> results</p>
-            <p className="results-range mb-0">Showing {sortedReleases.length ? `${startIndex + 1}-${endIndex}` : '0-0'} of {sortedReleases.length}</p>
+            <p className="results-summary mb-1">Found <span className="count">{totalResults}</span> results</p>
+            <p className="results-range mb-0">Showing {pageReleases.length ? `${startIndex + 1}-${endIndex}` : '0-0'} of {totalResults}</p>
           </div>
         )}
 
@@ -496,9 +487,9 @@ function App() {
         {!loading && sortedReleases.length > 0 && (
           <>
             <PressReleaseList
-              releases={paginatedReleases}
+              releases={sortedReleases}
               onOpenRelease={handleOpenRelease}
-              searchQuery={filters.query}
+              searchQuery={appliedFilters.query}
             />
 
             {/* Pagination */}
@@ -506,7 +497,7 @@ function App() {
               <Pagination
                 currentPage={currentPage}
                 totalPages={totalPages}
-                onPageChange={setCurrentPage}
+                onPageChange={handlePageChange}
               />
             )}
           </>
@@ -523,7 +514,7 @@ function App() {
           show={showModal}
           release={selectedRelease}
           matchTarget={selectedMatch}
-          searchQuery={filters.query}
+          searchQuery={appliedFilters.query}
           loading={detailLoading}
           onClose={handleCloseModal}
         />
@@ -31,6 +31,13 @@ function SearchFiltersPanel({
   const getLabel = (key, fallback) => fields.find((field) => field.key === key)?.label || fallback;
   const getPlaceholder = (key, fallback) => fields.find((field) => field.key === key)?.placeholder || fallback;
 
+  // Entity filters (drug, phase, ...) declared in the filter config as keyword fields
+  const keywordFields = fields.filter((field) => field.type === 'keyword' && field.enabled);
+
+  const setEntityValues = (key, values) => {
+    setFilters({ ...filters, entities: { ...(filters.entities || {}), [key]: values } });
+  };
+
   const toggleCompany = (company) => {
     const selected = filters.company || [];
     const next = selected.includes(company)
@@ -138,6 +145,31 @@ function SearchFiltersPanel({
             </>
           )}
 
+          {keywordFields.map((field) => {
+            const options = filterConfig?.options?.[field.field] || [];
+            const selected = filters.entities?.[field.key] || [];
+            return (
+              <div key={field.key} className="col-md-6">
+                <label className="form-label fw-semibold" htmlFor={`entity-${field.key}`}>{field.label}</label>
+                <select
+                  id={`entity-${field.key}`}
+                  className="form-select"
+                  multiple
+                  size={Math.min(4, Math.max(2, options.length))}
+                  value={selected}
+                  onChange={(e) => setEntityValues(
+                    field.key,
+                    Array.from(e.target.selectedOptions, (option) => option.value),
+                  )}
+                >
+                  {options.map((option) => (
+                    <option key={option} value={option}>{option}</option>
+                  ))}
+                </select>
+              </div>
+            );
+          })}
+
           <div className="col-12 d-flex gap-2 align-items-end">
             <button className="btn btn-primary grow btn-view" onClick={() => onApply()} disabled={loading}>
               Apply
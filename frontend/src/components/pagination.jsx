@@ -2,7 +2,7 @@ import React from 'react';
 
 function Pagination({ currentPage, totalPages, onPageChange }) {
   const pages = [];
-  const maxPagesToShow = totalPages;
+  const maxPagesToShow = Math.min(totalPages, 7);
 
   let startPage = Math.max(1, currentPage - Math.floor(maxPagesToShow / 2));
   let endPage = Math.min(totalPages, startPage + maxPagesToShow - 1);
@@ -0,0 +1,143 @@
+"""
+ASGI middleware adding HTTP validators and response compression.
+
+- GET responses on the cached paths get a weak ETag derived from the index
+  generation token plus the request path/query, and a Cache-Control header.
+  A matching If-None-Match is answered with 304 before the endpoint runs, so
+  revalidations never reach Elasticsearch. Responses that set their own
+  Cache-Control (backend error fallbacks are sent no-store) get no validators.
+- Buffered responses above a size threshold are compressed with brotli
+  (when the optional `brotli` package is installed) or gzip.
+Streaming responses (several body chunks) pass through untouched.
+"""
+
+import gzip
+import hashlib
+import importlib
+from typing import Iterable, Optional
+
+try:
+    brotli = importlib.import_module("brotli")
+except Exception:
+    brotli = None
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _accepts(accept_encoding: Optional[str], coding: str) -> bool:
+    if not accept_encoding:
+        return False
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() != coding:
+            continue
+        return params.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class HttpCacheMiddleware:
+    def __init__(self, app, generation_tracker, cached_paths: Iterable[str],
+                 max_age: int = 0, compress_min_bytes: int = 1024, compress_level: int = 6):
+        self.app = app
+        self.generation_tracker = generation_tracker
+        self.cached_paths = set(cached_paths)
+        self.max_age = max_age
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def etag_for(self, scope) -> Optional[str]:
+        generation = self.generation_tracker.current
+        if generation is None or scope.get("method") != "GET" or scope.get("path") not in self.cached_paths:
+            return None
+        digest = hashlib.blake2b(digest_size=12)
+        digest.update(generation.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(scope["path"].encode("utf-8"))
+        digest.update(b"?")
+        digest.update(scope.get("query_string", b""))
+        return f'W/"{digest.hexdigest()}"'
+
+    def cache_headers(self, etag: str):
+        return [
+            (b"etag", etag.encode("latin-1")),
+            (b"cache-control", f"public, max-age={self.max_age}, must-revalidate".encode("latin-1")),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        etag = self.etag_for(scope)
+        if etag is not None:
+            if_none_match = _header(scope, b"if-none-match")
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+                await send({"type": "http.response.start", "status": 304, "headers": self.cache_headers(etag)})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        accept_encoding = _header(scope, b"accept-encoding")
+        encoding = None
+        if brotli is not None and _accepts(accept_encoding, "br"):
+            encoding = "br"
+        elif _accepts(accept_encoding, "gzip"):
+            encoding = "gzip"
+
+        start_message = None
+        body_parts = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                # Streaming response: flush what we have and stop buffering
+                passthrough = True
+                await send(start_message)
+                await send({"type": "http.response.body", "body": b"".join(body_parts), "more_body": True})
+                return
+
+            await self._send_buffered(send, start_message, b"".join(body_parts), etag, encoding)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_buffered(self, send, start_message, body: bytes, etag: Optional[str], encoding: Optional[str]):
+        status = start_message["status"]
+        headers = [
+            (key, value) for key, value in start_message.get("headers", [])
+            if key not in (b"content-length",)
+        ]
+        header_names = {key for key, _ in headers}
+
+        # Endpoints that set their own Cache-Control (e.g. no-store) opt out of validators
+        if etag is not None and status == 200 and not header_names & {b"etag", b"cache-control"}:
+            headers.extend(self.cache_headers(etag))
+
+        if encoding and len(body) >= self.compress_min_bytes and b"content-encoding" not in header_names:
+            if encoding == "br":
+                body = brotli.compress(body, quality=min(self.compress_level, 11))
+            else:
+                body = gzip.compress(body, compresslevel=self.compress_level)
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"vary", b"Accept-Encoding"))
+
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
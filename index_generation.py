@@ -0,0 +1,58 @@
+"""
+Background tracker for the search backend's index generation token.
+
+The token (see ElasticsearchService.index_generation) changes whenever the
+press release index is rebuilt or its documents change. Polling it off the
+request path lets HTTP validators and in-process caches react to a reindex
+without every request asking Elasticsearch.
+"""
+
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class GenerationTracker:
+    def __init__(self, search_service, interval: float = 5.0):
+        self.search_service = search_service
+        self.interval = interval
+        self.current: Optional[str] = None
+        self.checked_at = 0.0
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, listener: Callable[[Optional[str]], None]):
+        """Call listener(new_generation) each time the generation changes."""
+        self._listeners.append(listener)
+
+    def check(self) -> bool:
+        """Poll the backend once; returns True if the generation changed."""
+        with self._lock:
+            generation = self.search_service.index_generation()
+            self.checked_at = time.monotonic()
+            if generation == self.current:
+                return False
+            self.current = generation
+
+        for listener in self._listeners:
+            try:
+                listener(generation)
+            except Exception as e:
+                print(f"Error in index generation listener: {e}")
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.check()
+                except Exception as e:
+                    print(f"Error checking index generation: {e}")
+                time.sleep(self.interval)
+
+        self._thread = threading.Thread(target=loop, name="index-generation", daemon=True)
+        self._thread.start()
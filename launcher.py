@@ -0,0 +1,86 @@
+"""
+Pre-forking production launcher for the API.
+
+The app is imported once in the parent (search backend objects, the local
+index and the suggest data structures are built before forking and shared
+copy-on-write). The parent then binds the listening socket and forks
+`workers` uvicorn servers that accept on it. Dead workers are replaced, and
+SIGTERM/SIGINT stop all of them.
+
+Background threads (index generation polling, Elasticsearch reconnects) are
+started by the app's startup event, i.e. in each worker after the fork.
+"""
+
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, log_level: str):
+    # Default signal handling again; uvicorn installs its own for graceful shutdown
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, access_log=False))
+    server.run(sockets=[sock])
+
+
+def serve(app, host: str = "0.0.0.0", port: int = 8000, workers: int = 2, log_level: str = "info"):
+    """Serve an already imported ASGI app from `workers` forked processes."""
+    sock = bind_socket(host, port)
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(app, sock, log_level)
+            finally:
+                os._exit(0)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Starting {workers} workers on {host}:{port} (parent pid {os.getpid()})")
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {status}; restarting")
+        if time.monotonic() - started < 1.0:
+            # Crashing on startup: don't spin
+            time.sleep(1.0)
+        spawn()
+
+    sock.close()
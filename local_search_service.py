@@ -0,0 +1,847 @@
+#!/usr/bin/env python3
+"""
+In-process search backend with the same query methods as ElasticsearchService.
+
+Documents are held in an inverted index with array-backed postings (BM25
+scoring) plus integer bitsets for company and date filtering. The index is
+built from a dataset snapshot (press_releases.json by default) or from
+PostgreSQL, and persisted next to the source for fast startup.
+
+Build/refresh the persisted index:
+    python3 local_search_service.py                # from press_releases.json
+    python3 local_search_service.py --source postgres
+"""
+
+import copy
+import math
+import os
+import pickle
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from elasticsearch_service import (
+    DEFAULT_FILTER_FIELDS,
+    build_query_results,
+    light_stem,
+    query_terms,
+)
+from detail_cache import document_etag
+from embeddings import document_text, load_embedder, reciprocal_rank_fusion, refresh_embedder
+from records import PressReleaseHit
+from related import compute_related
+from entities import ENTITY_FIELDS, entity_filter_values, extract_entities
+from profiling import NULL_TIMER, StageTimer
+from passages import SENTENCE_END, passage_spans
+from snapshot_store import iter_snapshot_records
+
+INDEX_FORMAT_VERSION = 5
+TOKEN_PATTERN = re.compile(r"\w+")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2.0
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased word tokens, roughly what the ES standard analyzer produces."""
+    return TOKEN_PATTERN.findall(str(text or "").lower())
+
+
+def ids_to_mask(doc_ids: Iterable[int]) -> int:
+    """
+    Bitset with doc_ids set, packed from a bool array in one pass (OR-ing in
+    1 << doc_id per id copies the whole integer every time).
+    """
+    ids = np.fromiter(doc_ids, dtype=np.int64)
+    if not len(ids):
+        return 0
+    bits = np.zeros(int(ids.max()) + 1, dtype=bool)
+    bits[ids] = True
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+class FieldIndex:
+    """Postings for one text field, stored as flat arrays indexed by term id."""
+
+    def __init__(self, terms: Dict[str, int], starts: array, doc_ids: array,
+                 freqs: array, lengths: array):
+        self.terms = terms
+        self.starts = starts
+        self.doc_ids = doc_ids
+        self.freqs = freqs
+        self.lengths = lengths
+        total = sum(lengths)
+        self.avg_length = (total / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, texts: List[Optional[str]]) -> "FieldIndex":
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = array("I")
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, freq))
+
+        terms: Dict[str, int] = {}
+        starts = array("I", [0])
+        doc_ids = array("I")
+        freqs = array("I")
+        for term_id, term in enumerate(sorted(postings)):
+            terms[term] = term_id
+            for doc_id, freq in postings[term]:
+                doc_ids.append(doc_id)
+                freqs.append(freq)
+            starts.append(len(doc_ids))
+        return cls(terms, starts, doc_ids, freqs, lengths)
+
+    def postings(self, term: str) -> Tuple[memoryview, memoryview]:
+        term_id = self.terms.get(term)
+        if term_id is None:
+            return memoryview(array("I")), memoryview(array("I"))
+        start, end = self.starts[term_id], self.starts[term_id + 1]
+        return memoryview(self.doc_ids)[start:end], memoryview(self.freqs)[start:end]
+
+    def bm25(self, tokens: Iterable[str], doc_count: int) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term in set(tokens):
+            doc_ids, freqs = self.postings(term)
+            if not len(doc_ids):
+                continue
+            idf = math.log(1 + (doc_count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            for doc_id, freq in zip(doc_ids, freqs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / (self.avg_length or 1))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (BM25_K1 + 1) / (freq + norm)
+        return scores
+
+    def docs_with_all(self, tokens: Iterable[str]) -> set:
+        result = None
+        for term in set(tokens):
+            doc_ids = set(self.postings(term)[0])
+            result = doc_ids if result is None else result & doc_ids
+            if not result:
+                return set()
+        return result or set()
+
+
+class LocalSearchIndex:
+    """Documents ordered by published_date desc, so doc id order is the list order."""
+
+    def __init__(self, docs: List[Dict], fields: Dict[str, FieldIndex],
+                 company_bits: Dict[str, int], source_signature=None):
+        self.docs = docs
+        self.fields = fields
+        self.company_bits = company_bits
+        self.source_signature = source_signature
+        self.url_to_id = {doc.get("url"): doc_id for doc_id, doc in enumerate(docs) if doc.get("url")}
+        dated = [doc_id for doc_id, doc in enumerate(docs) if doc.get("published_date")]
+        self.dated_count = len(dated)
+        # Ascending view of the (descending) date column for bisecting ranges
+        self.dates_asc = [str(docs[doc_id]["published_date"])[:10] for doc_id in reversed(dated)]
+        self.all_mask = (1 << len(docs)) - 1
+        # Entity field -> value -> bitset, like company_bits
+        entity_ids: Dict[str, Dict[str, List[int]]] = {field: {} for field in ENTITY_FIELDS}
+        for doc_id, doc in enumerate(docs):
+            for field in ENTITY_FIELDS:
+                for value in doc.get(field) or ():
+                    entity_ids[field].setdefault(value, []).append(doc_id)
+        self.entity_bits: Dict[str, Dict[str, int]] = {
+            field: {value: ids_to_mask(ids) for value, ids in values.items()}
+            for field, values in entity_ids.items()
+        }
+        self._stem_terms: Optional[Dict[str, List[str]]] = None
+        self._vectors = None
+
+    @classmethod
+    def build(cls, records: Iterable[Dict], source_signature=None, embedder=None) -> "LocalSearchIndex":
+        docs = [
+            {
+                "title": record.get("title"),
+                "company": record.get("company"),
+                "published_date": record.get("published_date"),
+                "url": record.get("url"),
+                "full_text": record.get("full_text"),
+            }
+            for record in records
+        ]
+        # Missing dates sort last, like ES does for a desc sort
+        docs.sort(key=lambda doc: str(doc.get("published_date") or ""), reverse=True)
+        for doc in docs:
+            doc["passage_spans"] = passage_spans(doc.get("full_text"))
+        for doc, related in zip(docs, compute_related(docs, embedder=embedder)):
+            doc["related"] = related
+        known_companies = {doc.get("company") for doc in docs if doc.get("company")}
+        for doc in docs:
+            doc.update(extract_entities(doc, known_companies))
+
+        fields = {
+            "title": FieldIndex.build([doc.get("title") for doc in docs]),
+            "full_text": FieldIndex.build([doc.get("full_text") for doc in docs]),
+        }
+        company_ids: Dict[str, List[int]] = {}
+        for doc_id, doc in enumerate(docs):
+            company = doc.get("company")
+            if company is not None:
+                company_ids.setdefault(company, []).append(doc_id)
+        company_bits = {company: ids_to_mask(ids) for company, ids in company_ids.items()}
+        return cls(docs, fields, company_bits, source_signature)
+
+    def save(self, path: str):
+        payload = {
+            "version": INDEX_FORMAT_VERSION,
+            "source_signature": self.source_signature,
+            "docs": self.docs,
+            "company_bits": self.company_bits,
+            "fields": {
+                name: (field.terms, field.starts, field.doc_ids, field.freqs, field.lengths)
+                for name, field in self.fields.items()
+            },
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["LocalSearchIndex"]:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("version") != INDEX_FORMAT_VERSION:
+            return None
+        fields = {name: FieldIndex(*parts) for name, parts in payload["fields"].items()}
+        return cls(payload["docs"], fields, payload["company_bits"], payload.get("source_signature"))
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # --- filtering -------------------------------------------------------
+
+    def date_mask(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> int:
+        if not start_date and not end_date:
+            return self.all_mask
+        count = self.dated_count
+        first = count - bisect_right(self.dates_asc, str(end_date)[:10]) if end_date else 0
+        last = count - bisect_left(self.dates_asc, str(start_date)[:10]) if start_date else count
+        if last <= first:
+            return 0
+        return ((1 << last) - 1) ^ ((1 << first) - 1)
+
+    def company_mask(self, companies: Optional[List[str]]) -> int:
+        if not companies:
+            return self.all_mask
+        mask = 0
+        for company in companies:
+            mask |= self.company_bits.get(company, 0)
+        return mask
+
+    def entity_mask(self, entities: Optional[Dict[str, List[str]]]) -> int:
+        mask = self.all_mask
+        for field, values in (entities or {}).items():
+            if field in self.entity_bits and values:
+                field_mask = 0
+                for value in entity_filter_values(field, values):
+                    field_mask |= self.entity_bits[field].get(value, 0)
+                mask &= field_mask
+        return mask
+
+    def company_substring_mask(self, company: Optional[str]) -> int:
+        if not company:
+            return self.all_mask
+        needle = company.lower()
+        mask = 0
+        for name, bits in self.company_bits.items():
+            if name == company or needle in name.lower():
+                mask |= bits
+        return mask
+
+    @staticmethod
+    def mask_to_ids(mask: int, limit: Optional[int] = None) -> List[int]:
+        """Set bits in ascending order, i.e. newest first; stops after limit ids."""
+        if not mask:
+            return []
+        data = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+        ids = np.flatnonzero(np.unpackbits(data, bitorder="little"))
+        return (ids if limit is None else ids[:limit]).tolist()
+
+    def facets(self, query_mask: int, company_mask: int, date_mask: int) -> Dict:
+        """Company counts ignore the company filter; month counts ignore the date filter."""
+        company_counts = []
+        for company, bits in self.company_bits.items():
+            count = (bits & query_mask & date_mask).bit_count()
+            if count:
+                company_counts.append({"key": company, "count": count})
+        company_counts.sort(key=lambda item: (-item["count"], item["key"]))
+
+        months: Dict[str, int] = {}
+        for doc_id in self.mask_to_ids(query_mask & company_mask):
+            published = self.docs[doc_id].get("published_date")
+            if published:
+                month = str(published)[:7]
+                months[month] = months.get(month, 0) + 1
+
+        return {
+            "companies": company_counts[:200],
+            "published_month": [{"key": month, "count": months[month]} for month in sorted(months)],
+        }
+
+    def nearest(self, embedder, query_vector: List[float], mask: int, k: int) -> List[int]:
+        """Brute-force cosine kNN over the documents in mask (vectors embedded on first use)."""
+        if self._vectors is None or self._vectors[0] is not embedder:
+            self._vectors = (embedder, embedder.transform([document_text(doc) for doc in self.docs]))
+        vectors = self._vectors[1]
+        candidates = self.mask_to_ids(mask)
+        if not candidates or k <= 0:
+            return []
+        similarities = vectors[candidates] @ np.asarray(query_vector, dtype=np.float32)
+        top = np.argsort(-similarities, kind="stable")[:k]
+        return [candidates[i] for i in top if similarities[i] > 0]
+
+    # --- matching --------------------------------------------------------
+
+    def stem_terms(self, term: str) -> List[str]:
+        """Vocabulary tokens with the same light stem as term ("approval" -> approved, approvals, ...)."""
+        if self._stem_terms is None:
+            stems: Dict[str, List[str]] = {}
+            for token in set(self.fields["title"].terms) | set(self.fields["full_text"].terms):
+                stems.setdefault(light_stem(token), []).append(token)
+            self._stem_terms = stems
+        return self._stem_terms.get(light_stem(term), [])
+
+    def score_query(self, query_text: str, terms: List[str]) -> Dict[int, float]:
+        """
+        Approximate the ES query: multi_match over title^2/full_text (best
+        field wins) plus a constant bonus per matching term stem or synonym,
+        standing in for the english analyzer's stemming and synonym graph.
+        Like the analyzed query, a term matches whole tokens only; a
+        multi-word synonym needs all of its tokens.
+        """
+        tokens = tokenize(query_text)
+        doc_count = len(self.docs)
+        title_scores = self.fields["title"].bm25(tokens, doc_count)
+        body_scores = self.fields["full_text"].bm25(tokens, doc_count)
+
+        scores: Dict[int, float] = {}
+        for doc_id in set(title_scores) | set(body_scores):
+            scores[doc_id] = max(title_scores.get(doc_id, 0.0) * TITLE_BOOST, body_scores.get(doc_id, 0.0))
+
+        for term in terms:
+            if len(term) < 3:
+                continue
+            term_tokens = tokenize(term)
+            for field in ("full_text", "title"):
+                if len(term_tokens) > 1:
+                    matched = self.fields[field].docs_with_all(term_tokens)
+                else:
+                    matched = set()
+                    for token in self.stem_terms(term):
+                        matched.update(self.fields[field].postings(token)[0])
+                for doc_id in matched:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + 1.0
+        return scores
+
+    def highlight(self, doc: Dict, query_text: str, terms: List[str]) -> Dict[str, List[str]]:
+        exact = set(tokenize(query_text))
+        partial = [term for term in terms if len(term) >= 3]
+
+        # Bodies repeat the same tokens many times; decide each distinct token once
+        decided: Dict[str, bool] = {}
+
+        def is_match(token: str) -> bool:
+            matched = decided.get(token)
+            if matched is None:
+                lowered = token.lower()
+                matched = decided[token] = lowered in exact or any(term in lowered for term in partial)
+            return matched
+
+        highlight = {}
+        title_fragment = mark_fragment(doc.get("title"), is_match)
+        if title_fragment:
+            highlight["title"] = [title_fragment]
+        # Every match contains one of these strings, so sentences without any
+        # of them are skipped without tokenizing
+        needles = sorted(exact.union(partial), key=len, reverse=True)
+        candidate = re.compile("|".join(map(re.escape, needles)), re.IGNORECASE) if needles else None
+        body_fragments = best_fragments(doc.get("full_text"), is_match,
+                                        prefilter=candidate.search if candidate else None)
+        if body_fragments:
+            highlight["full_text"] = body_fragments
+        return highlight
+
+
+def mark_fragment(text: Optional[str], is_match) -> Optional[str]:
+    """Wrap matching tokens in <mark>; None when nothing matches."""
+    if not text:
+        return None
+    parts = []
+    position = 0
+    found = False
+    for token in TOKEN_PATTERN.finditer(text):
+        if not is_match(token.group()):
+            continue
+        found = True
+        parts.append(text[position:token.start()])
+        parts.append(f"<mark>{token.group()}</mark>")
+        position = token.end()
+    if not found:
+        return None
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def best_fragments(text: Optional[str], is_match, fragment_size: int = 180,
+                   number_of_fragments: int = 3, prefilter=None) -> List[str]:
+    """
+    Sentence-bounded fragments with the most matches, returned in text order.
+    prefilter(sentence), when given, must be truthy for any sentence that can
+    contain a match; other sentences are not tokenized.
+    """
+    if not text:
+        return []
+    scored = []
+    for position, sentence in enumerate(SENTENCE_END.split(text)):
+        sentence = sentence.strip()
+        if not sentence or (prefilter is not None and not prefilter(sentence)):
+            continue
+        hits = [token for token in TOKEN_PATTERN.finditer(sentence) if is_match(token.group())]
+        if not hits:
+            continue
+        if len(sentence) > fragment_size:
+            # Cut on word boundaries, like passages.passage_spans
+            start = max(0, hits[0].start() - fragment_size // 4)
+            if start:
+                space = sentence.find(" ", start, hits[0].start())
+                start = space + 1 if space != -1 else hits[0].start()
+            end = start + fragment_size
+            if end < len(sentence):
+                cut = sentence.rfind(" ", start, end)
+                end = cut if cut > start else end
+            sentence = sentence[start:end]
+        fragment = mark_fragment(sentence, is_match)
+        if fragment:
+            scored.append((len({token.group().lower() for token in hits}), position, fragment))
+    top = sorted(scored, key=lambda item: (-item[0], item[1]))[:number_of_fragments]
+    return [fragment for _, _, fragment in sorted(top, key=lambda item: item[1])]
+
+
+def file_signature(path: str):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def load_database_records(db_url: Optional[str] = None) -> List[Dict]:
+    from database import DatabaseManager, PressReleaseDB
+
+    db_manager = DatabaseManager(db_url) if db_url else DatabaseManager()
+    session = db_manager.get_session()
+    try:
+        return [
+            {
+                "company": pr.company,
+                "published_date": pr.published_date.isoformat() if pr.published_date else None,
+                "title": pr.title,
+                "url": pr.url,
+                "full_text": pr.full_text,
+            }
+            for pr in session.query(PressReleaseDB).all()
+        ]
+    finally:
+        session.close()
+
+
+def open_local_index(source: str = "press_releases.json", index_path: Optional[str] = None,
+                     rebuild: bool = False, embedder=None) -> LocalSearchIndex:
+    """
+    Load the persisted index, rebuilding it when the snapshot or the
+    embedding model changed (related lists are scored with the model's
+    TF-IDF weights). source is a snapshot path or "postgres"; a
+    Postgres-built index is otherwise only rebuilt on request since there is
+    no cheap change signature for it.
+    """
+    if index_path is None:
+        index_path = "press_releases.bm25" if source == "postgres" else f"{os.path.splitext(source)[0]}.bm25"
+
+    model = embedder.fingerprint if embedder is not None else None
+    signature = None if source == "postgres" else file_signature(source)
+
+    if not rebuild and os.path.exists(index_path):
+        try:
+            index = LocalSearchIndex.load(index_path)
+            # source_signature is (source signature, model fingerprint)
+            stored = index.source_signature if index is not None else None
+            if (isinstance(stored, tuple) and len(stored) == 2 and stored[1] == model
+                    and (signature is None or stored[0] == signature)):
+                return index
+        except Exception as e:
+            print(f"Ignoring unreadable local index '{index_path}': {e}")
+
+    if source == "postgres":
+        records = load_database_records(os.getenv("DATABASE_URL"))
+        signature = ("postgres", len(records))
+    else:
+        records = iter_snapshot_records(source)
+
+    index = LocalSearchIndex.build(records, source_signature=(signature, model), embedder=embedder)
+    try:
+        index.save(index_path)
+    except OSError as e:
+        print(f"Could not persist local index to '{index_path}': {e}")
+    return index
+
+
+class LocalSearchService:
+    def __init__(self, source: Optional[str] = None, index_path: Optional[str] = None):
+        """
+        Load (or build) the in-process index. Falls back to an empty index so
+        the API keeps serving if the source is missing.
+        """
+        self.index_name = 'press_releases'
+        self.highlight_top_hits = int(os.getenv('ELASTIC_HIGHLIGHT_TOP_HITS', '100'))
+        self.search_mode = os.getenv('SEARCH_MODE', 'lexical').lower()
+        self.embedder = load_embedder()
+        self.knn_k = int(os.getenv('ELASTIC_KNN_K', '100'))
+        self.rrf_rank_constant = int(os.getenv('RRF_RANK_CONSTANT', '60'))
+        # Saved-search alerts are percolated at Elasticsearch ingest; the
+        # read-only local index has no ingest to hook
+        self.alerts = None
+        source = source or os.getenv('LOCAL_INDEX_SOURCE', 'press_releases.json')
+        index_path = index_path or os.getenv('LOCAL_INDEX_PATH')
+        try:
+            self.index = open_local_index(source, index_path, embedder=self.embedder)
+            print(f" Loaded local search index with {len(self.index)} documents")
+        except Exception as e:
+            print(f"Failed to load local search index: {e}")
+            self.index = LocalSearchIndex.build([])
+        self._etags: Dict[int, str] = {}
+
+    def _doc(self, doc_id: int) -> Dict:
+        doc = dict(self.index.docs[doc_id])
+        doc.pop("passage_spans", None)
+        doc.pop("related", None)
+        for field in ENTITY_FIELDS:
+            doc.pop(field, None)
+        return doc
+
+    def get_filter_options(self) -> Dict:
+        """Return dynamic options for filters from press release data."""
+        counts = {company: bits.bit_count() for company, bits in self.index.company_bits.items()}
+        companies = sorted(counts, key=lambda company: (-counts[company], company))
+        dates = self.index.dates_asc
+        options = {
+            "companies": companies[:200],
+            "date_range": {"min": dates[0] if dates else None, "max": dates[-1] if dates else None},
+        }
+        for field, value_bits in self.index.entity_bits.items():
+            counts = {value: bits.bit_count() for value, bits in value_bits.items()}
+            options[field] = sorted(counts, key=lambda value: (-counts[value], value))[:200]
+        return options
+
+    def get_filter_config(self) -> Dict:
+        """Default filter config merged with live options."""
+        return {
+            "fields": copy.deepcopy(DEFAULT_FILTER_FIELDS),
+            "limit": 1000,
+            "options": self.get_filter_options(),
+        }
+
+    def invalidate_caches(self):
+        self._etags.clear()
+
+    def index_generation(self) -> Optional[str]:
+        return repr(self.index.source_signature)
+
+    def health(self) -> Dict:
+        return {"backend": "local", "documents": len(self.index)}
+
+    def get_all_titles(self, limit: int = 10000) -> List[Dict]:
+        return [
+            {key: doc.get(key) for key in ("title", "company", "url", "published_date")}
+            for doc in self.index.docs[:limit]
+        ]
+
+    def suggest_completions(self, prefix: str, limit: int = 8) -> List[Dict]:
+        """Linear title-prefix scan; only used before the suggest trie is built."""
+        typed = " ".join(str(prefix or "").lower().split())
+        if not typed:
+            return []
+        suggestions = []
+        for doc in self.index.docs:
+            title = doc.get("title") or ""
+            if title.lower().startswith(typed):
+                suggestions.append({"text": title, "type": "title", "company": doc.get("company"), "url": doc.get("url")})
+                if len(suggestions) >= limit:
+                    break
+        return suggestions
+
+    def get_filter_limit(self) -> int:
+        return 1000
+
+    def get_initial_data(self, limit: int = 1000) -> Dict:
+        """Newest releases plus filter config, matching ElasticsearchService.get_initial_data."""
+        releases = [PressReleaseHit.from_source(doc) for doc in self.index.docs[:limit]]
+        return {"releases": releases, "filter_config": self.get_filter_config()}
+
+    def query_documents(
+        self,
+        query_text: Optional[str] = None,
+        companies: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 1000,
+        include_highlights: bool = True,
+        highlight_size: Optional[int] = None,
+        highlighter_type: Optional[str] = None,
+        track_total_hits=None,
+        search_mode: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+        offset: int = 0,
+    ) -> List[PressReleaseHit]:
+        """
+        Unified search + filter query. highlighter_type and track_total_hits
+        are accepted for parity with ElasticsearchService and ignored.
+        """
+        return self.query_documents_with_facets(
+            query_text=query_text,
+            companies=companies,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            include_highlights=include_highlights,
+            highlight_size=highlight_size,
+            include_facets=False,
+            search_mode=search_mode,
+            entities=entities,
+            offset=offset,
+        )["results"]
+
+    def query_documents_with_facets(
+        self,
+        query_text: Optional[str] = None,
+        companies: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 1000,
+        include_highlights: bool = True,
+        highlight_size: Optional[int] = None,
+        highlighter_type: Optional[str] = None,
+        track_total_hits=None,
+        include_facets: bool = True,
+        search_mode: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+        profile: bool = False,
+        offset: int = 0,
+    ) -> Dict:
+        """
+        query_documents plus company/month facet counts from the same bitsets.
+        total is always counted (a popcount). profile=True adds "profile"
+        with wall time per stage.
+        """
+        if highlight_size is None:
+            highlight_size = self.highlight_top_hits
+        try:
+            timer = StageTimer() if profile else NULL_TIMER
+            index = self.index
+            with timer.stage("filter"):
+                terms = query_terms(query_text)
+                company_mask = index.company_mask(companies)
+                date_mask = index.date_mask(start_date, end_date)
+                # Entity filters apply to facets too, like query filters in ES
+                entity_mask = index.entity_mask(entities)
+                mask = company_mask & date_mask & entity_mask
+
+            query_mask = index.all_mask
+            scores = {}
+            if query_text:
+                with timer.stage("search"):
+                    scores = index.score_query(query_text, terms)
+                    query_mask = ids_to_mask(scores)
+            query_mask &= entity_mask
+
+            query_vector = None
+            if (search_mode or self.search_mode) == "hybrid" and query_text:
+                with timer.stage("embed_query"):
+                    # Document vectors are re-embedded with whichever model is current
+                    self.embedder = refresh_embedder(self.embedder)
+                    if self.embedder is not None:
+                        query_vector = self.embedder.embed(query_text)
+            with timer.stage("search"):
+                if query_vector is not None:
+                    # Same fusion as ElasticsearchService._hybrid_search
+                    lexical = sorted(index.mask_to_ids(query_mask & mask), key=lambda doc_id: (-scores[doc_id], doc_id))
+                    window = offset + limit
+                    semantic = index.nearest(self.embedder, query_vector, mask, min(window, self.knn_k))
+                    fused = reciprocal_rank_fusion([lexical[:window], semantic], k=self.rrf_rank_constant)
+                    doc_ids = [doc_id for doc_id, _ in fused[offset:window]]
+                else:
+                    doc_ids = index.mask_to_ids(query_mask & mask, offset + limit)[offset:]
+                total = (query_mask & mask).bit_count()
+
+            hits = []
+            with timer.stage("highlight"):
+                for position, doc_id in enumerate(doc_ids):
+                    doc = index.docs[doc_id]
+                    highlight = {}
+                    if include_highlights and query_text and (highlight_size <= 0 or position < highlight_size):
+                        highlight = index.highlight(doc, query_text, terms)
+                    hits.append((doc, highlight))
+
+            facets = None
+            if include_facets:
+                with timer.stage("facets"):
+                    facets = index.facets(query_mask, company_mask, date_mask)
+            result = {"results": build_query_results(hits, query_text, terms, timer), "facets": facets, "total": total}
+            if profile:
+                result["profile"] = {"backend": "local", "timings_ms": timer.as_dict()}
+            return result
+        except Exception as e:
+            print(f"Error querying documents: {e}")
+            return {"results": [], "facets": None, "total": None}
+
+    def query_documents_batch(self, specs: List[Dict]) -> List[Dict]:
+        """Same contract as ElasticsearchService.query_documents_batch; runs in-process one by one."""
+        allowed = ("query_text", "companies", "start_date", "end_date", "limit", "include_highlights",
+                   "highlight_size", "include_facets", "entities")
+        return [
+            self.query_documents_with_facets(**{key: spec[key] for key in allowed if key in spec})
+            for spec in specs
+        ]
+
+    def export_documents(
+        self,
+        fields: List[str],
+        query_text: Optional[str] = None,
+        companies: Optional[List[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        entities: Optional[Dict[str, List[str]]] = None,
+    ) -> Iterator[Dict]:
+        """Every matching document's requested fields, newest first, generated lazily."""
+        index = self.index
+        mask = index.company_mask(companies) & index.date_mask(start_date, end_date) & index.entity_mask(entities)
+        if query_text:
+            mask &= ids_to_mask(index.score_query(query_text, query_terms(query_text)))
+        for doc_id in index.mask_to_ids(mask):
+            doc = index.docs[doc_id]
+            yield {field: doc.get(field) for field in fields}
+
+    def search(self, query_text: str, company: Optional[str] = None,
+               limit: int = 20, track_total_hits=None) -> List[Dict]:
+        """Full-text BM25 search, optionally filtered by company."""
+        try:
+            index = self.index
+            tokens = tokenize(query_text)
+            title_scores = index.fields["title"].bm25(tokens, len(index))
+            body_scores = index.fields["full_text"].bm25(tokens, len(index))
+            mask = index.company_mask([company] if company else None)
+
+            scored = []
+            for doc_id in set(title_scores) | set(body_scores):
+                if not mask >> doc_id & 1:
+                    continue
+                score = max(title_scores.get(doc_id, 0.0) * TITLE_BOOST, body_scores.get(doc_id, 0.0))
+                scored.append((score, doc_id))
+            scored.sort(key=lambda item: (-item[0], item[1]))
+
+            results = []
+            for score, doc_id in scored[:limit]:
+                result = self._doc(doc_id)
+                result["score"] = score
+                results.append(result)
+            return results
+        except Exception as e:
+            print(f"Error during search: {e}")
+            return []
+
+    def get_all_paginated(self, page: int = 1, size: int = 10, track_total_hits=None) -> Dict:
+        """Paginated press releases, newest first."""
+        from_value = (page - 1) * size
+        results = []
+        for doc_id in range(from_value, min(from_value + size, len(self.index))):
+            doc = self.index.docs[doc_id]
+            results.append({
+                "company": doc.get("company"),
+                "title": doc.get("title"),
+                "published_date": doc.get("published_date"),
+                "url": doc.get("url"),
+            })
+        return {"results": results, "total": len(self.index)}
+
+    def get_all(self, limit: int = 1000, track_total_hits=None) -> List[PressReleaseHit]:
+        """All press releases, newest first."""
+        return [PressReleaseHit.from_source(doc) for doc in self.index.docs[:limit]]
+
+    def filter_documents(
+        self,
+        company: Optional[str] = None,
+        title: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 1000,
+        track_total_hits=None,
+    ) -> List[Dict]:
+        """Filter press releases using company/title/date fields."""
+        try:
+            index = self.index
+            mask = index.company_substring_mask(company) & index.date_mask(start_date, end_date)
+            doc_ids = index.mask_to_ids(mask, None if title else limit)
+            if title:
+                title_docs = index.fields["title"].docs_with_all(tokenize(title))
+                doc_ids = [doc_id for doc_id in doc_ids if doc_id in title_docs]
+            return [self._doc(doc_id) for doc_id in doc_ids[:limit]]
+        except Exception as e:
+            print(f"Error filtering documents: {e}")
+            return []
+
+    def get_detail(self, press_release_url: str) -> Optional[Tuple[Dict, str]]:
+        """(document, ETag) for one press release."""
+        doc_id = self.index.url_to_id.get(press_release_url)
+        if doc_id is None:
+            return None
+        etag = self._etags.get(doc_id)
+        if etag is None:
+            etag = self._etags[doc_id] = document_etag(self.index.docs[doc_id])
+        doc = self._doc(doc_id)
+        doc["related"] = self.index.docs[doc_id].get("related") or []
+        return doc, etag
+
+    def get_snippets(self, press_release_url: str, query_text: str,
+                     highlighter_type: Optional[str] = None) -> Optional[Dict]:
+        """Same contract as ElasticsearchService.get_snippets."""
+        doc_id = self.index.url_to_id.get(press_release_url)
+        if doc_id is None:
+            return None
+        doc = self.index.docs[doc_id]
+        terms = query_terms(query_text)
+        highlight = self.index.highlight(doc, query_text, terms) if query_text else {}
+        hit = build_query_results([(doc, highlight)], query_text, terms)[0]
+        return {"url": press_release_url, "summary": hit.summary, "matches": hit.matches}
+
+    def get_by_url(self, press_release_url: str) -> Optional[Dict]:
+        """Retrieve one press release by URL."""
+        doc_id = self.index.url_to_id.get(press_release_url)
+        return self._doc(doc_id) if doc_id is not None else None
+
+    def get_many_by_url(self, press_release_urls: List[str]) -> Dict[str, Dict]:
+        found = {}
+        for url in press_release_urls:
+            doc_id = self.index.url_to_id.get(url)
+            if doc_id is not None:
+                found[url] = self._doc(doc_id)
+        return found
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the local search index")
+    parser.add_argument("--source", default=os.getenv("LOCAL_INDEX_SOURCE", "press_releases.json"),
+                        help='snapshot path or "postgres"')
+    parser.add_argument("--index-path", default=os.getenv("LOCAL_INDEX_PATH"))
+    args = parser.parse_args()
+
+    built = open_local_index(args.source, args.index_path, rebuild=True, embedder=load_embedder())
+    print(f"Indexed {len(built)} documents from {args.source}")
@@ -0,0 +1,99 @@
+"""
+Sentence/passage segmentation computed once at ingest.
+
+Passages are whitespace-normalized, sentence-bounded chunks of full_text of
+at most PASSAGE_MAX_LEN characters. Elasticsearch stores them as the nested
+`passages` field; the local index keeps only their character spans into
+full_text.
+"""
+
+import re
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+PASSAGE_MAX_LEN = 240
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def passage_spans(text: Optional[str], max_len: int = PASSAGE_MAX_LEN) -> array:
+    """Flattened [start, end, start, end, ...] character spans into text."""
+    spans = array("I")
+    if not text:
+        return spans
+
+    sentences = []
+    position = 0
+    for boundary in SENTENCE_END.finditer(text):
+        sentences.append((position, boundary.start()))
+        position = boundary.end()
+    sentences.append((position, len(text)))
+
+    current_start = current_end = None
+    for start, end in sentences:
+        if not text[start:end].strip():
+            continue
+        # Long sentences are cut on word boundaries
+        while end - start > max_len:
+            cut = text.rfind(" ", start, start + max_len)
+            cut = cut if cut > start else start + max_len
+            if current_start is not None:
+                spans.extend((current_start, current_end))
+                current_start = None
+            spans.extend((start, cut))
+            start = cut
+        if current_start is not None and end - current_start <= max_len:
+            current_end = end
+            continue
+        if current_start is not None:
+            spans.extend((current_start, current_end))
+        current_start, current_end = start, end
+
+    if current_start is not None:
+        spans.extend((current_start, current_end))
+    return spans
+
+
+def split_passages(text: Optional[str], max_len: int = PASSAGE_MAX_LEN) -> List[str]:
+    return list(passages_from_spans(text, passage_spans(text, max_len)))
+
+
+def passages_from_spans(text: Optional[str], spans: array) -> Iterator[str]:
+    for i in range(0, len(spans), 2):
+        passage = _normalize(text[spans[i]:spans[i + 1]])
+        if passage:
+            yield passage
+
+
+def passage_documents(text: Optional[str]) -> List[Dict]:
+    """Nested `passages` field value for Elasticsearch."""
+    return [
+        {"position": position, "text": passage}
+        for position, passage in enumerate(split_passages(text))
+    ]
+
+
+def iter_passages(doc: Dict) -> Optional[Iterator[str]]:
+    """Passages carried by a document, or None if it has no precomputed passages."""
+    if doc.get("passages") is not None:
+        return (
+            passage.get("text", "") if isinstance(passage, dict) else passage
+            for passage in doc["passages"]
+        )
+    if doc.get("passage_spans") is not None:
+        return passages_from_spans(doc.get("full_text"), doc["passage_spans"])
+    return None
+
+
+def find_passage(passages: Iterable[str], terms: List[str]) -> Optional[str]:
+    """First passage containing any of the (lower-case) terms."""
+    if not terms:
+        return None
+    for passage in passages:
+        lowered = passage.lower()
+        if any(term in lowered for term in terms):
+            return passage
+    return None
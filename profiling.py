@@ -0,0 +1,82 @@
+"""
+Per-request query profiling behind `?profile=1` (QUERY_PROFILE_ENABLED).
+
+StageTimer records wall time per named stage of query_documents; nested
+stages are subtracted from the enclosing one, so the stage times add up to
+the total. Code paths take a timer argument defaulting to NULL_TIMER, which
+does nothing, so unprofiled requests pay no bookkeeping.
+summarize_profile flattens the Elasticsearch Profile API tree into one row
+per query clause.
+"""
+
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._children: List[float] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            nested = self._children.pop()
+            elapsed = time.perf_counter() - start
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+            if self._children:
+                self._children[-1] += elapsed
+
+    def as_dict(self) -> Dict[str, float]:
+        """Milliseconds per stage plus "total" since the timer was created."""
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 3)
+        return timings
+
+
+class _NullTimer:
+    _context = nullcontext()
+
+    def stage(self, name: str):
+        return self._context
+
+
+NULL_TIMER = _NullTimer()
+
+
+def summarize_profile(profile: Dict) -> List[Dict]:
+    """
+    Query clauses from a Profile API response, with time summed across
+    shards, slowest first: {type, description, depth, time_ms, shards}.
+    """
+    clauses: Dict[tuple, Dict] = {}
+
+    def visit(node: Dict, depth: int):
+        key = (node.get("type"), node.get("description"), depth)
+        row = clauses.setdefault(key, {
+            "type": node.get("type"),
+            "description": node.get("description"),
+            "depth": depth,
+            "time_ms": 0.0,
+            "shards": 0,
+        })
+        row["time_ms"] += node.get("time_in_nanos", 0) / 1e6
+        row["shards"] += 1
+        for child in node.get("children", ()):
+            visit(child, depth + 1)
+
+    for shard in (profile or {}).get("shards", ()):
+        for search in shard.get("searches", ()):
+            for node in search.get("query", ()):
+                visit(node, 0)
+
+    rows = sorted(clauses.values(), key=lambda row: -row["time_ms"])
+    for row in rows:
+        row["time_ms"] = round(row["time_ms"], 3)
+    return rows
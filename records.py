@@ -0,0 +1,33 @@
+"""
+Compact result records shared by the search services and the API layer.
+
+Services build these once per hit and the API serializes them as-is
+(orjson handles slotted dataclasses natively), so a result is never copied
+into another dict between the search backend and the response body.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+
+@dataclass(slots=True)
+class SnippetMatch:
+    field: str
+    field_label: str
+    snippet: str
+    plain_text: str
+
+
+@dataclass(slots=True)
+class PressReleaseHit:
+    title: Optional[str]
+    company: Optional[str]
+    published_date: Optional[str]
+    url: Optional[str]
+    summary: str = ""
+    # A shared empty tuple, so unhighlighted hits allocate no list
+    matches: Sequence[SnippetMatch] = ()
+
+    @classmethod
+    def from_source(cls, doc: Dict) -> "PressReleaseHit":
+        return cls(doc.get("title"), doc.get("company"), doc.get("published_date"), doc.get("url"))
@@ -0,0 +1,100 @@
+"""
+Precomputed "related press releases": top-K neighbors of every document by
+TF-IDF cosine similarity over title + body, with the TF-IDF weighting of the
+hybrid-search embedding model (embeddings.py).
+
+Runs as a batch job after indexing (ElasticsearchService.update_related,
+`python3 es_indexer.py --related`) and when the local index is built. The
+similarity matrix is never materialized: rows are multiplied against the
+whole corpus a block at a time, with the block height chosen so the dense
+(block x corpus) scores stay under RELATED_BLOCK_ELEMENTS floats. Neighbors
+are stored on each document with the fields the detail view shows, so the
+detail endpoint returns them without another query.
+"""
+
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from embeddings import Embedder, document_text, tokenize
+
+RELATED_TOP_K = int(os.getenv('RELATED_TOP_K', '5'))
+RELATED_MIN_SCORE = float(os.getenv('RELATED_MIN_SCORE', '0.1'))
+RELATED_BLOCK_ELEMENTS = int(os.getenv('RELATED_BLOCK_ELEMENTS', str(1 << 24)))
+RELATED_FIELDS = ["url", "title", "company", "published_date"]
+
+
+def tfidf_matrix(texts: Sequence[str], embedder: Optional[Embedder] = None) -> sparse.csr_matrix:
+    """
+    L2-normalized sublinear TF-IDF rows from the embedding model's own
+    vectorizer (Embedder.tfidf: same tokenization, vocabulary and idf), so
+    related scoring and hybrid search weigh terms alike. Without a model,
+    the vocabulary and idf are fit on texts the way Embedder.fit does.
+    """
+    term_counts = [Counter(tokenize(text)) for text in texts]
+    if embedder is None:
+        embedder = Embedder.vectorizer(term_counts)
+    rows = embedder.tfidf(term_counts)
+    return sparse.csr_matrix((rows.data, rows.indices, rows.indptr), shape=rows.shape)
+
+
+def nearest_neighbors(matrix: sparse.csr_matrix, keys: Sequence[str], k: int = RELATED_TOP_K,
+                      min_score: float = RELATED_MIN_SCORE,
+                      block_elements: int = RELATED_BLOCK_ELEMENTS) -> List[List[Tuple[int, float]]]:
+    """
+    Top-k (row, cosine) per row, best first. Rows sharing a key (the same
+    URL indexed twice) are never each other's neighbors.
+    """
+    n_rows = matrix.shape[0]
+    if n_rows == 0 or k <= 0:
+        return [[] for _ in range(n_rows)]
+    rows_by_key: Dict[str, List[int]] = {}
+    for row, key in enumerate(keys):
+        if key:
+            rows_by_key.setdefault(key, []).append(row)
+    duplicates = {row: rows for rows in rows_by_key.values() if len(rows) > 1 for row in rows}
+    transposed = matrix.T.tocsc()
+    block_rows = max(1, block_elements // n_rows)
+    top_k = min(k, n_rows - 1)
+
+    neighbors: List[List[Tuple[int, float]]] = []
+    for start in range(0, n_rows, block_rows):
+        end = min(start + block_rows, n_rows)
+        scores = (matrix[start:end] @ transposed).toarray()
+        rows = np.arange(end - start)
+        scores[rows, np.arange(start, end)] = -1.0
+        for row in range(start, end):
+            if row in duplicates:
+                scores[row - start, duplicates[row]] = -1.0
+        if top_k <= 0:
+            neighbors.extend([] for _ in rows)
+            continue
+        candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        for row in rows:
+            picked = candidates[row][np.argsort(-scores[row, candidates[row]], kind="stable")]
+            neighbors.append([
+                (int(col), float(scores[row, col]))
+                for col in picked
+                if scores[row, col] >= min_score
+            ])
+    return neighbors
+
+
+def compute_related(documents: Sequence[Dict], k: int = RELATED_TOP_K,
+                    embedder: Optional[Embedder] = None) -> List[List[Dict]]:
+    """
+    For each document, its related documents as {url, title, company,
+    published_date, score}. embedder: the serving embedding model, if any.
+    """
+    matrix = tfidf_matrix([document_text(doc) for doc in documents], embedder)
+    neighbors = nearest_neighbors(matrix, [doc.get("url") or "" for doc in documents], k)
+    return [
+        [
+            {**{field: documents[col].get(field) for field in RELATED_FIELDS}, "score": round(score, 4)}
+            for col, score in row
+        ]
+        for row in neighbors
+    ]
@@ -2,6 +2,7 @@ from dataclasses import dataclass, asdict
 from datetime import date, datetime
 from typing import List, Optional, Callable
 import json
+import os
 from urllib.request import urlopen
 from urllib.parse import urlencode
 
@@ -10,6 +11,8 @@ from playwright.sync_api import sync_playwright
 from dateutil import parser as date_parser  # robust date parsing
 from database import DatabaseManager
 from elasticsearch_service import ElasticsearchService
+from embeddings import fit_embedder
+from snapshot_store import write_snapshot
 START_DATE = date(2026, 1, 1)
 
 HEADERS = {
@@ -400,17 +403,26 @@ if __name__ == "__main__":
     # Print statements removed to avoid TypeError
 
 
-    # Save to JSON file
-    with open("press_releases.json", "w") as f:
-        json.dump([
-            {
-                **asdict(item),
-                "published_date": item.published_date.isoformat() if item.published_date else None,
-            }
-            for item in all_results
-        ], f, indent=2)
-
-    print(f"Saved {len(all_results)} press releases to press_releases.json")
+    # Save dataset snapshots. press_releases.json is always written; extra
+    # formats (jsonl, jsonl.gz, prsnap) can be requested via SNAPSHOT_FORMATS.
+    snapshot_records = [
+        {
+            **asdict(item),
+            "published_date": item.published_date.isoformat() if item.published_date else None,
+        }
+        for item in all_results
+    ]
+    snapshot_formats = [
+        fmt.strip().lstrip(".")
+        for fmt in os.getenv("SNAPSHOT_FORMATS", "json").split(",")
+        if fmt.strip()
+    ]
+    if "json" not in snapshot_formats:
+        snapshot_formats.insert(0, "json")
+    for fmt in snapshot_formats:
+        snapshot_path = f"press_releases.{fmt}"
+        write_snapshot(snapshot_records, snapshot_path)
+        print(f"Saved {len(all_results)} press releases to {snapshot_path}")
 
     # Replace PostgreSQL data from scratch
     print("\nReplacing press releases in PostgreSQL database...")
@@ -449,7 +461,11 @@ if __name__ == "__main__":
             if item.url
         ]
 
+        # Refit the embedding model on the corpus being indexed
+        es_service.embedder = fit_embedder(documents)
         indexed_count = es_service.bulk_index(documents)
         print(f"Indexed {indexed_count} documents into Elasticsearch.\n")
+        if indexed_count:
+            es_service.update_related(documents)
     else:
         print("Skipping Elasticsearch indexing because connection failed.\n")
\ No newline at end of file
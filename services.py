@@ -1,12 +1,146 @@
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Header, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from typing import Optional, List
 from fastapi.middleware.cors import CORSMiddleware
 from elasticsearch_service import ElasticsearchService
+from local_search_service import LocalSearchService
+from suggest_index import SuggestService
+from index_generation import GenerationTracker
+from http_cache import HttpCacheMiddleware
+from api_models import BatchQueryRequest, FastJSONResponse, PressReleaseDetail, SavedSearchRequest
+from entities import ENTITY_FIELDS, ENTITY_FILTERS
+from export_stream import EXPORT_FORMATS, encode_rows
+from shared_cache import SharedCache
+from admission import Overloaded
+import itertools
+import json
+import os
+import threading
 
-es_service = ElasticsearchService()
+# SEARCH_BACKEND: "elasticsearch", "local" (in-process index) or "auto"
+# (Elasticsearch, served from the local index while it is unreachable)
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto').lower()
+# Largest POST /api/query-press-releases/batch request
+BATCH_MAX_QUERIES = int(os.getenv('BATCH_MAX_QUERIES', '1000'))
+# ?profile=1 on the search endpoints: ES request bodies, Profile API output
+# and stage timings. Debug only; keep it off in production.
+QUERY_PROFILE_ENABLED = os.getenv('QUERY_PROFILE_ENABLED', 'false').lower() == 'true'
+# Paged /api/query-press-releases: largest page, and deepest hit reachable
+# (Elasticsearch's index.max_result_window)
+PAGE_MAX_SIZE = int(os.getenv('PAGE_MAX_SIZE', '100'))
+MAX_RESULT_WINDOW = int(os.getenv('MAX_RESULT_WINDOW', '10000'))
 
-app = FastAPI()
+
+class FallbackSearchService:
+    """
+    Routes every call to Elasticsearch while it is reachable and to the
+    local index otherwise, so the API recovers without a restart once the
+    background reconnect loop reaches the cluster.
+    """
+
+    def __init__(self, primary: ElasticsearchService):
+        self.primary = primary
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+
+    @property
+    def fallback(self) -> LocalSearchService:
+        # Built on first use: a healthy cluster never needs the local index
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    self._fallback = LocalSearchService()
+        return self._fallback
+
+    @property
+    def active(self):
+        return self.primary if self.primary.client is not None else self.fallback
+
+    def start_reconnect(self):
+        self.primary.start_reconnect()
+
+    def health(self):
+        return {**self.primary.health(), 'serving': 'elasticsearch' if self.primary.available else 'local'}
+
+    def __getattr__(self, name):
+        return getattr(self.active, name)
+
+
+def create_search_service():
+    if SEARCH_BACKEND == 'local':
+        return LocalSearchService()
+    # lazy: no network I/O at import; start_reconnect() connects in the background
+    service = ElasticsearchService(lazy=True)
+    if SEARCH_BACKEND == 'auto':
+        return FallbackSearchService(service)
+    return service
+
+
+es_service = create_search_service()
+suggest_service = SuggestService(
+    es_service,
+    max_documents=int(os.getenv('SUGGEST_MAX_DOCUMENTS', '10000')),
+)
+generation_tracker = GenerationTracker(
+    es_service,
+    interval=float(os.getenv('INDEX_GENERATION_INTERVAL', '5')),
+)
+
+# Result cache shared by all workers (launcher.py enables it for multi-worker runs)
+SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH')
+
+
+def create_shared_cache(path):
+    return SharedCache(
+        path,
+        ttl=float(os.getenv('SHARED_CACHE_TTL', '300')),
+        max_entries=int(os.getenv('SHARED_CACHE_MAX_ENTRIES', '10000')),
+    )
+
+
+shared_cache = create_shared_cache(SHARED_CACHE_PATH) if SHARED_CACHE_PATH else None
+
+
+def cached(key, compute, should_cache=None):
+    """compute() through the shared cache, keyed on the current index generation."""
+    if shared_cache is None:
+        return compute()
+    return shared_cache.get_or_compute(key, generation_tracker.current, compute, should_cache)
+
+
+def handle_generation_change(generation):
+    # A reindex happened (or ES became reachable): drop stale caches and
+    # rebuild the typeahead trie
+    es_service.invalidate_caches()
+    if shared_cache is not None:
+        shared_cache.purge(generation)
+    suggest_service.refresh()
+
+
+generation_tracker.subscribe(handle_generation_change)
+
+# Endpoints return FastJSONResponse directly: orjson, no jsonable_encoder pass
+app = FastAPI(default_response_class=FastJSONResponse)
+
+# ETags from the index generation + gzip/brotli for large responses. Added
+# before CORS so CORS headers also land on 304s.
+app.add_middleware(
+    HttpCacheMiddleware,
+    generation_tracker=generation_tracker,
+    cached_paths=[
+        '/api/press-releases',
+        '/api/initial-data',
+        '/api/filter-config',
+        '/api/query-press-releases',
+        '/api/press-releases/snippets',
+        '/api/filter-press-releases',
+        '/api/search',
+        '/api/suggest',
+        '/press-releases/all',
+    ],
+    max_age=int(os.getenv('HTTP_CACHE_MAX_AGE', '0')),
+    compress_min_bytes=int(os.getenv('HTTP_COMPRESS_MIN_BYTES', '1024')),
+)
 
 # Add CORS
 app.add_middleware(
@@ -17,39 +151,72 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def press_release_to_dict(pr):
-    return {
-        'title': pr.get('title'),
-        'company': pr.get('company'),
-        'published_date': pr.get('published_date'),
-        'url': pr.get('url'),
-        'summary': pr.get('summary', ''),
-        'matches': pr.get('matches', []),
-    }
+def overloaded_response(e: Overloaded):
+    # Shed load: the client retries instead of queueing another thread
+    return JSONResponse(
+        status_code=503,
+        content={'status': 'error', 'message': str(e)},
+        headers={'Retry-After': '1'},
+    )
 
 
-def press_release_detail_to_dict(pr):
-    return {
-        'title': pr.get('title'),
-        'company': pr.get('company'),
-        'published_date': pr.get('published_date'),
-        'url': pr.get('url'),
-        'full_text': pr.get('full_text'),
-    }
+def profile_disabled():
+    return JSONResponse(
+        status_code=403,
+        content={'status': 'error', 'message': 'Query profiling is disabled (QUERY_PROFILE_ENABLED)'}
+    )
+
+
+def json_response(payload, cacheable=True):
+    """
+    Backend errors come back as empty 200 results. Those are sent no-store,
+    so HttpCacheMiddleware adds no ETag and clients never revalidate an
+    error into a 304; the same predicates veto the shared cache.
+    """
+    if cacheable:
+        return FastJSONResponse(payload)
+    return FastJSONResponse(payload, headers={'Cache-Control': 'no-store'})
+
+
+def has_filter_fields(config):
+    return bool(config['fields'])
+
+
+def has_releases(initial):
+    return bool(initial['releases'])
+
+
+def has_query_results(response):
+    return bool(response['results']) or response['facets'] is not None
+
+
+def profiled_response(payload, profile):
+    # Profiles are per-request measurements: never cached or revalidated
+    return FastJSONResponse({**payload, 'profile': profile}, headers={'Cache-Control': 'no-store'})
+
+
+@app.on_event('startup')
+def start_background_tasks():
+    if hasattr(es_service, 'start_reconnect'):
+        es_service.start_reconnect()
+    # The first check builds the typeahead trie off the request path
+    generation_tracker.start()
+
 
 # API 1: Get ALL Press Releases
 @app.get('/api/press-releases')
 def get_all_press_releases():
     try:
-        results = es_service.get_all()
-        data = [press_release_to_dict(r) for r in results]
+        data = cached('all', es_service.get_all, should_cache=bool)
         
-        return {
+        return json_response({
             'status': 'success',
             'data': data,
             'count': len(data)
-        }
+        }, cacheable=bool(data))
     
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -60,11 +227,13 @@ def get_all_press_releases():
 @app.get('/api/filter-config')
 def get_filter_config():
     try:
-        config = es_service.get_filter_config()
-        return {
+        config = cached('filter-config', es_service.get_filter_config, should_cache=has_filter_fields)
+        return json_response({
             'status': 'success',
             'data': config,
-        }
+        }, cacheable=has_filter_fields(config))
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -75,17 +244,16 @@ def get_filter_config():
 @app.get('/api/initial-data')
 def get_initial_data():
     try:
-        results = es_service.get_all()
-        releases = [press_release_to_dict(r) for r in results]
-        config = es_service.get_filter_config()
-
-        return {
+        initial = cached('initial-data', es_service.get_initial_data, should_cache=has_releases)
+        return json_response({
             'status': 'success',
             'data': {
-                'releases': releases,
-                'filter_config': config,
+                'releases': initial['releases'],
+                'filter_config': initial['filter_config'],
             }
-        }
+        }, cacheable=has_releases(initial))
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -99,24 +267,139 @@ def query_press_releases(
     company: Optional[List[str]] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    facets: bool = Query(True, description="Include company/month facet counts"),
+    mode: Optional[str] = Query(
+        None, pattern='^(lexical|hybrid)$',
+        description="lexical (BM25) or hybrid (BM25 + kNN, fused by rank); defaults to SEARCH_MODE",
+    ),
+    drug: Optional[List[str]] = Query(None),
+    phase: Optional[List[str]] = Query(None),
+    regulatory_event: Optional[List[str]] = Query(None),
+    partner: Optional[List[str]] = Query(None),
+    profile: bool = Query(False, description="Debug: include request bodies, ES profile and stage timings"),
+    page: Optional[int] = Query(None, ge=1, description="Server-side paging: 1-based page (with size)"),
+    size: Optional[int] = Query(None, ge=1, le=PAGE_MAX_SIZE, description="Hits per page; enables paging"),
+    highlights: bool = Query(True, description="Highlight matches (see /api/press-releases/snippets)"),
 ):
+    if profile and not QUERY_PROFILE_ENABLED:
+        return profile_disabled()
+    paged = page is not None or size is not None
+    offset = 0
+    if paged:
+        page, size = page or 1, size or 10
+        offset = (page - 1) * size
+        if offset + size > MAX_RESULT_WINDOW:
+            return JSONResponse(
+                status_code=400,
+                content={'status': 'error', 'message': f'page * size must not exceed {MAX_RESULT_WINDOW}'}
+            )
     try:
-        config = es_service.get_filter_config()
-        limit = config.get('limit', 1000)
-        results = es_service.query_documents(
-            query_text=query,
-            companies=company,
-            start_date=start_date,
-            end_date=end_date,
-            limit=limit,
-        )
+        # Paged: only this page is fetched, highlighted and summarized
+        limit = size if paged else es_service.get_filter_limit()
+        requested = {'drug': drug, 'phase': phase, 'regulatory_event': regulatory_event, 'partner': partner}
+        entities = {field: requested[key] for key, field, _ in ENTITY_FILTERS if requested[key]}
 
-        data = [press_release_to_dict(r) for r in results]
-        return {
+        def run(profile=False):
+            return es_service.query_documents_with_facets(
+                query_text=query,
+                companies=company,
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit,
+                include_highlights=highlights,
+                track_total_hits=True if paged else None,
+                include_facets=facets,
+                search_mode=mode,
+                entities=entities,
+                profile=profile,
+                offset=offset,
+            )
+
+        if profile:
+            response = run(profile=True)
+        else:
+            response = cached(
+                'query:' + json.dumps(
+                    [query, company, start_date, end_date, limit, facets, mode, entities, offset, highlights],
+                    sort_keys=True,
+                ),
+                run,
+                # Backend errors come back as empty results without facets
+                should_cache=has_query_results,
+            )
+
+        data = response['results']
+        payload = {
             'status': 'success',
             'data': data,
             'count': len(data)
         }
+        if facets:
+            payload['facets'] = response['facets']
+        if paged:
+            total = response.get('total') or 0
+            payload.update({
+                'page': page,
+                'size': size,
+                'total': total,
+                'total_pages': (total + size - 1) // size,
+            })
+        if profile:
+            return profiled_response(payload, response.get('profile'))
+        return json_response(payload, cacheable=has_query_results(response))
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+
+@app.post('/api/query-press-releases/batch')
+def query_press_releases_batch(request: BatchQueryRequest):
+    """
+    Many /api/query-press-releases queries in one call, executed as chunked
+    _msearch requests. Results come back in request order with the same
+    shape as the single-query endpoint.
+    """
+    if len(request.queries) > BATCH_MAX_QUERIES:
+        return JSONResponse(
+            status_code=413,
+            content={'status': 'error', 'message': f'At most {BATCH_MAX_QUERIES} queries per batch'}
+        )
+    try:
+        max_limit = es_service.get_filter_limit()
+        specs = []
+        for spec in request.queries:
+            requested = {
+                'drug': spec.drug, 'phase': spec.phase,
+                'regulatory_event': spec.regulatory_event, 'partner': spec.partner,
+            }
+            specs.append({
+                'query_text': spec.query,
+                'companies': spec.company or None,
+                'start_date': spec.start_date,
+                'end_date': spec.end_date,
+                'limit': max(1, min(spec.limit or max_limit, max_limit)),
+                'include_highlights': spec.highlights,
+                'include_facets': spec.facets,
+                'entities': {field: requested[key] for key, field, _ in ENTITY_FILTERS if requested[key]},
+            })
+
+        results = []
+        for spec, response in zip(request.queries, es_service.query_documents_batch(specs)):
+            if 'error' in response:
+                results.append({'status': 'error', 'message': response['error']})
+                continue
+            item = {'status': 'success', 'data': response['results'], 'count': len(response['results'])}
+            if spec.facets:
+                item['facets'] = response['facets']
+            results.append(item)
+
+        return FastJSONResponse({'status': 'success', 'results': results, 'count': len(results)})
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -125,20 +408,59 @@ def query_press_releases(
 
 
 @app.get('/api/press-releases/detail')
-def get_press_release_by_url(url: str = Query(..., description="Press release URL")):
+def get_press_release_by_url(
+    url: str = Query(..., description="Press release URL"),
+    if_none_match: Optional[str] = Header(None),
+):
     try:
-        result = es_service.get_by_url(url)
+        detail = cached('detail:' + url, lambda: es_service.get_detail(url))
 
-        if not result:
+        if not detail:
             return JSONResponse(
                 status_code=404,
                 content={'status': 'error', 'message': 'Press release not found'}
             )
 
-        return {
-            'status': 'success',
-            'data': press_release_detail_to_dict(result)
-        }
+        result, etag = detail
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return Response(status_code=304, headers=headers)
+
+        return FastJSONResponse(
+            content={
+                'status': 'success',
+                'data': PressReleaseDetail.from_result(result)
+            },
+            headers=headers,
+        )
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+
+@app.get('/api/press-releases/snippets')
+def get_press_release_snippets(
+    url: str = Query(..., description="Press release URL"),
+    query: str = Query(..., min_length=1),
+):
+    """
+    Highlighted matches and summary of one release for a query, for a card
+    expanded from a page fetched with highlights=false.
+    """
+    try:
+        snippets = cached('snippets:' + json.dumps([url, query]), lambda: es_service.get_snippets(url, query))
+        if not snippets:
+            return JSONResponse(
+                status_code=404,
+                content={'status': 'error', 'message': 'Press release not found'}
+            )
+        return FastJSONResponse({'status': 'success', 'data': snippets})
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -146,6 +468,182 @@ def get_press_release_by_url(url: str = Query(..., description="Press release UR
         )
 
 
+EXPORT_FIELDS = ['url', 'title', 'company', 'published_date', 'full_text'] + ENTITY_FIELDS
+
+
+@app.get('/api/export')
+def export_press_releases(
+    format: str = Query('ndjson', pattern='^(ndjson|csv)$'),
+    gzip: bool = Query(False, description="gzip-compress the file"),
+    fields: str = Query('url,title,company,published_date', description="Comma-separated columns"),
+    query: Optional[str] = Query(None),
+    company: Optional[List[str]] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    drug: Optional[List[str]] = Query(None),
+    phase: Optional[List[str]] = Query(None),
+    regulatory_event: Optional[List[str]] = Query(None),
+    partner: Optional[List[str]] = Query(None),
+):
+    """
+    The whole (optionally filtered) corpus as a streamed NDJSON or CSV file,
+    with no result limit; see ElasticsearchService.export_documents.
+    """
+    columns = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in columns if name not in EXPORT_FIELDS]
+    if not columns or unknown:
+        return JSONResponse(
+            status_code=400,
+            content={'status': 'error', 'message': f'fields must be among {", ".join(EXPORT_FIELDS)}'}
+        )
+
+    requested = {'drug': drug, 'phase': phase, 'regulatory_event': regulatory_event, 'partner': partner}
+    try:
+        rows = es_service.export_documents(
+            columns,
+            query_text=query,
+            companies=company,
+            start_date=start_date,
+            end_date=end_date,
+            entities={field: requested[key] for key, field, _ in ENTITY_FILTERS if requested[key]},
+        )
+        # Pull the first row here so backend errors become a 503, not a truncated file
+        first = next(rows, None)
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+    if first is not None:
+        rows = itertools.chain([first], rows)
+    media_type, extension = EXPORT_FORMATS[format]
+    filename = f'press-releases.{extension}'
+    if gzip:
+        media_type, filename = 'application/gzip', filename + '.gz'
+    return StreamingResponse(
+        encode_rows(rows, format, columns, compress=gzip),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
+ALERTS_UNAVAILABLE = 'Saved-search alerts need Elasticsearch'
+
+
+def alert_store():
+    """The AlertStore of the serving backend, or None (local index)."""
+    return getattr(es_service, 'alerts', None)
+
+
+@app.post('/api/alerts/searches')
+def create_saved_search(request: SavedSearchRequest):
+    """
+    Save a query + filters as a percolator query. Releases indexed from now
+    on that match it show up in GET /api/alerts for the subscriber.
+    """
+    if not request.subscriber.strip() or not request.name.strip():
+        return JSONResponse(
+            status_code=400,
+            content={'status': 'error', 'message': 'subscriber and name are required'}
+        )
+    alerts = alert_store()
+    if alerts is None:
+        return JSONResponse(status_code=503, content={'status': 'error', 'message': ALERTS_UNAVAILABLE})
+    requested = {
+        'drug': request.drug, 'phase': request.phase,
+        'regulatory_event': request.regulatory_event, 'partner': request.partner,
+    }
+    criteria = {
+        'query_text': request.query,
+        'companies': request.company or None,
+        'start_date': request.start_date,
+        'end_date': request.end_date,
+        'entities': {field: requested[key] for key, field, _ in ENTITY_FILTERS if requested[key]},
+    }
+    try:
+        saved = alerts.save_search(request.subscriber, request.name, criteria)
+        return FastJSONResponse({'status': 'success', 'data': saved})
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+
+@app.get('/api/alerts/searches')
+def list_saved_searches(subscriber: str = Query(..., min_length=1)):
+    alerts = alert_store()
+    if alerts is None:
+        return JSONResponse(status_code=503, content={'status': 'error', 'message': ALERTS_UNAVAILABLE})
+    try:
+        data = alerts.list_searches(subscriber)
+        return FastJSONResponse({'status': 'success', 'data': data, 'count': len(data)})
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+
+@app.delete('/api/alerts/searches/{search_id}')
+def delete_saved_search(search_id: str, subscriber: str = Query(..., min_length=1)):
+    alerts = alert_store()
+    if alerts is None:
+        return JSONResponse(status_code=503, content={'status': 'error', 'message': ALERTS_UNAVAILABLE})
+    try:
+        if not alerts.delete_search(subscriber, search_id):
+            return JSONResponse(
+                status_code=404,
+                content={'status': 'error', 'message': 'Saved search not found'}
+            )
+        return FastJSONResponse({'status': 'success'})
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+
+@app.get('/api/alerts')
+def get_alerts(
+    subscriber: str = Query(..., min_length=1),
+    after: Optional[int] = Query(None, description="cursor from the previous response"),
+    search_id: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Releases matching the subscriber's saved searches, newest first. Poll
+    with after= the cursor of the previous response to get only new ones.
+    """
+    alerts = alert_store()
+    if alerts is None:
+        return JSONResponse(status_code=503, content={'status': 'error', 'message': ALERTS_UNAVAILABLE})
+    try:
+        feed = alerts.feed(subscriber, after=after, search_id=search_id, limit=limit)
+        return FastJSONResponse({
+            'status': 'success',
+            'data': feed['matches'],
+            'count': len(feed['matches']),
+            'cursor': feed['cursor'],
+        })
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=503,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+
 @app.get('/press-releases/all')
 def get_all_press_releases_paginated(
     page: int = Query(1, ge=1),
@@ -155,14 +653,16 @@ def get_all_press_releases_paginated(
         result = es_service.get_all_paginated(page=page, size=size)
         total = result["total"]
 
-        return {
+        return json_response({
             "status": "success",
             "page": page,
             "size": size,
             "total": total,
             "total_pages": (total + size - 1) // size,
             "data": result["results"]
-        }
+        }, cacheable=bool(total))
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -175,36 +675,82 @@ def filter_press_releases(
     company: Optional[List[str]] = Query(None),
     title: Optional[str] = Query(None),
     start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None)
+    end_date: Optional[str] = Query(None),
+    profile: bool = Query(False, description="Debug: include request bodies, ES profile and stage timings"),
 ):
+    if profile and not QUERY_PROFILE_ENABLED:
+        return profile_disabled()
     try:
         query_text = title if title else None
-        results = es_service.query_documents(
-            query_text=query_text,
-            companies=company,
-            start_date=start_date,
-            end_date=end_date,
-            limit=1000,
+        if profile:
+            response = es_service.query_documents_with_facets(
+                query_text=query_text,
+                companies=company,
+                start_date=start_date,
+                end_date=end_date,
+                limit=1000,
+                include_facets=False,
+                profile=True,
+            )
+            data = response['results']
+            return profiled_response({'status': 'success', 'data': data, 'count': len(data)}, response.get('profile'))
+        data = cached(
+            'filter:' + json.dumps([query_text, company, start_date, end_date]),
+            lambda: es_service.query_documents(
+                query_text=query_text,
+                companies=company,
+                start_date=start_date,
+                end_date=end_date,
+                limit=1000,
+            ),
+            should_cache=bool,
         )
         
-        data = [press_release_to_dict(r) for r in results]
-        
-        return {
+        return json_response({
             'status': 'success',
             'data': data,
             'count': len(data)
-        }
+        }, cacheable=bool(data))
     
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
             content={'status': 'error', 'message': str(e)}
         )
 
-# Health check endpoint
+@app.get('/api/suggest')
+def suggest(
+    q: str = Query(..., min_length=1, description="Typed prefix"),
+    limit: int = Query(8, ge=1, le=50),
+):
+    try:
+        result = suggest_service.suggest(q, limit=limit)
+        return json_response({
+            'status': 'success',
+            'data': result['suggestions'],
+            'source': result['source'],
+        }, cacheable=bool(result['suggestions']) or result['source'] == 'trie')
+    except Overloaded as e:
+        return overloaded_response(e)
+    except Exception as e:
+        return JSONResponse(
+            status_code=500,
+            content={'status': 'error', 'message': str(e)}
+        )
+
+# Health check endpoint: the API is up; "search" reports backend
+# reachability and the last measured Elasticsearch round trip
 @app.get('/health')
 def health_check():
-    return {'status': 'ok'}
+    search = es_service.health()
+    # Degraded: ES unreachable (local fallback) or the index was created unsorted
+    degraded = not search.get('reachable', True) or search.get('index_sorted') is False
+    return {
+        'status': 'degraded' if degraded else 'ok',
+        'search': search,
+    }
 
 
 # API 3: Full-text search via Elasticsearch
@@ -212,8 +758,11 @@ def health_check():
 def search_press_releases(
     q: Optional[str] = Query(None, description="Search query"),
     company: Optional[str] = Query(None, description="Filter by company"),
-    limit: int = Query(20, ge=1, description="Max results")
+    limit: int = Query(20, ge=1, description="Max results"),
+    profile: bool = Query(False, description="Debug: include request bodies, ES profile and stage timings"),
 ):
+    if profile and not QUERY_PROFILE_ENABLED:
+        return profile_disabled()
     try:
         if not q:
             return JSONResponse(
@@ -222,17 +771,29 @@ def search_press_releases(
             )
         
         companies = [company] if company else None
+        if profile:
+            response = es_service.query_documents_with_facets(
+                query_text=q,
+                companies=companies,
+                limit=limit,
+                include_facets=False,
+                profile=True,
+            )
+            results = response['results']
+            return profiled_response({'status': 'success', 'data': results, 'count': len(results)}, response.get('profile'))
         results = es_service.query_documents(
             query_text=q,
             companies=companies,
             limit=limit,
         )
         
-        return {
+        return json_response({
             'status': 'success',
             'data': results,
             'count': len(results)
-        }
+        }, cacheable=bool(results))
+    except Overloaded as e:
+        return overloaded_response(e)
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -240,11 +801,28 @@ def search_press_releases(
         )
     
 if __name__ == '__main__':
+    import argparse
+    import tempfile
     import uvicorn
-    import sys
-    
-    # Get port from command line or default to 8000
-    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
-    
-    print(f"Starting API server on port {port}...")
-    uvicorn.run(app, host='0.0.0.0', port=port)
\ No newline at end of file
+
+    parser = argparse.ArgumentParser(description="Run the press release API")
+    parser.add_argument('port', nargs='?', type=int, default=8000)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '1')),
+                        help="worker processes (forked after the app is loaded)")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        from launcher import serve
+
+        if shared_cache is None:
+            shared_cache = create_shared_cache(
+                os.path.join(tempfile.gettempdir(), f'press-api-cache-{args.port}.sqlite')
+            )
+        # Entries from a previous run may predate a reindex with the same generation
+        shared_cache.clear()
+        print(f"Starting API server on port {args.port} with {args.workers} workers...")
+        serve(app, host=args.host, port=args.port, workers=args.workers)
+    else:
+        print(f"Starting API server on port {args.port}...")
+        uvicorn.run(app, host=args.host, port=args.port)
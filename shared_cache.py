@@ -0,0 +1,108 @@
+"""
+Cross-worker result cache backed by a local SQLite file.
+
+Every uvicorn worker opens the same file (see launcher.py, which points
+SHARED_CACHE_PATH at it before forking), so a filter config, query result
+or detail document computed by one worker is served by all of them.
+
+Entries are stored under the index generation they were computed for and
+only returned for that generation, so a reindex invalidates the cache for
+every worker as soon as each one sees the new token; purge() then deletes
+the stale rows. Values are pickled: the file is private to this host and
+only ever written by the API's own workers.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    generation TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    value BLOB NOT NULL
+)
+"""
+
+
+class SharedCache:
+    def __init__(self, path: str, ttl: float = 300.0, max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process: SQLite connections must not
+        # cross a fork or be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str, generation: str) -> Optional[Any]:
+        row = self._connection().execute(
+            "SELECT value, stored_at FROM entries WHERE key = ? AND generation = ?",
+            (key, generation),
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key: str, generation: str, value: Any):
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, generation, stored_at, value) VALUES (?, ?, ?, ?)",
+            (key, generation, time.time(), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+        )
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune(connection)
+
+    def get_or_compute(self, key: str, generation: Optional[str], compute: Callable[[], Any],
+                       should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Cached value for key under generation, computing and storing it on a
+        miss. should_cache(value) can veto storing (e.g. error fallbacks).
+        """
+        if generation is None:
+            # Backend state unknown: nothing to key the entry on
+            return compute()
+        try:
+            value = self.get(key, generation)
+            if value is not None:
+                return value
+        except Exception as e:
+            print(f"Error reading shared cache: {e}")
+        value = compute()
+        if value is not None and (should_cache is None or should_cache(value)):
+            try:
+                self.set(key, generation, value)
+            except Exception as e:
+                print(f"Error writing shared cache: {e}")
+        return value
+
+    def purge(self, generation: Optional[str]):
+        """Drop entries computed for any other generation."""
+        self._connection().execute("DELETE FROM entries WHERE generation != ?", (generation or "",))
+
+    def _prune(self, connection: sqlite3.Connection):
+        connection.execute("DELETE FROM entries WHERE stored_at < ?", (time.time() - self.ttl,))
+        connection.execute(
+            "DELETE FROM entries WHERE key IN "
+            "(SELECT key FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def clear(self):
+        self._connection().execute("DELETE FROM entries")
@@ -0,0 +1,244 @@
+"""
+Readers and writers for press release dataset snapshots.
+
+Supported formats (picked from the file extension):
+  .json       indented JSON array (legacy press_releases.json)
+  .jsonl      one JSON record per line
+  .jsonl.gz   gzip-compressed JSONL, streamable record by record
+  .prsnap     columnar binary snapshot; small columns (company, date, title,
+              url) can be memory-mapped and read without touching the
+              separate full_text blob section
+"""
+
+import gzip
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional
+
+SNAPSHOT_FIELDS = ["company", "published_date", "title", "url", "full_text"]
+COLUMN_FIELDS = ["company", "published_date", "title", "url"]
+BLOB_FIELD = "full_text"
+
+PRSNAP_MAGIC = b"PRSNAP01"
+# magic, header length (uint32); header JSON follows, then 8-byte aligned sections
+_PREAMBLE = struct.Struct("<8sI")
+
+
+def snapshot_format(path: str) -> str:
+    """Return the snapshot format implied by a file name."""
+    lowered = str(path).lower()
+    if lowered.endswith(".jsonl.gz"):
+        return "jsonl.gz"
+    if lowered.endswith(".jsonl"):
+        return "jsonl"
+    if lowered.endswith(".prsnap"):
+        return "prsnap"
+    if lowered.endswith(".json"):
+        return "json"
+    raise ValueError(f"Unknown snapshot format for '{path}'")
+
+
+def _normalize_record(record: Dict) -> Dict:
+    return {field: record.get(field) for field in SNAPSHOT_FIELDS}
+
+
+def write_snapshot(records: List[Dict], path: str) -> int:
+    """Write records to path in the format implied by its extension."""
+    fmt = snapshot_format(path)
+    rows = [_normalize_record(record) for record in records]
+
+    if fmt == "json":
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2)
+    elif fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False))
+                f.write("\n")
+    elif fmt == "jsonl.gz":
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False))
+                f.write("\n")
+    else:
+        _write_prsnap(rows, path)
+
+    return len(rows)
+
+
+def _encode_column(values: List[Optional[str]]):
+    """Encode strings as (offsets, null bitmap, utf-8 data)."""
+    offsets = array("I", [0])
+    nulls = bytearray((len(values) + 7) // 8)
+    chunks = []
+    position = 0
+    for index, value in enumerate(values):
+        if value is None:
+            nulls[index // 8] |= 1 << (index % 8)
+        else:
+            encoded = str(value).encode("utf-8")
+            chunks.append(encoded)
+            position += len(encoded)
+        offsets.append(position)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets.tobytes(), bytes(nulls), b"".join(chunks)
+
+
+def _write_prsnap(rows: List[Dict], path: str):
+    sections = []
+    header = {"count": len(rows), "columns": {}}
+
+    for field in COLUMN_FIELDS + [BLOB_FIELD]:
+        offsets, nulls, data = _encode_column([row.get(field) for row in rows])
+        header["columns"][field] = {"parts": []}
+        for part in (offsets, nulls, data):
+            header["columns"][field]["parts"].append(len(part))
+            sections.append(part)
+
+    # Positions are computed once the header size is known; every section is
+    # padded to 8 bytes so offset arrays can be cast straight from the mmap.
+    header_bytes = b""
+    while True:
+        cursor = _align(_PREAMBLE.size + len(header_bytes))
+        section_iter = iter(sections)
+        for field in COLUMN_FIELDS + [BLOB_FIELD]:
+            starts = []
+            for _part in range(3):
+                starts.append(cursor)
+                cursor = _align(cursor + len(next(section_iter)))
+            header["columns"][field]["starts"] = starts
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        stable = len(encoded) == len(header_bytes)
+        header_bytes = encoded
+        if stable:
+            break
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(PRSNAP_MAGIC, len(header_bytes)))
+        f.write(header_bytes)
+        written = _PREAMBLE.size + len(header_bytes)
+        for section in sections:
+            f.write(b"\0" * (_align(written) - written))
+            written = _align(written)
+            f.write(section)
+            written += len(section)
+
+
+def _align(position: int, boundary: int = 8) -> int:
+    return (position + boundary - 1) // boundary * boundary
+
+
+class ColumnarSnapshot:
+    """Memory-mapped view over a .prsnap file. Values are decoded on access only."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREAMBLE.unpack_from(self._mm, 0)
+        if magic != PRSNAP_MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a press release snapshot")
+        header = json.loads(self._mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+        self.count = header["count"]
+        self._columns = {}
+        view = memoryview(self._mm)
+        for field, meta in header["columns"].items():
+            (off_start, null_start, data_start) = meta["starts"]
+            (off_len, null_len, data_len) = meta["parts"]
+            offsets = view[off_start:off_start + off_len]
+            if sys.byteorder == "little":
+                offsets = offsets.cast("I")
+            else:
+                swapped = array("I", offsets.tobytes())
+                swapped.byteswap()
+                offsets = swapped
+            self._columns[field] = (
+                offsets,
+                view[null_start:null_start + null_len],
+                view[data_start:data_start + data_len],
+            )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._columns = {}
+        if getattr(self, "_mm", None) is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # A caller still holds a slice of the map; let GC reclaim it.
+                pass
+            self._mm = None
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self._columns)
+
+    def value(self, field: str, index: int) -> Optional[str]:
+        offsets, nulls, data = self._columns[field]
+        if nulls[index // 8] & (1 << (index % 8)):
+            return None
+        return bytes(data[offsets[index]:offsets[index + 1]]).decode("utf-8")
+
+    def column(self, field: str) -> List[Optional[str]]:
+        """Decode one whole column. Cheap for company/date/title; avoids the full_text blob."""
+        return [self.value(field, index) for index in range(self.count)]
+
+    def record(self, index: int, include_full_text: bool = True) -> Dict:
+        fields = SNAPSHOT_FIELDS if include_full_text else COLUMN_FIELDS
+        return {field: self.value(field, index) for field in fields}
+
+    def iter_records(self, include_full_text: bool = True) -> Iterator[Dict]:
+        for index in range(self.count):
+            yield self.record(index, include_full_text=include_full_text)
+
+
+def iter_snapshot_records(path: str, include_full_text: bool = True) -> Iterator[Dict]:
+    """Stream records from any snapshot format."""
+    fmt = snapshot_format(path)
+
+    if fmt == "prsnap":
+        with ColumnarSnapshot(path) as snapshot:
+            yield from snapshot.iter_records(include_full_text=include_full_text)
+        return
+
+    if fmt == "json":
+        with open(path) as f:
+            rows = json.load(f)
+    else:
+        opener = gzip.open if fmt == "jsonl.gz" else open
+        rows = _iter_jsonl(opener, path)
+
+    for row in rows:
+        record = _normalize_record(row)
+        if not include_full_text:
+            record.pop(BLOB_FIELD, None)
+        yield record
+
+
+def _iter_jsonl(opener, path: str) -> Iterator[Dict]:
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def load_snapshot(path: str, include_full_text: bool = True) -> List[Dict]:
+    """Load every record of a snapshot into memory."""
+    return list(iter_snapshot_records(path, include_full_text=include_full_text))
@@ -0,0 +1,218 @@
+"""
+In-process typeahead for /api/suggest.
+
+A prefix trie over title words, company names and drug names, where every
+node caches its best TOP_K entries so a lookup is a walk down the typed
+prefix. SuggestService.refresh rebuilds it from the active search backend;
+services.py calls it whenever the index generation changes (see
+index_generation.GenerationTracker), which includes startup and reindexing.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+TOP_K = 64
+WORD_PATTERN = re.compile(r"\w[\w\-]*")
+# Brand names marked with a trademark sign, e.g. "IMAAVY®" or "Keytruda ®"
+# (possessive: a shorter name is never followed by the sign, so no backtracking)
+BRAND_PATTERN = re.compile(r"\b([A-Z][\w\-]++)\s?[®™]")
+BRAND_MARKS = ("®", "™")
+# Parenthesised generic names, e.g. "(nipocalimab-aahu)"
+GENERIC_PATTERN = re.compile(r"\(([a-z][a-z\-]{4,})\)")
+# Common INN stems for generic names written inline
+INN_STEMS = ("mab", "nib", "tide", "ciclib", "lisib", "parib", "vir", "gliflozin", "gliptin",
+             "sertib", "tinib", "zumab", "ximab")
+# A whole letter run ending in a stem after at least one more letter, plus an
+# optional "-xxxx" biologic suffix. The run is taken possessively and the stem
+# checked by fixed-width lookbehinds, instead of backtracking through every
+# split of the word for each stem.
+_INN = (r"\b[a-z]++(?:" + "|".join(f"(?<=[a-z]{stem})" for stem in INN_STEMS) + r")(?:-[a-z]{4})?\b")
+# Runs on lower-cased text: a case-sensitive scan is several times faster
+INN_PATTERN = re.compile(_INN)
+INN_PATTERN_IGNORECASE = re.compile(_INN, re.IGNORECASE)
+
+
+def find_inn_names(text: str, lowered: Optional[str] = None) -> List[str]:
+    """Inline generic names with a common INN stem, as written in text."""
+    lowered = text.lower() if lowered is None else lowered
+    if len(lowered) != len(text):
+        # Lower-casing changed offsets (e.g. "İ"): match the text itself
+        return [match.group() for match in INN_PATTERN_IGNORECASE.finditer(text)]
+    return [text[match.start():match.end()] for match in INN_PATTERN.finditer(lowered)]
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def extract_drug_names(text: Optional[str]) -> List[str]:
+    """Heuristic drug names (brands and generics) mentioned in a title."""
+    if not text:
+        return []
+    found = []
+    names = [match.group(1) for pattern in (BRAND_PATTERN, GENERIC_PATTERN) for match in pattern.finditer(text)]
+    for name in names + find_inn_names(text):
+        name = name.strip("-")
+        if name and name.lower() not in {n.lower() for n in found}:
+            found.append(name)
+    return found
+
+
+class PrefixTrie:
+    """Character trie; each node keeps the TOP_K heaviest ids stored beneath it."""
+
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "PrefixTrie"] = {}
+        self.top: List[Tuple[float, int]] = []
+
+    def insert(self, key: str, item_id: int, weight: float):
+        node = self
+        node._offer(weight, item_id)
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = PrefixTrie()
+            node = child
+            node._offer(weight, item_id)
+
+    def _offer(self, weight: float, item_id: int):
+        top = self.top
+        if (weight, item_id) in top:
+            return
+        if len(top) < TOP_K:
+            top.append((weight, item_id))
+            top.sort(reverse=True)
+        elif weight > top[-1][0]:
+            top[-1] = (weight, item_id)
+            top.sort(reverse=True)
+
+    def complete(self, prefix: str) -> List[int]:
+        node = self
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [item_id for _, item_id in node.top]
+
+
+class SuggestIndex:
+    def __init__(self, documents: List[Dict]):
+        """documents: newest first, each with title/company/url (and optional drugs)."""
+        self.entries: List[Dict] = []
+        self.title_words: List[set] = []
+        self.title_trie = PrefixTrie()
+        self.entity_trie = PrefixTrie()
+
+        company_counts: Dict[str, int] = {}
+        drug_counts: Dict[str, Tuple[str, int]] = {}
+        total = len(documents)
+
+        for rank, doc in enumerate(documents):
+            title = doc.get("title")
+            company = doc.get("company")
+            if company:
+                company_counts[company] = company_counts.get(company, 0) + 1
+            for drug in doc.get("drugs") or extract_drug_names(title):
+                key = normalize(drug)
+                display, count = drug_counts.get(key, (drug, 0))
+                drug_counts[key] = (display, count + 1)
+            if not title:
+                continue
+            entry_id = len(self.entries)
+            self.entries.append({
+                "text": title,
+                "type": "title",
+                "company": company,
+                "url": doc.get("url"),
+            })
+            words = {word for word in WORD_PATTERN.findall(normalize(title)) if len(word) > 1}
+            self.title_words.append(words)
+            # Newer releases rank first
+            weight = float(total - rank)
+            for word in words:
+                self.title_trie.insert(word, entry_id, weight)
+
+        for company, count in company_counts.items():
+            self._add_entity(company, "company", count)
+        for display, count in drug_counts.values():
+            self._add_entity(display, "drug", count)
+
+    def _add_entity(self, text: str, kind: str, count: int):
+        entry_id = len(self.entries)
+        self.entries.append({"text": text, "type": kind})
+        self.title_words.append(set())
+        normalized = normalize(text)
+        self.entity_trie.insert(normalized, entry_id, float(count))
+        # Also complete on later words, e.g. "nordisk" -> "Novo Nordisk"
+        for position in [match.start() for match in re.finditer(r"\s\S", normalized)]:
+            self.entity_trie.insert(normalized[position + 1:], entry_id, float(count))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def complete(self, text: str, limit: int = 8) -> List[Dict]:
+        typed = normalize(text)
+        if not typed:
+            return []
+
+        results = []
+        seen = set()
+
+        def add(entry_id: int) -> bool:
+            entry = self.entries[entry_id]
+            key = (entry["type"], normalize(entry["text"]))
+            if key not in seen:
+                seen.add(key)
+                results.append(entry)
+            return len(results) >= limit
+
+        for entry_id in self.entity_trie.complete(typed):
+            if add(entry_id):
+                return results
+
+        words = WORD_PATTERN.findall(typed)
+        if not words:
+            return results
+        # Every word but the last must appear in the title; the last is a prefix
+        completed = [word for word in words[:-1] if len(word) > 1]
+        for entry_id in self.title_trie.complete(words[-1]):
+            title_words = self.title_words[entry_id]
+            if all(word in title_words for word in completed) and add(entry_id):
+                break
+        return results
+
+
+class SuggestService:
+    """Owns the current SuggestIndex and rebuilds it when the index generation changes."""
+
+    def __init__(self, search_service, max_documents: int = 10000):
+        self.search_service = search_service
+        self.max_documents = max_documents
+        self.index: Optional[SuggestIndex] = None
+        self.generation = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the trie if the backend generation changed. Returns True on rebuild."""
+        with self._lock:
+            generation = self.search_service.index_generation()
+            if not force and self.index is not None and generation == self.generation:
+                return False
+            documents = self.search_service.get_all_titles(limit=self.max_documents)
+            if not documents:
+                # Backend unavailable or empty; keep the current state and retry later
+                return False
+            self.index = SuggestIndex(documents)
+            self.generation = generation
+            print(f"Built suggestion trie with {len(self.index)} entries")
+            return True
+
+    def suggest(self, text: str, limit: int = 8) -> Dict:
+        """Trie lookup, or the backend's completion suggester while the trie is not built yet."""
+        index = self.index
+        if index is not None:
+            return {"source": "trie", "suggestions": index.complete(text, limit)}
+        return {"source": "backend", "suggestions": self.search_service.suggest_completions(text, limit)}
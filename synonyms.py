@@ -0,0 +1,95 @@
+"""
+Pharma synonym groups (brand <-> generic names, abbreviations).
+
+The maintained list lives in pharma_synonyms.txt (Solr format, one group of
+equivalent terms per line). Elasticsearch receives it as a synonyms set used
+by the english_search analyzer (see ElasticsearchService.sync_synonyms); this
+module parses the same file for the local backend and snippet matching, and
+re-reads it when the file changes.
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+SYNONYMS_PATH = os.getenv(
+    'SYNONYMS_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pharma_synonyms.txt'),
+)
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_lock = threading.Lock()
+_loaded: Tuple[Optional[Tuple[int, int]], Dict[Tuple[str, ...], List[str]], int] = (None, {}, 0)
+
+
+def load_synonym_rules(path: Optional[str] = None) -> List[str]:
+    """Non-empty, non-comment lines of the synonyms file ("a, b, c")."""
+    rules = []
+    with open(path or SYNONYMS_PATH, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                rules.append(line)
+    return rules
+
+
+def build_synonym_map(rules: List[str]) -> Dict[Tuple[str, ...], List[str]]:
+    """Token tuple of each term -> every term of its group (lower-case)."""
+    synonym_map: Dict[Tuple[str, ...], List[str]] = {}
+    for rule in rules:
+        group = [" ".join(term.lower().split()) for term in rule.split(",") if term.strip()]
+        for term in group:
+            tokens = tuple(TOKEN_PATTERN.findall(term))
+            if tokens:
+                synonym_map.setdefault(tokens, [])
+                synonym_map[tokens].extend(t for t in group if t not in synonym_map[tokens])
+    return synonym_map
+
+
+def synonym_map() -> Dict[Tuple[str, ...], List[str]]:
+    """Parsed synonyms file, re-read whenever its size or mtime changes."""
+    global _loaded
+    try:
+        stat = os.stat(SYNONYMS_PATH)
+        signature = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return {}
+    if _loaded[0] != signature:
+        with _lock:
+            if _loaded[0] != signature:
+                mapping = build_synonym_map(load_synonym_rules())
+                longest = max((len(tokens) for tokens in mapping), default=0)
+                _loaded = (signature, mapping, longest)
+    return _loaded[1]
+
+
+def is_synonym_term(term: Optional[str]) -> bool:
+    """Whether term is one of the names listed in the synonyms file."""
+    tokens = tuple(TOKEN_PATTERN.findall(str(term or "").lower()))
+    return bool(tokens) and tokens in synonym_map()
+
+
+def expand_synonyms(text: Optional[str]) -> List[str]:
+    """
+    Terms equivalent to those in text, matching the longest synonym at each
+    position like the synonym_graph filter does (e.g. "non-small cell lung
+    cancer" expands to nsclc, not sclc).
+    """
+    mapping = synonym_map()
+    if not text or not mapping:
+        return []
+    longest = _loaded[2]
+    tokens = TOKEN_PATTERN.findall(str(text).lower())
+    expanded: List[str] = []
+    position = 0
+    while position < len(tokens):
+        for size in range(min(longest, len(tokens) - position), 0, -1):
+            group = mapping.get(tuple(tokens[position:position + size]))
+            if group:
+                expanded.extend(term for term in group if term not in expanded)
+                position += size
+                break
+        else:
+            position += 1
+    return expanded
@@ -0,0 +1,20 @@
+from entities import extract_partners, extract_regulatory_events
+
+
+def test_regulatory_events_in_headline_case():
+    assert extract_regulatory_events("U.S. FDA Approves KEYTRUDA® for Head and Neck Cancer") == ["FDA approval"]
+    assert extract_regulatory_events("FDA Grants Full Approval to TREMFYA® (guselkumab)") == ["FDA approval"]
+    assert extract_regulatory_events("European Commission Approves Imfinzi") == ["EC approval"]
+    assert extract_regulatory_events("Company Submits BLA to FDA") == ["Regulatory submission"]
+
+
+def test_regulatory_events_in_body_text():
+    text = "The U.S. Food and Drug Administration has approved the drug. A positive opinion from the CHMP followed."
+    assert extract_regulatory_events(text) == ["FDA approval", "CHMP positive opinion"]
+
+
+def test_partners_need_a_known_company_or_corporate_suffix():
+    text = ("The study ran in collaboration with Sapporo Medical University. Merck entered an agreement "
+            "with Cidara Therapeutics and a license agreement with Yuhan, Inc., after talks with Trump.")
+    assert extract_partners(text, "Pfizer Inc.", ["Merck", "Pfizer Inc."]) == [
+        "Merck", "Cidara Therapeutics", "Yuhan"]